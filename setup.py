@@ -31,6 +31,9 @@ setup(
         'console_scripts': [
             'toxn=toxn.evaluate:main',
         ],
+        'toxn.task_env': [
+            'venv-pip=toxn.task.env.venv_pip.venv_pip:VenvPip',
+        ],
     },
     classifiers=['Development Status :: 5 - Production/Stable',
                  'Intended Audience :: Developers',
@@ -1,9 +1,27 @@
 """toxn is a tool to help automate QA tasks"""
+import sys
 
-from pkg_resources import DistributionNotFound, get_distribution
 
-try:
-    # semantic version of the project
-    __version__ = get_distribution(__name__).version
-except DistributionNotFound:  # pragma: no cover
-    __version__ = '0.0.0-DEV'  # pragma: no cover
+def _version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # pragma: no cover # before Python 3.8
+        from pkg_resources import DistributionNotFound as PackageNotFoundError, get_distribution  # type: ignore
+
+        def version(distribution_name: str) -> str:
+            return str(get_distribution(distribution_name).version)
+    try:
+        return version(__name__)
+    except PackageNotFoundError:  # pragma: no cover
+        return '0.0.0-DEV'  # pragma: no cover
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name: str) -> str:
+        """the version is looked up on first use only, as that is slow (PEP 562)"""
+        if name == '__version__':
+            result = globals()['__version__'] = _version()  # semantic version of the project
+            return result
+        raise AttributeError(name)
+else:  # pragma: no cover
+    __version__ = _version()  # semantic version of the project
@@ -3,7 +3,7 @@ import argparse
 import logging
 import os
 from pathlib import Path
-from typing import IO, List, Sequence, Tuple, Union, cast
+from typing import IO, List, NamedTuple, Optional, Sequence, Tuple, Union, cast
 
 import configargparse  # type: ignore
 
@@ -13,10 +13,29 @@ CONFIG_FILE_NAME = 'pyproject.toml'
 
 TOX_ENV = 'TOX_ENV'
 TOX_CONFIG = 'TOX_CONFIG'
-OS_ENV_VARS = [TOX_ENV, TOX_CONFIG]
+TOXN_ENV_ARCHIVE_DIR = 'TOXN_ENV_ARCHIVE_DIR'
+OS_ENV_VARS = [TOX_ENV, TOX_CONFIG, TOXN_ENV_ARCHIVE_DIR]
 
 # actions that can be performed upon invoking tox
-ACTIONS = ['run', 'list', 'list-bare', 'list-default-bare']  # actions that can be performed upon invoking tox
+ACTIONS = ['run', 'list', 'list-bare', 'list-default-bare', 'list-shards']
+CONSOLE = ['live', 'tail', 'summary']  # ways to show the output of task commands
+
+
+class Shard(NamedTuple):
+    at: Optional[int]  # 1 based, None when only the number of shards is known (listing them)
+    total: int
+
+
+def shard(value: str) -> Shard:
+    """parse the K/N (or for listing N) form of a shard"""
+    at, _, total = value.rpartition('/')
+    try:
+        result = Shard(int(at) if at else None, int(total))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value!r} is not of the form K/N')
+    if result.total < 1 or result.at is not None and not 1 <= result.at <= result.total:
+        raise argparse.ArgumentTypeError(f'{value!r} is not of the form K/N with 1 <= K <= N')
+    return result
 
 
 def level_names() -> List[str]:
@@ -37,6 +56,8 @@ def find_config(config: Union[None, Path, IO[str]]) -> Union[Path, IO[str]]:
 async def parse(argv: Sequence[str]) -> argparse.Namespace:
     parser = build_parser()
     options: argparse.Namespace = parser.parse_args(argv)
+    if options.shard is not None and options.shard.at is None and options.action != 'list-shards':
+        parser.error('--shard needs the shard to run as K/N')
 
     options.config = find_config(getattr(options, 'config'))
     if isinstance(options.config, Path):
@@ -54,9 +75,17 @@ class Tox3HelpFormatter(argparse.ArgumentDefaultsHelpFormatter):
         super().__init__(prog, max_help_position=35, width=255)
 
 
+class _ArgParser(configargparse.ArgParser):  # type: ignore
+    epilog: Optional[str]
+
+    def format_help(self) -> str:
+        if self.epilog is None:  # looking up the version is slow, so only do it when printing the help
+            self.epilog = f'{toxn.__version__} from {toxn.__file__}'
+        return cast(str, super().format_help())
+
+
 def build_parser() -> argparse.ArgumentParser:
-    parser = configargparse.ArgParser(prog="toxn", formatter_class=Tox3HelpFormatter,
-                                      epilog=f'{toxn.__version__} from {toxn.__file__}')
+    parser = _ArgParser(prog="toxn", formatter_class=Tox3HelpFormatter)
     pre_process_flags(parser)
     parser.add_argument("--version", action="store_true", dest="print_version",
                         help="report version information to stdout")
@@ -69,8 +98,27 @@ def build_parser() -> argparse.ArgumentParser:
                         help='run only this task', nargs="+", type=str, env_var=TOX_ENV)
     parser.add_argument('-a', '--action', choices=ACTIONS, help='action to perform once configuration loaded',
                         default='run')
-    parser.add_argument('-p', '--parallel', dest='run_parallel', action="store_true",
-                        help='run tasks in parallel')
+    parser.add_argument('-p', '--parallel', dest='parallel', metavar='n', nargs='?', type=int, const=0,
+                        default=None, help='run tasks in parallel with at most n workers (by default the CPU count)')
+    parser.add_argument('--console', choices=CONSOLE, dest='console', default=None,
+                        help='show command output as produced (live), the end of it on failure (tail, default in '
+                             'parallel runs) or only where it was logged on failure (summary)')
+    parser.add_argument('--env-archive-dir', dest='env_archive_dir', metavar='dir', type=Path, default=None,
+                        env_var=TOXN_ENV_ARCHIVE_DIR,
+                        help='restore task environments from (and export them to) relocatable archives in this folder')
+    parser.add_argument('--shard', dest='shard', metavar='K/N', type=shard, default=None,
+                        help='run only the K-th of N parts of the selected tasks, balanced by the durations of the '
+                             'configured durations_file (with the list-shards action N alone is enough)')
+    parser.add_argument('--watch', action='store_true', dest='watch', default=False,
+                        help='after the run keep watching the project, rerunning the tasks changes affect (with warm '
+                             'environments and build backend) until interrupted')
+    parser.add_argument('--fail-fast', action='store_true', dest='fail_fast', default=False,
+                        help='on the first failing task cancel the running tasks (killing their commands) and skip '
+                             'the rest')
+    parser.add_argument('--report-json', dest='report_json', metavar='file', type=Path, default=None,
+                        help='write a JSON report of the run (timings per task phase) to this file')
+    parser.add_argument('--report-junit', dest='report_junit', metavar='file', type=Path, default=None,
+                        help='write a JUnit XML report of the run (a test case per task) to this file')
     parser.add_argument('args', nargs=argparse.REMAINDER,
                         help='additional arguments passed to commands as positional substitution',
                         default=None)
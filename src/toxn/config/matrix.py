@@ -0,0 +1,117 @@
+"""tasks generated from the combinations of factors, e.g. interpreters x dependency sets x extras
+
+a matrix is declared as::
+
+    [tool.toxn.matrix.test]
+    factors = [['py36', 'py37'], ['django20', 'django21'], ['', 'cov']]  # an empty factor makes the axis optional
+    base = 'test'  # optional, a task the generated tasks inherit from
+    commands = ['pytest tests']  # settings shared by all generated tasks
+
+    [tool.toxn.matrix.test.factor.django20]  # settings of tasks having the factor
+    deps = ['django >= 2.0, < 2.1']
+
+generated task names join their factors with ``-`` (e.g. ``py36-django20-cov``), the name of the matrix stands for
+all its tasks; factor settings are applied in axis order: lists extend, tables merge, other values replace
+"""
+from itertools import product
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .project import ConfDict
+
+SEPARATOR = '-'
+_RESERVED = {'factors', 'factor', 'base'}
+
+
+class Matrix:
+
+    def __init__(self, name: str, conf: ConfDict) -> None:
+        self.name: str = name
+        self.axes: List[List[str]] = [list(axis) for axis in conf.get('factors', [])]
+        self.base: Optional[str] = conf.get('base')
+        self._shared: ConfDict = {k: v for k, v in conf.items() if k not in _RESERVED}
+        self._factor_conf: Dict[str, ConfDict] = conf.get('factor', {})
+        for axis in self.axes:
+            for factor in axis:
+                if SEPARATOR in factor:
+                    raise ValueError(f'factor {factor!r} of matrix {name} contains {SEPARATOR!r}')
+        # position of the factors per axis, to find the factors of a task name without expanding the matrix
+        self._index: List[Dict[str, int]] = [{f: at for at, f in enumerate(axis)} for axis in self.axes]
+
+    def __len__(self) -> int:
+        size = 1
+        for axis in self.axes:
+            size *= len(axis)
+        return size if self.axes else 0
+
+    def __iter__(self) -> Iterator[str]:
+        """the generated task names, in declaration order"""
+        for factors in product(*self.axes) if self.axes else ():
+            yield self.task_name(factors)
+
+    @staticmethod
+    def task_name(factors: Tuple[str, ...]) -> str:
+        return SEPARATOR.join(f for f in factors if f)
+
+    def factors_of(self, task: str) -> Optional[Tuple[str, ...]]:
+        """the factors generating the task, None if the task is not part of the matrix"""
+        parts = task.split(SEPARATOR)
+        return self._match(parts, 0, ())
+
+    def _match(self, parts: List[str], axis_at: int, found: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+        if axis_at == len(self._index):
+            return found if not parts else None
+        index = self._index[axis_at]
+        if parts and parts[0] in index and parts[0]:
+            result = self._match(parts[1:], axis_at + 1, found + (parts[0],))
+            if result is not None:
+                return result
+        if '' in index:  # optional axis, try skipping it
+            return self._match(parts, axis_at + 1, found + ('',))
+        return None
+
+    def conf_of(self, factors: Tuple[str, ...], base: Optional[ConfDict] = None) -> ConfDict:
+        """the settings of the task generated by the factors, on top of the settings of the base task"""
+        result: ConfDict = dict(base or {})
+        result.update(self._shared)
+        for factor in factors:
+            if factor and factor in self._factor_conf:
+                merge(result, self._factor_conf[factor])
+        return result
+
+
+def merge(into: ConfDict, conf: ConfDict) -> None:
+    for key, value in conf.items():
+        current = into.get(key)
+        if isinstance(current, list) and isinstance(value, list):
+            into[key] = current + value
+        elif isinstance(current, dict) and isinstance(value, dict):
+            into[key] = dict(current, **value)
+        else:
+            into[key] = value
+
+
+class Matrices:
+    """all matrices of a project, finding the one a task name belongs to"""
+
+    def __init__(self, conf: ConfDict) -> None:
+        self.by_name: Dict[str, Matrix] = {k: Matrix(k, v) for k, v in conf.items() if isinstance(v, dict)}
+
+    def expand(self, names: List[str]) -> List[str]:
+        """replace matrix names with the tasks they generate"""
+        result: List[str] = []
+        for name in names:
+            if name in self.by_name:
+                result.extend(self.by_name[name])
+            else:
+                result.append(name)
+        return result
+
+    def find(self, task: str) -> Optional[Tuple[Matrix, Tuple[str, ...]]]:
+        for matrix in self.by_name.values():
+            factors = matrix.factors_of(task)
+            if factors is not None:
+                return matrix, factors
+        return None
+
+    def tasks(self) -> List[str]:
+        return [task for matrix in self.by_name.values() for task in matrix]
@@ -10,13 +10,19 @@ from ..project import ConfDict
 from ..util import Substitute
 
 
-def _tox_sys_dir() -> Path:
-    return Path(Path.home()) / '.toxn'
+TOXN_HOME = 'TOXN_HOME'
+
+
+def tox_sys_dir() -> Path:
+    """data kept across projects (resolved interpreters, parsed configs, work dirs): ``~/.toxn``, or the folder of the
+    ``TOXN_HOME`` environment variable"""
+    home = os.environ.get(TOXN_HOME)
+    return Path(home) if home else Path(Path.home()) / '.toxn'
 
 
 def _project_sys_dir(root_dir: Path) -> Path:
     at = 0
-    temp_dir = Path(_tox_sys_dir())
+    temp_dir = Path(tox_sys_dir())
     while True:
         hash = hashlib.sha256(f'{root_dir}{at}'.encode('UTF-8')).hexdigest()
         folder_name = root_dir.name[:12]
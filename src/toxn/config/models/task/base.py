@@ -1,6 +1,8 @@
 import argparse
 import re
 import shlex
+import sys
+from fnmatch import fnmatchcase
 from pathlib import Path
 from types import SimpleNamespace
 from typing import Dict, List, Optional, cast
@@ -58,12 +60,47 @@ class TaskConfig(CommonToxConfig):
     @staticmethod
     def resolve_python_key(key: str) -> str:
         match = re.match(r'py(\d?)(\d*)', key)
+        if match is None or not match.group(1):  # look for an interpreter factor, e.g. django20-py36
+            match = re.search(r'(?:^|-)py(\d)(\d*)(?:-|$)', key) or match
         if match:
             major = match.group(1)
             minor = match.group(2)
             return 'python{}{}'.format(major, '' if not minor else f'.{minor}')
         return 'python'  # fallback to the default python
 
+    @property
+    def env_type(self) -> str:
+        """the kind of environment the task runs in, ``venv-pip`` (built in) or one registered by a plugin under the
+        ``toxn.task_env`` entry point group"""
+        return cast(str, self._config_dict.get('env_type', 'venv-pip'))
+
+    @property
+    def pip_wheel(self) -> Optional[Path]:
+        """provision pip in new virtual environments from this wheel, instead of running ensurepip"""
+        wheel = self._config_dict.get('pip_wheel')
+        if wheel is None:
+            return None
+        return self.root_dir / wheel
+
+    @property
+    def venv_template(self) -> Optional[Path]:
+        """clone the virtual environment from a template created once per interpreter, instead of creating it"""
+        if not self._config_dict.get('venv_template', False) or sys.platform == 'win32':
+            return None
+        return self.project_work_dir / '.templates' / self.python
+
+    @property
+    def watch(self) -> Optional[List[str]]:
+        """the files the task depends on, as glob patterns relative to the root dir (``*`` matches across folders);
+        in watch mode only changes of these rerun the task, for the build task only these make up the build cache
+        key (of wheels, see :meth:`toxn.config.models.task.build.BuildTaskConfig.watches`); all files by default"""
+        return self._config_dict.get('watch')
+
+    def watches(self, name: str) -> bool:
+        """True if the task depends on the file (a POSIX path relative to the root dir)"""
+        patterns = self.watch
+        return patterns is None or any(fnmatchcase(name, pattern) for pattern in patterns)
+
     @property
     def recreate(self) -> bool:
         return cast(bool, getattr(self._cli, 'recreate', False))
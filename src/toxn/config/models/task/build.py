@@ -4,6 +4,7 @@ from types import SimpleNamespace
 from typing import List, Optional, Type, Union, cast
 
 from toxn.config.project import BuildSystem, ConfDict
+from toxn.util import digest_file
 from .base import TaskConfig
 
 
@@ -53,6 +54,16 @@ class BuildTaskConfig(TaskConfig):
             at = len(self.build_backend)
         return self.build_backend[:at]
 
+    def watches(self, name: str) -> bool:
+        """True if the package depends on the file: for sdists all files (these ship tests and documentation too),
+        for wheels the ones ``watch`` lists (e.g. ``['src/*', 'setup.*', 'pyproject.toml']``, all by default)"""
+        return not self.build_wheel or super().watches(name)
+
+    @property
+    def build_cache(self) -> bool:
+        """reuse the package built previously from the same sources, build requires, backend and build type"""
+        return self._config_dict.get('build_cache', True)
+
     @property
     def skip(self) -> bool:
         return self._config_dict.get('skip', False)
@@ -70,12 +81,20 @@ class BuiltTaskConfig(BuildTaskConfig):
                  built_package: Path) -> None:
         self._for_build_requires: List[str] = for_build_requires
         self._built_package: Path = built_package
+        self._package_digest: Optional[str] = None
         super().__init__(base._cli, base._config_dict, base.work_dir, base.name, base._build_system, base.task)
 
     @property
     def package(self) -> Optional[Path]:
         return self._built_package
 
+    @property
+    def package_digest(self) -> str:
+        """sha256 of the built package"""
+        if self._package_digest is None:
+            self._package_digest = digest_file(self._built_package)
+        return self._package_digest
+
     @property
     def for_build_requires(self) -> List[str]:
         return cast(List[str], self._for_build_requires)
@@ -1,5 +1,7 @@
+import hashlib
+import json
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, cast
 
 from toxn.util import list_to_cmd
 from .base import TaskConfig
@@ -51,7 +53,69 @@ class RunTaskConfig(TaskConfig):
             return self.root_dir
         return Path(change_dir)
 
+    @property
+    def depends_on(self) -> List[str]:
+        return cast(List[str], self._config_dict.get('depends_on', []))
+
     @property
     def install_build(self) -> bool:
         return not self._config_dict.get('skip_install', False)
 
+    @property
+    def env_identity(self) -> Optional[str]:
+        """digest of what determines the content of the environment of the task, tasks with the same one share a
+        single environment (None when ``share_env`` is false, the task has an environment of its own)"""
+        if not self._config_dict.get('share_env', True):
+            return None
+        content = {'python': self.python, 'env_type': self.env_type, 'install_command': self.install_command,
+                   'deps': sorted(self.deps), 'extras': sorted(self.extras), 'use_develop': self.use_develop,
+                   'install_build': self.install_build, 'install_build_requires': self.install_build_requires,
+                   'install_for_build_requires': self.install_for_build_requires,
+                   'pip_wheel': str(self.pip_wheel), 'venv_template': str(self.venv_template),
+                   'wheelhouse': str(self.wheelhouse)}
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    @property
+    def env_dir(self) -> Path:
+        """where the environment of the task lives, shared environments are within ``.envs`` of the project work
+        dir"""
+        identity = self.env_identity
+        if identity is None:
+            return self.work_dir
+        return self.project_work_dir / '.envs' / identity
+
+    @property
+    def env_archive_dir(self) -> Optional[Path]:
+        """restore the environment of the task from (and export it to) relocatable archives in this folder, e.g. a
+        cache shared between CI runs; archives are keyed by the interpreter and the packages installed (but the
+        project)
+
+        default value: the ``--env-archive-dir`` CLI flag, no archives when not set"""
+        folder = getattr(self._cli, 'env_archive_dir', None) or self._config_dict.get('env_archive_dir')
+        if folder is None:
+            return None
+        return self.root_dir / folder
+
+    @property
+    def console(self) -> str:
+        """how the output of the commands is shown, one of :literal_data:`toxn.config.cli.CONSOLE`: ``live`` as
+        produced, ``tail`` only the end of it on failure, ``summary`` only the path of the log file on failure (the
+        full output always goes to the log file of the task)
+
+        default value: the ``--console`` CLI flag, ``tail`` when running in parallel, ``live`` otherwise"""
+        console = getattr(self._cli, 'console', None) or self._config_dict.get('console')
+        if console is None:
+            return 'live' if getattr(self._cli, 'parallel', None) is None else 'tail'
+        return cast(str, console)
+
+    @property
+    def log_file(self) -> Path:
+        """the output of the commands of the last run"""
+        return self.work_dir / 'log' / 'commands.log'
+
+    @property
+    def wheelhouse(self) -> Optional[Path]:
+        """install the dependencies from wheels prebuilt (per interpreter) into the project work dir, offline"""
+        if not self._config_dict.get('wheelhouse', False):
+            return None
+        return self.project_work_dir / '.wheelhouse' / self.python
@@ -1,12 +1,33 @@
 import argparse
+import os
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Any, List, Optional, Union, cast
+from typing import Callable, Dict, List, Optional, Union, cast
 
 from toxn.config.models.task.build import BuildTaskConfig
 from toxn.config.models.task.run import RunTaskConfig
 from .core import CommonToxConfig
-from ..project import BuildSystem, ConfDict
+from ..cli import Shard
+from ..matrix import Matrices
+from ..project import BaseChains, BuildSystem, ConfDict
+from ..util import Substitute
+
+
+class _Tasks(SimpleNamespace):
+    """task configurations, created on first access"""
+
+    def __init__(self, is_task: Callable[[str], bool],
+                 factory: Callable[[str], Union[RunTaskConfig, BuildTaskConfig]]) -> None:
+        super().__init__()
+        self.__dict__['_is_task'] = is_task
+        self.__dict__['_factory'] = factory
+
+    def __getattr__(self, name: str) -> Union[RunTaskConfig, BuildTaskConfig]:
+        # only called for attributes not yet present
+        if name.startswith('__') or not self.__dict__['_is_task'](name):
+            raise AttributeError(name)
+        task = self.__dict__[name] = self.__dict__['_factory'](name)
+        return task
 
 
 class ToxConfig(CommonToxConfig):
@@ -16,66 +37,73 @@ class ToxConfig(CommonToxConfig):
                  build_system: BuildSystem,
                  config_dict: ConfDict,
                  config_path: Optional[Path],
-                 work_dir: Path) -> None:
+                 work_dir: Path,
+                 base_chains: Optional[Dict[str, ConfDict]] = None) -> None:
         self._work_dir: Path = work_dir
         self.config_path: Optional[Path] = config_path
         self._build_system: BuildSystem = build_system
         super().__init__(options, config_dict)
 
-        def _is_extra_task(key: str, conf: Any) -> bool:
-            return isinstance(conf, dict) and \
-                   key not in self.default_tasks and \
-                   key not in {BuildTaskConfig.NAME, 'set_env'}
-
-        self.default_tasks: List[str] = cast(List[str], self._config_dict.get('default_tasks', []))
-        self.extra_tasks: List[str] = [k for k, v in self._config_dict.get('task', {}).items() if
-                                       _is_extra_task(k, v)]
-        defined = self.default_tasks + self.extra_tasks
+        self._default_tasks: List[str] = cast(List[str], self._config_dict.get('default_tasks', []))
+        default_tasks = self._default_tasks  # substituted on each access, so read it once
+        all_task_conf: ConfDict = self._config_dict.get('task', {})
+        self._matrices = Matrices(self._config_dict.get('matrix', {}))
+        default_set = set(default_tasks)
+        self.extra_tasks: List[str] = [k for k, v in all_task_conf.items() if isinstance(v, dict) and
+                                       k not in default_set and k not in {BuildTaskConfig.NAME, 'set_env'}]
+        defined = [t for t in default_tasks if t not in self._matrices.by_name] + self.extra_tasks
 
         tasks = cast(List[str], getattr(self._cli, 'tasks', []))
-        self.run_tasks: List[str] = tasks if tasks else self.default_tasks
+        self.run_tasks: List[str] = self._matrices.expand(tasks) if tasks else self.default_tasks
         self.run_defined_tasks = self._run_defined_tasks(defined)
 
         self.tasks: List[str] = defined + self.run_defined_tasks
 
-        def extract_base_conf(all_task_conf: ConfDict) -> ConfDict:
-            return {k: v for k, v in all_task_conf.items() if k in {'set_env', } or not isinstance(v, dict)}
+        base_conf = {k: v for k, v in all_task_conf.items() if k in {'set_env', } or not isinstance(v, dict)}
+        chains = BaseChains(all_task_conf, base_chains)
 
         def _raw_task(task: str) -> ConfDict:
-            all_task_conf = self._config_dict.get('task', {})
-            task_conf = extract_base_conf(all_task_conf)
-            merge_conf(task, all_task_conf, task_conf)
-
+            task_conf = dict(base_conf)
+            generated = self._matrices.find(task) if task not in all_task_conf else None
+            if generated is None:
+                task_conf.update(chains[task])
+            else:
+                matrix, factors = generated
+                task_conf.update(matrix.conf_of(factors, None if matrix.base is None else chains[matrix.base]))
             return task_conf
 
-        def merge_conf(task: str, all_task_conf: ConfDict, task_conf: ConfDict) -> None:
-            if task in all_task_conf:
-                cur_conf = all_task_conf[task]
-                if 'base' in cur_conf:
-                    merge_conf(cur_conf['base'], all_task_conf, task_conf)
-                task_conf.update(cur_conf)
-
-        task_ns = SimpleNamespace()
-        task_ns.__dict__[BuildTaskConfig.NAME] = BuildTaskConfig(options,
-                                                                 _raw_task(BuildTaskConfig.NAME),
-                                                                 work_dir,
-                                                                 BuildTaskConfig.NAME,
-                                                                 build_system,
-                                                                 task_ns)
-        self.build = getattr(task_ns, BuildTaskConfig.NAME)
-        task_ns.__dict__.update({k: RunTaskConfig(options,
-                                                  _raw_task(k),
-                                                  work_dir, k, task_ns) for k in self.tasks})
+        def _make_task(name: str) -> Union[RunTaskConfig, BuildTaskConfig]:
+            if name == BuildTaskConfig.NAME:
+                return BuildTaskConfig(options, _raw_task(name), work_dir, name, build_system, task_ns)
+            return RunTaskConfig(options, _raw_task(name), work_dir, name, task_ns)
+
+        def _is_task(name: str) -> bool:
+            return name in known or self._matrices.find(name) is not None
+
+        known = set(self.tasks) | {BuildTaskConfig.NAME}
+        task_ns = _Tasks(_is_task, _make_task)
+        self.build = cast(BuildTaskConfig, getattr(task_ns, BuildTaskConfig.NAME))
         self._tasks = task_ns
 
     def _run_defined_tasks(self, defined: List[str]) -> List[str]:
         # environments that are invoked on demand
+        defined_set = set(defined)
         run_defined: List[str] = []
         for task in self.run_tasks:
-            if task not in defined:
+            if task not in defined_set and self._matrices.find(task) is None:
                 run_defined.append(task)
         return run_defined
 
+    @property
+    def default_tasks(self) -> List[str]:
+        """tasks run when none is selected, matrix names stand for all the tasks the matrix generates"""
+        return self._matrices.expand(self._default_tasks)
+
+    @property
+    def matrix_tasks(self) -> List[str]:
+        """tasks generated by the matrices of the project"""
+        return self._matrices.tasks()
+
     @property
     def task(self) -> SimpleNamespace:
         return self._tasks
@@ -105,7 +133,87 @@ class ToxConfig(CommonToxConfig):
         """run tox tasks in parallel once building the project finishes
 
         :note: CLI only"""
-        return cast(bool, getattr(self._cli, 'run_parallel'))
+        return getattr(self._cli, 'parallel', None) is not None
+
+    @property
+    def parallel_workers(self) -> int:
+        """maximum number of tasks to run at the same time (defaults to the CPU count when running in parallel)
+
+        :note: CLI only"""
+        if not self.run_parallel:
+            return 1
+        workers = cast(int, getattr(self._cli, 'parallel'))
+        return workers if workers > 0 else (os.cpu_count() or 1)
+
+    @property
+    def shard(self) -> Optional[Shard]:
+        """the part of the selected tasks to run (or list), see :mod:`toxn.evaluate.shard`
+
+        :note: CLI only"""
+        return cast(Optional[Shard], getattr(self._cli, 'shard', None))
+
+    @property
+    def watch(self) -> bool:
+        """after the run keep rerunning the tasks affected by changes of the project, see :mod:`toxn.evaluate.watch`
+
+        :note: CLI only"""
+        return cast(bool, getattr(self._cli, 'watch', False))
+
+    def recreated(self) -> None:
+        """the task environments were recreated as asked, later runs of this process (watch mode) reuse them"""
+        setattr(self._cli, 'recreate', False)
+        Substitute.invalidate()  # the tasks memoized the option
+
+    @property
+    def fail_fast(self) -> bool:
+        """stop the run at the first failing task: running tasks are cancelled, pending ones are not started
+
+        :note: CLI only"""
+        return cast(bool, getattr(self._cli, 'fail_fast', False))
+
+    @property
+    def shard_durations_file(self) -> Optional[Path]:
+        """durations the shards are balanced by, all nodes must see the same ones (e.g. committed to the project, or
+        restored from a CI cache); without one the tasks are split by their number
+
+        default value: the :meth:`toxn.config.ToxConfig.durations_file` when set in the configuration (the default one
+        within the work dir is local to each node)
+        """
+        durations_file: Optional[str] = self._config_dict.get('durations_file')
+        if durations_file is None:
+            return None
+        return self.root_dir / durations_file
+
+    @property
+    def durations_file(self) -> Path:
+        """file storing how long tasks took to run previously, slowest ones are started first in parallel runs
+
+        default value: ``.durations.json`` within the :meth:`toxn.config.ToxConfig.work_dir`
+        """
+        durations_file = self._config_dict.get('durations_file')
+        if durations_file is None:
+            return self.work_dir / '.durations.json'
+        return self.root_dir / durations_file
+
+    @property
+    def report_json(self) -> Path:
+        """JSON report of the run: per task the time spent in each phase, exit codes and cache hits
+
+        default value: ``report.json`` within the :meth:`toxn.config.ToxConfig.work_dir`
+
+        :note: CLI only"""
+        path = getattr(self._cli, 'report_json', None)
+        return self.work_dir / 'report.json' if path is None else cast(Path, path)
+
+    @property
+    def report_junit(self) -> Path:
+        """JUnit XML report of the run, with a test case per task
+
+        default value: ``report.xml`` within the :meth:`toxn.config.ToxConfig.work_dir`
+
+        :note: CLI only"""
+        path = getattr(self._cli, 'report_junit', None)
+        return self.work_dir / 'report.xml' if path is None else cast(Path, path)
 
     @property
     def skip_missing_interpreters(self) -> bool:
@@ -1,8 +1,14 @@
+import hashlib
+import json
+import sys
 from pathlib import Path
-from typing import List, NamedTuple, Tuple
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Sequence, Tuple
 
 from toxn.util import Loggers
 
+if TYPE_CHECKING:
+    from toxn.report import TaskReport  # noqa
+
 
 class VEnvCreateParam(NamedTuple):
     recreate: bool
@@ -10,11 +16,19 @@ class VEnvCreateParam(NamedTuple):
     name: str
     python: str
     logger: Loggers
+    pip_wheel: Optional[Path] = None  # seed pip from this wheel instead of running ensurepip
+    template: Optional[Path] = None  # clone the environment from a template environment at this path
+    report: Optional['TaskReport'] = None  # record the time spent in creating and provisioning the environment
+    archive: Optional['Archive'] = None  # restore the environment from (and export it to) a relocatable archive
 
     @property
     def cache(self) -> Path:
         return self.dir / f'.{self.name}.tox.cache'
 
+    @property
+    def fingerprint(self) -> Path:
+        return self.dir / f'.{self.name}.tox.fingerprint'
+
 
 class VEnvParams(NamedTuple):
     root_dir: Path
@@ -28,11 +42,33 @@ class Install(NamedTuple):
     packages: List[str]
     base_cmd: List[str]
     use_develop: bool
+    digest: Optional[str] = None  # when set the batch is replaced as a whole on change, instead of extended
+    find_links: Optional[Path] = None  # install from this wheelhouse only, without consulting the index
 
 
 VersionInfo = Tuple[int, int, int, str]
 
 
+class Archive(NamedTuple):
+    """relocatable archives of environments within a folder, keyed by the interpreter and the packages installed"""
+    folder: Path
+    key: str
+
+    @classmethod
+    def of(cls, folder: Path, installs: Sequence[Install]) -> 'Archive':
+        """keyed by the batches installed from an index, the ones with a digest (e.g. the project) change too often
+        to be worth archiving"""
+        content = [[i.batch_name, i.packages, i.base_cmd, i.use_develop]
+                   for i in installs if i.packages and i.digest is None]
+        return cls(folder, hashlib.sha256(json.dumps(content).encode('utf-8')).hexdigest()[:16])
+
+    def file(self, python: 'Python') -> Path:
+        import platform
+        interpreter = f'{python.version}\0{sys.platform}\0{platform.machine()}'
+        tag = hashlib.sha256(interpreter.encode('utf-8')).hexdigest()[:8]
+        return self.folder / f'{self.key}-{tag}.tar.gz'
+
+
 class Python(NamedTuple):
     python_name: str
     exe: Path
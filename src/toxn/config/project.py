@@ -1,9 +1,10 @@
 """parse the project file"""
+import hashlib
 import logging
+import os
+import pickle
 from pathlib import Path
-from typing import Any, Dict, IO, List, NamedTuple, Optional, Tuple, Union
-
-import toml  # type: ignore
+from typing import Any, Dict, IO, List, NamedTuple, Optional, Set, Tuple, Union, cast
 
 ConfDict = Dict[str, Any]
 
@@ -23,6 +24,7 @@ async def from_toml(config_object: Union[Path, IO[str]]) -> Tuple[BuildSystem, C
             config_path = Path(name)
 
     logging.debug('load config file %s', config_path)
+    import toml  # type: ignore # not needed when the parsed configuration is cached
     file_conf = toml.load(str(config_object) if isinstance(config_object, Path) else config_object)
 
     build_backend: Optional[str] = None
@@ -41,3 +43,92 @@ async def from_toml(config_object: Union[Path, IO[str]]) -> Tuple[BuildSystem, C
     if 'tool' in file_conf and 'toxn' in file_conf['tool']:
         conf_dict = file_conf['tool']['toxn']
     return build_system, conf_dict, config_path
+
+
+class BaseChains:
+    """task configuration merged along its base chain, resolved once per task"""
+
+    def __init__(self, all_task_conf: ConfDict, resolved: Optional[Dict[str, ConfDict]] = None) -> None:
+        self._all: ConfDict = all_task_conf
+        self.resolved: Dict[str, ConfDict] = {} if resolved is None else resolved
+        self._resolving: Set[str] = set()
+
+    def __getitem__(self, task: str) -> ConfDict:
+        if task not in self.resolved:
+            cur_conf = self._all.get(task)
+            if not isinstance(cur_conf, dict):
+                return {}
+            if task in self._resolving:
+                raise ValueError(f'base cycle at task {task}')
+            self._resolving.add(task)
+            try:
+                result: ConfDict = dict(self[cur_conf['base']]) if 'base' in cur_conf else {}
+            finally:
+                self._resolving.discard(task)
+            result.update(cur_conf)
+            self.resolved[task] = result
+        return self.resolved[task]
+
+
+Parsed = Tuple[BuildSystem, ConfDict, Optional[Path], Dict[str, ConfDict]]
+CACHE_ENTRIES = 64  # number of most recently used config files kept parsed
+
+
+async def cached_from_toml(config_object: Union[Path, IO[str]], cache_dir: Path) -> Parsed:
+    """like :meth:`from_toml`, plus the resolved base chains of the tasks; config files are parsed only if changed
+
+    the cache entry is validated by the size, modification time and content hash of the config file, entries of the
+    least recently used config files are dropped
+    """
+    if not isinstance(config_object, Path):
+        build_system, conf_dict, config_path = await from_toml(config_object)
+        return build_system, conf_dict, config_path, {}
+    with open(config_object, 'rb') as file_handler:
+        content = file_handler.read()
+    stat = os.stat(str(config_object))
+    key = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': hashlib.sha256(content).hexdigest()}
+    cache_file = cache_dir / f'{hashlib.sha256(str(config_object.absolute()).encode("utf-8")).hexdigest()[:32]}.pickle'
+    try:
+        with open(cache_file, 'rb') as file_handler:
+            stored_key, parsed = pickle.load(file_handler)
+        if stored_key == key:
+            logging.debug('load parsed config of %s from %s', config_object, cache_file)
+            os.utime(str(cache_file))  # mark as recently used
+            return cast(Parsed, parsed)
+    except Exception:  # missing, unreadable or written by another version, parse again
+        pass
+    build_system, conf_dict, config_path = await from_toml(config_object)
+    conf_dict = _plain(conf_dict)
+    all_task_conf = conf_dict.get('task', {})
+    chains = BaseChains(all_task_conf)
+    for task in all_task_conf:
+        try:
+            chains[task]
+        except ValueError:  # raised again when the task is used
+            pass
+    parsed = build_system, conf_dict, config_path, chains.resolved
+    try:
+        os.makedirs(str(cache_dir), exist_ok=True)
+        temp = cache_dir / f'.{cache_file.name}.{os.getpid()}'
+        with open(temp, 'wb') as file_handler:
+            pickle.dump((key, parsed), file_handler, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(str(temp), str(cache_file))
+        _evict(cache_dir)
+    except (OSError, pickle.PicklingError) as exception:
+        logging.debug('could not cache parsed config at %s: %r', cache_file, exception)
+    return parsed
+
+
+def _evict(cache_dir: Path) -> None:
+    entries = sorted(cache_dir.glob('*.pickle'), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in entries[CACHE_ENTRIES:]:
+        old.unlink()
+
+
+def _plain(value: Any) -> Any:
+    """the parser returns its own (not picklable) types for some tables, so convert to builtin types"""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
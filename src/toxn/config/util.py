@@ -1,66 +1,141 @@
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
 _pattern = re.compile(r'<(?P<keys>[\w.]+)(?P<value_1>:[^:]+)?(?P<value_2>:.+)?>')
 
+MAX_ROUNDS = 64  # substituted values are substituted again, until nothing changes or this many rounds
+
+
+class _Env(NamedTuple):
+    key: str
+    default: Optional[str]
+
+
+class _Ref(NamedTuple):
+    keys: Tuple[str, ...]
+    default: Optional[str]
+
+
+Token = Union[str, _Env, _Ref]
+
+
+@lru_cache(maxsize=4096)
+def compile_template(arg: str) -> Tuple[Token, ...]:
+    """split a template into literal strings, environment variable and attribute references"""
+    tokens: List[Token] = []
+    pos = 0
+    for match_obj in _pattern.finditer(arg):
+        keys, value_1, value_2 = match_obj.group('keys', 'value_1', 'value_2')
+        if keys == 'env':
+            if value_1 is None:  # not a valid reference, keep as is
+                continue
+            token: Token = _Env(value_1[1:], None if value_2 is None else value_2[1:])
+        else:
+            token = _Ref(tuple(keys.split('.')), None if value_1 is None else value_1[1:])
+        start, end = match_obj.span()
+        if start > pos:
+            tokens.append(arg[pos:start])
+        tokens.append(token)
+        pos = end
+    if pos < len(arg):
+        tokens.append(arg[pos:])
+    return tuple(tokens)
+
+
+def _evaluate(obj: Any, token: Token) -> Any:
+    if isinstance(token, str):
+        return token
+    if isinstance(token, _Env):
+        if token.key in os.environ:
+            return os.environ[token.key]
+        return '' if token.default is None else token.default
+    value = obj
+    for key in token.keys:
+        value = getattr(value, key, None)
+    if value is None:
+        value = '' if token.default is None else token.default
+    return value
+
 
 def substitute(obj: Any, arg: str) -> Any:
+    seen: Set[str] = set()
     while True:
-        matches = list(_pattern.finditer(arg))
-        if not matches:
-            return arg
-        pieces: List[Any] = []
-        pos = 0
-        for match_obj in matches:
-            match: Dict[str, str] = match_obj.groupdict()
-
-            keys = match['keys']
-            if keys == 'env':
-                os_key = match.get('value_1')
-                if os_key is None:
-                    continue
-                os_key = os_key[1:]
-                if os_key in os.environ:
-                    value: Any = os.environ[os_key]
-                else:
-                    default = match.get('value_2')
-                    value = default[1:] if default is not None else ''
-            else:
-                value = obj
-                for key in keys.split('.'):
-                    try:
-                        value = getattr(value, key, None)
-                    except AttributeError:
-                        value = None
-                        break
-                if value is None:
-                    if 'value_1' not in match:
-                        value = ''
-                    else:
-                        default = match.get('value_1')
-                        value = '' if default is None else default[1:]
-
-            start, end = match_obj.span()
-            if end - start == len(arg):
-                return value
-            pieces.append(arg[pos: start])
-            pieces.append(value)
-            pos = end
-        if pos == 0:  # no replacement, short it
+        tokens = compile_template(arg)
+        if all(isinstance(t, str) for t in tokens):
             return arg
-        pieces.append(arg[pos:])
-        arg = ''.join(str(p) for p in pieces)
+        if len(tokens) == 1:  # the whole value is a reference, keep its type
+            return _evaluate(obj, tokens[0])
+        seen.add(arg)
+        arg = ''.join(str(_evaluate(obj, t)) for t in tokens)
+        if arg in seen:
+            raise ValueError(f'substitution cycle while resolving {arg!r}')
+        if len(seen) >= MAX_ROUNDS:
+            raise ValueError(f'substitution does not converge after {MAX_ROUNDS} rounds for {arg!r}')
+
+
+def _fresh(value: Any) -> Any:
+    """memoized containers are copied, so callers can not alter the memoized value"""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+_resolving: Set[Tuple[int, str]] = set()  # properties under evaluation, to detect reference cycles
 
 
 class Substitute:
+    """substitutes references in the values of its attributes
+
+    values of properties are memoized per object, and invalidated whenever an attribute is set on any
+    configuration object (e.g. once a task environment is created); environment variables are considered not to
+    change during the lifetime of the configuration
+    """
+    _generation: int = 0
 
     def _substitute(self, arg: str) -> Any:
         return substitute(self, arg)
 
+    def __setattr__(self, key: str, value: Any) -> None:
+        Substitute.invalidate()
+        super().__setattr__(key, value)
+
+    @staticmethod
+    def invalidate() -> None:
+        """forget the memoized property values, e.g. after changing state the properties read from outside of the
+        configuration objects (the CLI options)"""
+        Substitute._generation += 1
+
     def __getattribute__(self, item: str) -> Any:
-        result = super().__getattribute__(item)
+        if item.startswith('__') or not isinstance(getattr(type(self), item, None), property):
+            return Substitute._convert(self, super().__getattribute__(item))
+
+        attributes: Dict[str, Any] = super().__getattribute__('__dict__')
+        generation = Substitute._generation
+        memo: Tuple[int, Dict[str, Any]] = attributes.get('_memo', (-1, {}))
+        if memo[0] != generation:
+            memo = attributes['_memo'] = generation, {}
+        if item in memo[1]:
+            return _fresh(memo[1][item])
+
+        marker = id(self), item
+        if marker in _resolving:
+            raise ValueError(f'substitution cycle while resolving {item} of {type(self).__name__}')
+        _resolving.add(marker)
+        try:
+            result = Substitute._convert(self, super().__getattribute__(item))
+        finally:
+            _resolving.discard(marker)
+        if Substitute._generation == generation:
+            memo[1][item] = result
+            return _fresh(result)
+        return result
+
+    def _convert(self, result: Any) -> Any:
         if isinstance(result, str):
             return self._substitute(result)
         elif isinstance(result, Path):
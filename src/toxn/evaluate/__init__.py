@@ -5,10 +5,7 @@ import logging
 import sys
 from typing import Sequence
 
-import colorlog  # type: ignore
-
 from .list_tasks import list_bare, list_tasks
-from .run_tasks import run_tasks
 from ..config import ToxConfig, load as load_config
 from ..config.cli import get_logging
 
@@ -23,6 +20,7 @@ def _setup_logging(verbose: str, quiet: bool, logging_fmt: str) -> None:
     if quiet:
         ROOT_LOGGER.addHandler(logging.NullHandler())
     else:
+        import colorlog  # type: ignore
         level = getattr(logging, verbose)
         fmt = f'%(log_color)s{logging_fmt}'
         formatter = colorlog.ColoredFormatter(fmt)
@@ -52,6 +50,10 @@ def main(argv: Sequence[str]) -> int:
         return loop.run_until_complete(execute(argv))
     except SystemExit as exception:
         return exception.code
+    except KeyboardInterrupt:
+        from ..util import kill_running
+        loop.run_until_complete(kill_running())  # give commands the chance to clean up, then kill what is left
+        raise
     except Exception:
         LOGGER.exception('')
         return -1
@@ -64,11 +66,26 @@ async def execute(argv: Sequence[str]) -> int:
     result: int = 1
     config: ToxConfig = await load_config(argv)
     if config.action == 'run':
-        result = await run_tasks(config, LOGGER)
+        from .run_tasks import run_tasks  # only running tasks needs the task machinery
+        if config.shard is not None:
+            from .shard import select
+            config.run_tasks = select(config, config.shard)
+            LOGGER.info('shard %s/%s runs %s', config.shard.at, config.shard.total, ', '.join(config.run_tasks))
+        if config.watch:
+            from .watch import watch
+            result = await watch(config, argv, LOGGER)
+        else:
+            result = await run_tasks(config, LOGGER)
     elif config.action == 'list':
         result = await list_tasks(config, LOGGER)
     elif config.action == 'list-bare':
-        result = await list_bare(config.tasks, LOGGER)
+        result = await list_bare(list(dict.fromkeys(config.tasks + config.matrix_tasks)), LOGGER)
     elif config.action == 'list-default-bare':
         result = await list_bare(config.default_tasks, LOGGER)
+    elif config.action == 'list-shards':
+        if config.shard is None:
+            LOGGER.error('list-shards needs the number of shards via --shard N')
+            return -1
+        from .shard import list_shards
+        result = await list_shards(config, config.shard)
     return result
@@ -0,0 +1,30 @@
+"""durations of previous task runs, used to prioritize (and balance) the slowest tasks"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Mapping
+
+
+def load_durations(path: Path) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'rt') as file_handler:
+            content = json.load(file_handler)
+    except (OSError, ValueError) as exception:
+        logging.debug('could not load task durations from %s: %r', path, exception)
+        return {}
+    if not isinstance(content, dict):
+        return {}
+    return {k: float(v) for k, v in content.items() if isinstance(v, (int, float))}
+
+
+def store_durations(path: Path, durations: Mapping[str, float]) -> None:
+    content = load_durations(path)
+    content.update(durations)
+    os.makedirs(str(path.parent), exist_ok=True)
+    temp = path.with_name(f'{path.name}.{os.getpid()}')
+    with open(temp, 'wt') as file_handler:
+        json.dump(content, file_handler, indent=2, sort_keys=True)
+    os.replace(str(temp), str(path))
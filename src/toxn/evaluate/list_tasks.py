@@ -9,8 +9,13 @@ async def list_tasks(config: ToxConfig, logger: logging.Logger) -> int:
     def max_len(getter: Callable[[str], Sized]) -> int:
         return max(len(getter(e)) for e in chain(config.default_tasks,
                                                  config.extra_tasks,
+                                                 matrix_tasks,
                                                  config.run_defined_tasks))
 
+    default_tasks = config.default_tasks
+    in_default = set(default_tasks)
+    matrix_tasks = [t for t in config.matrix_tasks if t not in in_default]
+
     width = max_len(lambda e: e)
     python_width = max_len(lambda e: config.task_of(e).python)
 
@@ -22,8 +27,9 @@ async def list_tasks(config: ToxConfig, logger: logging.Logger) -> int:
             python_str = config.task_of(name).python.ljust(python_width)
             logger.info(f'{task_str} [{python_str}] -> {config.task_of(name).description}')
 
-    print_tasks(config.default_tasks, 'default tasks')
+    print_tasks(default_tasks, 'default tasks')
     print_tasks(config.extra_tasks, 'extra defined tasks')
+    print_tasks(matrix_tasks, 'matrix tasks')
     print_tasks(config.run_defined_tasks, 'run defined tasks')
     return 0
 
@@ -1,12 +1,17 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import Optional, cast
+from typing import Dict, Optional, cast
 
 from toxn.config import RunTaskConfig, ToxConfig
 from toxn.config.models.task.build import BuiltTaskConfig
-from toxn.task import build, run_task
+from toxn.report import RunReport
+from toxn.task import build, run_task, wheelhouse
+from toxn.task.env import shared
+from toxn.task.run import PendingBuild
 from toxn.util import human_timedelta
+from .history import load_durations, store_durations
+from .scheduler import Scheduler
 
 
 def build_needs_install(config: ToxConfig) -> bool:
@@ -19,34 +24,87 @@ def build_needs_install(config: ToxConfig) -> bool:
     return False
 
 
-async def run_tasks(config: ToxConfig, logger: logging.Logger) -> int:
+async def run_tasks(config: ToxConfig, logger: logging.Logger, keep_backend: bool = False) -> int:
+    """run the selected tasks, keep_backend leaves the build backend running for later runs of the process"""
     start = datetime.now()
     result = None
+    report = RunReport()
     try:
+        await shared.prune(config, logger)
+        durations_file = config.durations_file
+        scheduler = Scheduler(config.run_tasks,
+                              {name: cast(RunTaskConfig, config.task_of(name)).depends_on
+                               for name in config.run_tasks},
+                              load_durations(durations_file) if config.run_parallel else {})
+
         run_build = config.build.skip is False and build_needs_install(config)
-        built: Optional[BuiltTaskConfig] = await build(config.build) if run_build else None
-
-        if config.run_parallel:
-            futures = []
-            loop = asyncio.get_event_loop()
-            for name in config.run_tasks:
-                futures.append(loop.create_task(run_task(cast(RunTaskConfig, config.task_of(name)),
-                                                         built,
-                                                         config.skip_missing_interpreters)))
-            results = [await f for f in futures]
-        else:
-            empty_line = run_build
-            results = []
-            for name in config.run_tasks:
+        loop = asyncio.get_event_loop()
+        pending = PendingBuild(config.build if run_build else None, loop.create_future(), loop.create_future())
+
+        async def fill_early_wheels() -> None:
+            try:
+                await wheelhouse.prepare_early(config, pending.build)
+            except Exception as exception:
+                pending.wheels.set_exception(exception)  # the tasks waiting for these fail with it
+            else:
+                pending.wheels.set_result(None)
+
+        async def build_project() -> None:
+            early_wheels = loop.create_task(fill_early_wheels())
+            try:
+                built: Optional[BuiltTaskConfig] = None
+                if run_build:
+                    built = await build(config.build, keep_backend, report.task('build'))
+                await early_wheels
+                await pending.wheels
+                await wheelhouse.prepare(config, built)
+            except wheelhouse.CouldNotBuildWheels as exception:
+                logger.error('could not build wheels %s', exception)
+                raise SystemExit(-1)
+            finally:
+                early_wheels.cancel()
+            pending.built.set_result(built)
+
+        durations: Dict[str, float] = {}
+        empty_line = run_build
+
+        async def runner(name: str) -> int:
+            nonlocal empty_line
+            if not config.run_parallel:
                 if empty_line:
                     logger.info('')
                 else:
                     empty_line = True
-                results.append(await run_task(cast(RunTaskConfig, config.task_of(name)),
-                                              built,
-                                              config.skip_missing_interpreters))
-        fails = [r for r in results if r]
+            task_start = datetime.now()
+            try:
+                return await run_task(cast(RunTaskConfig, config.task_of(name)),
+                                      pending,
+                                      config.skip_missing_interpreters,
+                                      report.task(name),
+                                      isolate=config.fail_fast)
+            finally:
+                durations[name] = (datetime.now() - task_start).total_seconds()
+
+        # tasks prepare their environment while the project builds, waiting for it only to install the project
+        running = loop.create_task(scheduler.run(runner, config.parallel_workers, config.fail_fast))
+        try:
+            try:
+                await build_project()
+            except BaseException:
+                running.cancel()
+                await asyncio.wait([running])
+                raise
+            results = await running
+        finally:
+            if durations:
+                store_durations(durations_file, durations)
+        fails = [results[name] for name in scheduler.order if results.get(name)]
         result = (fails[0] if len(fails) == 1 else 1) if fails else 0
+        not_run = [name for name in scheduler.order if name not in results]
+        if not_run:
+            logger.warning('fail fast, did not finish %s', ', '.join(not_run))
         return result
     finally:
+        report.done(result)
+        report.write(config.report_json, config.report_junit)
         logging.info('finished %s with %s', human_timedelta(datetime.now() - start), result)
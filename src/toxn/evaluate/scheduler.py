@@ -0,0 +1,69 @@
+"""run tasks respecting their dependency graph, with a bounded number of workers"""
+import asyncio
+from typing import Any, Callable, Coroutine, Dict, List, Mapping, Sequence, Set, Tuple
+
+TaskRunner = Callable[[str], Coroutine[Any, Any, int]]
+
+
+class Scheduler:
+    """orders tasks so that a task starts only after all of its (selected) dependencies finished
+
+    dependencies only impose ordering: a task still runs if a task it depends on failed, and
+    dependencies that were not selected to run are ignored; among the tasks ready to run the one
+    with the highest priority starts first, ties resolved by the order the tasks were selected in; results are
+    collected as tasks finish, in fail fast mode the first failure cancels the running tasks and the pending ones
+    are not started (neither has a result)
+    """
+
+    def __init__(self,
+                 tasks: Sequence[str],
+                 depends_on: Mapping[str, Sequence[str]],
+                 priority: Mapping[str, float]) -> None:
+        self.tasks: List[str] = list(tasks)
+        selected = set(self.tasks)
+        self._depends_on: Dict[str, Set[str]] = {t: {d for d in depends_on.get(t, []) if d in selected and d != t}
+                                                 for t in self.tasks}
+        self._priority: Mapping[str, float] = priority
+        self._position: Dict[str, int] = {t: i for i, t in enumerate(self.tasks)}
+        self.order: List[str] = self._order()
+
+    def _key(self, name: str) -> Tuple[float, int]:
+        return -self._priority.get(name, 0.0), self._position[name]
+
+    def _ready(self, pending: Sequence[str], done: Set[str]) -> List[str]:
+        return sorted((t for t in pending if self._depends_on[t] <= done), key=self._key)
+
+    def _order(self) -> List[str]:
+        order: List[str] = []
+        pending = list(self.tasks)
+        while pending:
+            ready = self._ready(pending, set(order))
+            if not ready:
+                raise ValueError('dependency cycle between tasks {}'.format(', '.join(pending)))
+            order.append(ready[0])
+            pending.remove(ready[0])
+        return order
+
+    async def run(self, runner: TaskRunner, workers: int, fail_fast: bool = False) -> Dict[str, int]:
+        loop = asyncio.get_event_loop()
+        results: Dict[str, int] = {}
+        pending = list(self.order)
+        running: Dict['asyncio.Future[int]', str] = {}
+        try:
+            while pending or running:
+                for name in self._ready(pending, set(results)):
+                    if len(running) >= workers:
+                        break
+                    pending.remove(name)
+                    running[loop.create_task(runner(name))] = name
+                finished, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    results[running.pop(future)] = future.result()
+                if fail_fast and any(results.values()):
+                    break
+        finally:
+            for future in running:
+                future.cancel()
+            if running:  # let them clean up (e.g. kill their commands)
+                await asyncio.wait(list(running))
+        return results
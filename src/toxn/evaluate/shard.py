@@ -0,0 +1,77 @@
+"""split the selected tasks across CI nodes, balanced by how long the tasks took to run previously
+
+tasks depending on each other are kept on the same shard; groups are assigned longest first, each to the shard with
+the least work so far (ties to the lower shard), so every node computes the same assignment given the same
+durations; all nodes must agree on the split (otherwise tasks are skipped or run twice), so durations are only used
+when the project configures a ``durations_file`` the nodes share (see
+:meth:`toxn.config.ToxConfig.shard_durations_file`), without one all tasks weigh the same, which spreads them evenly
+"""
+import json
+import sys
+from typing import Dict, List, Mapping, NamedTuple, Sequence, cast
+
+from toxn.config import RunTaskConfig, ToxConfig
+from toxn.config.cli import Shard
+from .history import load_durations
+
+
+class Assignment(NamedTuple):
+    tasks: List[str]
+    duration: float  # estimated
+
+
+def assign(tasks: Sequence[str], depends_on: Mapping[str, Sequence[str]], durations: Mapping[str, float],
+           count: int) -> List[Assignment]:
+    known = [durations[t] for t in tasks if t in durations]
+    default = sum(known) / len(known) if known else 1.0  # tasks without history are estimated at the average
+    groups = [(sum(durations.get(t, default) for t in g), g) for g in _groups(tasks, depends_on)]
+    groups.sort(key=lambda weighted: (-weighted[0], weighted[1][0]))
+    shards: List[List[str]] = [[] for _ in range(count)]
+    load = [0.0] * count
+    for weight, group in groups:
+        at = min(range(count), key=lambda i: (load[i], i))
+        shards[at].extend(group)
+        load[at] += weight
+    position = {t: i for i, t in enumerate(tasks)}
+    return [Assignment(sorted(shard, key=position.__getitem__), duration) for shard, duration in zip(shards, load)]
+
+
+def _groups(tasks: Sequence[str], depends_on: Mapping[str, Sequence[str]]) -> List[List[str]]:
+    """tasks connected by dependencies (in either direction), in selection order"""
+    parent = {t: t for t in tasks}
+
+    def root(task: str) -> str:
+        while parent[task] != task:
+            parent[task] = parent[parent[task]]
+            task = parent[task]
+        return task
+
+    for task in tasks:
+        for dependency in depends_on.get(task, []):
+            if dependency in parent:
+                parent[root(task)] = root(dependency)
+    groups: Dict[str, List[str]] = {}
+    for task in tasks:
+        groups.setdefault(root(task), []).append(task)
+    return list(groups.values())
+
+
+def shards_of(config: ToxConfig, count: int) -> List[Assignment]:
+    durations_file = config.shard_durations_file
+    return assign(config.run_tasks,
+                  {name: cast(RunTaskConfig, config.task_of(name)).depends_on for name in config.run_tasks},
+                  {} if durations_file is None else load_durations(durations_file), count)
+
+
+def select(config: ToxConfig, shard: Shard) -> List[str]:
+    """the tasks the shard should run"""
+    return shards_of(config, shard.total)[cast(int, shard.at) - 1].tasks
+
+
+async def list_shards(config: ToxConfig, shard: Shard) -> int:
+    """write the assignment of all shards as JSON to the standard output, e.g. to generate a CI matrix; unlike the
+    other list actions not via the logger, so it stays machine readable whatever the verbosity"""
+    content = [{'shard': f'{at}/{shard.total}', 'tasks': assignment.tasks, 'duration': assignment.duration}
+               for at, assignment in enumerate(shards_of(config, shard.total), start=1)]
+    sys.stdout.write(f'{json.dumps(content)}\n')
+    return 0
@@ -0,0 +1,264 @@
+"""keep rerunning the selected tasks as the project changes
+
+the process stays alive between the runs, so the parsed configuration, the resolved interpreters, the loaded
+environments and the build backend worker are reused; after a change only the tasks watching a changed file (see
+:meth:`toxn.config.models.task.base.TaskConfig.watch`) rerun, together with the tasks depending on these, and the
+project is rebuilt only if the sources the build watches changed (otherwise the build cache serves it)
+
+only sources count as changes: files git does not ignore (outside of git repositories the files outside hidden, cache
+and build output folders); changes are reported via inotify on Linux, by polling the project elsewhere
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple, cast
+
+from toxn.config import RunTaskConfig, ToxConfig, load as load_config
+from toxn.task import pep517
+from toxn.task.build_cache import skip_dir, source_files, walk
+from .run_tasks import run_tasks
+from .shard import select
+
+POLL_INTERVAL = 0.5  # seconds between scans of the project when polling
+SETTLE = 0.1  # changes come in bursts (saving many files, switching branches), wait for quiet before rerunning
+
+
+async def watch(config: ToxConfig, argv: Sequence[str], logger: logging.Logger) -> int:
+    """run the selected tasks, then rerun the ones affected by each change until interrupted"""
+    root_dir, work_dir = config.root_dir, config.work_dir
+    watcher = file_watcher(root_dir, work_dir)
+    try:
+        sources = set(await source_files(root_dir, work_dir, logger))
+        selected = config.run_tasks
+        await _run(config, logger)
+        config.recreated()
+        logger.info('watching %s for changes', root_dir)
+        while True:
+            changed = {p.relative_to(root_dir).as_posix() for p in await watcher.changes()}
+            current = set(await source_files(root_dir, work_dir, logger))
+            names = _changed_sources(changed, sources | current)
+            sources = current
+            if not names:
+                continue
+            changed_paths = {(root_dir / n).resolve() for n in names}
+            if config.config_path is not None and config.config_path.resolve() in changed_paths:
+                logger.info('configuration changed, reload it')
+                config = await load_config(argv)
+                config.recreated()
+                selected = config.run_tasks if config.shard is None else select(config, config.shard)
+                tasks = selected
+            else:
+                tasks = affected(selected,
+                                 {t: cast(RunTaskConfig, config.task_of(t)).depends_on for t in selected},
+                                 lambda task, name: config.task_of(task).watches(name), names)
+            if not tasks:
+                logger.info('%s changed, affects no task', ', '.join(names))
+                continue
+            logger.info('%s changed, rerun %s', ', '.join(names), ', '.join(tasks))
+            config.run_tasks = tasks
+            await _run(config, logger)
+            logger.info('watching %s for changes', root_dir)
+    finally:
+        watcher.close()
+        await pep517.shutdown()
+
+
+async def _run(config: ToxConfig, logger: logging.Logger) -> None:
+    """a failing run (e.g. the build backend or an install failed) does not end watching, a change may fix it"""
+    try:
+        await run_tasks(config, logger, keep_backend=True)
+    except SystemExit as exception:
+        logger.error('run failed with %s', exception.code)
+    except Exception:
+        logger.exception('run failed')
+
+
+def _changed_sources(changed: Set[str], sources: Set[str]) -> List[str]:
+    names = changed & sources
+    folders = tuple(f'{c}/' for c in changed - sources)  # folders moved or removed as a whole
+    if folders:
+        names.update(s for s in sources if s.startswith(folders))
+    return sorted(names)
+
+
+def affected(tasks: Sequence[str], depends_on: Mapping[str, Sequence[str]], watches: Callable[[str, str], bool],
+             changed: Sequence[str]) -> List[str]:
+    """the tasks watching any of the changed files and the ones depending on these, in selection order"""
+    hit = {t for t in tasks if any(watches(t, name) for name in changed)}
+    while True:
+        more = {t for t in tasks if t not in hit and any(d in hit for d in depends_on.get(t, []))}
+        if not more:
+            break
+        hit.update(more)
+    return [t for t in tasks if t in hit]
+
+
+class Watcher(ABC):
+    """reports changed files under the root dir (not looking into folders that hold no sources)"""
+
+    def __init__(self, root_dir: Path, work_dir: Path) -> None:
+        self.root_dir = root_dir
+        self.work_dir = work_dir
+
+    @abstractmethod
+    async def changes(self) -> Set[Path]:
+        """wait for changes (the ones since the last call included), returns the changed paths"""
+
+    def close(self) -> None:
+        pass
+
+
+def file_watcher(root_dir: Path, work_dir: Path) -> Watcher:
+    """inotify based on Linux, polling elsewhere (or when inotify cannot be used)"""
+    if sys.platform.startswith('linux'):
+        libc = _libc()
+        if libc is not None:
+            try:
+                return InotifyWatcher(root_dir, work_dir, libc)
+            except OSError as exception:
+                logging.debug('poll for changes as inotify failed with %r', exception)
+    return PollingWatcher(root_dir, work_dir)
+
+
+class PollingWatcher(Watcher):
+
+    def __init__(self, root_dir: Path, work_dir: Path) -> None:
+        super().__init__(root_dir, work_dir)
+        self._state = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        result: Dict[Path, Tuple[int, int]] = {}
+        for path in walk(self.root_dir, self.work_dir):
+            try:
+                stat = path.stat()
+            except OSError:  # removed meanwhile
+                continue
+            result[path] = stat.st_mtime_ns, stat.st_size
+        return result
+
+    async def changes(self) -> Set[Path]:
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            try:
+                state = self._scan()
+            except OSError:  # a folder removed while scanning, the next scan sees the result
+                continue
+            changed = {p for p in state.keys() | self._state.keys() if state.get(p) != self._state.get(p)}
+            self._state = state
+            if changed:
+                return changed
+
+
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+def _libc() -> Optional[ctypes.CDLL]:
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):  # not a glibc/musl like C library
+        return None
+    return libc
+
+
+class InotifyWatcher(Watcher):
+    _EVENT = struct.Struct('iIII')  # watch descriptor, mask, cookie, length of the name that follows
+
+    def __init__(self, root_dir: Path, work_dir: Path, libc: ctypes.CDLL) -> None:
+        super().__init__(root_dir, work_dir)
+        self._libc = libc
+        self._fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._folders: Dict[int, Path] = {}
+        self._changed: Set[Path] = set()
+        self._event = asyncio.Event()
+        try:
+            self._add_tree(root_dir)
+        except OSError:  # e.g. more folders than the limit of watches
+            os.close(self._fd)
+            raise
+        asyncio.get_event_loop().add_reader(self._fd, self._read)
+
+    def _add_tree(self, folder: Path) -> Set[Path]:
+        """watch the folder and the ones within, returns the files within"""
+        files: Set[Path] = set()
+        for current, dirs, names in os.walk(str(folder)):
+            dirs[:] = [d for d in dirs if not skip_dir(Path(current) / d, self.work_dir)]
+            descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(current), _MASK)
+            if descriptor < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch for {current} failed')
+            self._folders[descriptor] = Path(current)
+            files.update(Path(current) / name for name in names)
+        return files
+
+    def _read(self) -> None:
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return
+        at = 0
+        while at < len(data):
+            descriptor, mask, _, length = self._EVENT.unpack_from(data, at)
+            at += self._EVENT.size
+            name = os.fsdecode(data[at:at + length].rstrip(b'\0'))
+            at += length
+            if mask & _IN_Q_OVERFLOW:  # events got lost, report all files
+                self._changed.update(walk(self.root_dir, self.work_dir))
+                continue
+            folder = self._folders.get(descriptor)
+            if folder is None:
+                continue
+            if mask & _IN_IGNORED:  # the folder is gone
+                del self._folders[descriptor]
+                continue
+            path = folder / name
+            self._changed.add(path)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and not skip_dir(path, self.work_dir):
+                    try:
+                        self._changed.update(self._add_tree(path))
+                    except OSError as exception:
+                        logging.warning('will not see changes within %s as %s', path, exception)
+                elif mask & _IN_MOVED_FROM:
+                    self._remove_tree(path)
+        if self._changed:
+            self._event.set()
+
+    def _remove_tree(self, folder: Path) -> None:
+        for descriptor, path in list(self._folders.items()):
+            if path == folder or folder in path.parents:
+                self._libc.inotify_rm_watch(self._fd, descriptor)
+                del self._folders[descriptor]
+
+    async def changes(self) -> Set[Path]:
+        await self._event.wait()
+        while True:
+            self._event.clear()
+            await asyncio.sleep(SETTLE)
+            if not self._event.is_set():
+                break
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def close(self) -> None:
+        asyncio.get_event_loop().remove_reader(self._fd)
+        os.close(self._fd)
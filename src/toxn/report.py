@@ -0,0 +1,118 @@
+"""record where the time of a run goes: per task the phases (interpreter discovery, environment creation, install
+batches, commands) with their timings, exit codes and whether the result came from a cache"""
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from xml.etree import ElementTree  # noqa
+
+
+class Phase:
+
+    def __init__(self, kind: str, name: str) -> None:
+        self.kind: str = kind  # one of interpreter, venv, install, build, command
+        self.name: str = name
+        self.start: datetime = datetime.now()
+        self.duration: float = 0.0
+        self.exit_code: Optional[int] = None
+        self.cached: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'name': self.name, 'start': self.start.isoformat(), 'duration': self.duration,
+                'exit_code': self.exit_code, 'cached': self.cached}
+
+
+class TaskReport:
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.start: datetime = datetime.now()
+        self.duration: float = 0.0
+        self.exit_code: Optional[int] = None
+        self.phases: List[Phase] = []
+
+    @contextmanager
+    def phase(self, kind: str, name: str = '') -> Iterator[Phase]:
+        """time the body as a phase of the task (also when it fails)"""
+        phase = Phase(kind, name)
+        self.phases.append(phase)
+        try:
+            yield phase
+        finally:
+            phase.duration = (datetime.now() - phase.start).total_seconds()
+
+    def done(self, exit_code: Optional[int]) -> None:
+        self.exit_code = exit_code
+        self.duration = (datetime.now() - self.start).total_seconds()
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'name': self.name, 'start': self.start.isoformat(), 'duration': self.duration,
+                'exit_code': self.exit_code, 'phases': [p.to_json() for p in self.phases]}
+
+
+class RunReport:
+
+    def __init__(self) -> None:
+        self.start: datetime = datetime.now()
+        self.duration: float = 0.0
+        self.exit_code: Optional[int] = None
+        self.tasks: Dict[str, TaskReport] = {}
+
+    def task(self, name: str) -> TaskReport:
+        if name not in self.tasks:
+            self.tasks[name] = TaskReport(name)
+        return self.tasks[name]
+
+    def done(self, exit_code: Optional[int]) -> None:
+        self.exit_code = exit_code
+        self.duration = (datetime.now() - self.start).total_seconds()
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'start': self.start.isoformat(), 'duration': self.duration, 'exit_code': self.exit_code,
+                'tasks': [t.to_json() for t in self.tasks.values()]}
+
+    def to_junit(self) -> 'ElementTree.Element':
+        """a test suite with a test case per task, failed when the task did not exit with zero"""
+        from xml.etree import ElementTree
+        failures = [t for t in self.tasks.values() if t.exit_code]
+        suite = ElementTree.Element('testsuite', name='toxn', tests=str(len(self.tasks)),
+                                    failures=str(len(failures)), errors='0', time=f'{self.duration:.3f}',
+                                    timestamp=self.start.isoformat())
+        for task in self.tasks.values():
+            case = ElementTree.SubElement(suite, 'testcase', classname='toxn', name=task.name,
+                                          time=f'{task.duration:.3f}')
+            if task.exit_code:
+                ElementTree.SubElement(case, 'failure', message=f'exit code {task.exit_code}')
+            elif task.exit_code is None:
+                ElementTree.SubElement(case, 'skipped', message='cancelled')
+            out = ElementTree.SubElement(case, 'system-out')
+            out.text = '\n'.join(_describe(p) for p in task.phases)
+        return suite
+
+    def write(self, json_file: Optional[Path], junit_file: Optional[Path]) -> None:
+        if json_file is not None:
+            _atomic_write(json_file, json.dumps(self.to_json(), indent=2))
+        if junit_file is not None:
+            from xml.etree import ElementTree
+            _atomic_write(junit_file, ElementTree.tostring(self.to_junit(), encoding='unicode'))
+
+
+def _describe(phase: Phase) -> str:
+    text = f'{phase.kind} {phase.name}'.rstrip() + f' in {phase.duration:.3f}s'
+    if phase.cached:
+        text += ' (cached)'
+    if phase.exit_code is not None:
+        text += f' with {phase.exit_code}'
+    return text
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    os.makedirs(str(path.parent), exist_ok=True)
+    temp = path.parent / f'.{path.name}.{os.getpid()}'
+    with open(temp, 'wt') as file_handler:
+        file_handler.write(content)
+    os.replace(str(temp), str(path))
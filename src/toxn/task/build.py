@@ -3,97 +3,106 @@ import datetime
 import logging
 import os
 from pathlib import Path
-from typing import List, Optional, cast
+from typing import List, Optional, Tuple, cast
 
 from toxn.config.models.task.build import BuildTaskConfig, BuiltTaskConfig
-from toxn.config.models.venv import VEnvCreateParam
-from toxn.task.env.venv_pip.venv import VEnv, install, setup as setup_venv
-from toxn.task.util import TaskLogging, change_dir, install_params
-from toxn.util import CmdLineBufferPrinter, human_timedelta, list_to_cmd, rm_dir, run
+from toxn.report import TaskReport
+from toxn.task import build_cache, pep517
+from toxn.task.env import EnvCreateParam, TaskEnv, task_env
+from toxn.task.util import TaskLogging, install_params
+from toxn.util import human_timedelta, list_to_cmd, rm_dir
 
 LOGGER = TaskLogging(logging.getLogger(__name__), {'task': 'build'})
 
 
-async def build(config: BuildTaskConfig) -> BuiltTaskConfig:
+async def build(config: BuildTaskConfig, keep_backend: bool = False,
+                report: Optional[TaskReport] = None) -> BuiltTaskConfig:
+    """build the project, keep_backend leaves the build backend worker running to serve later builds"""
     start = datetime.datetime.now()
     result = None
     name = 'build'
+    report = report or TaskReport(name)
+    exit_code: Optional[int] = 1
     try:
         LOGGER.info('build project %s as %s', config.root_dir, config.build_type)
-        env = await setup_venv(VEnvCreateParam(config.recreate, config.work_dir, name, config.python, LOGGER))
-        config.venv = env
-        await install(env, install_params(f'build requires',
-                                          config.build_requires,
-                                          config))
+        params = EnvCreateParam(config.recreate, config.work_dir, name, config.python, LOGGER, report)
+        key: Optional[str] = None
+        if config.build_cache:
+            key = await build_cache.build_key(config, LOGGER)
+            cached = None if config.recreate else build_cache.load(config, key)
+            if cached is not None:
+                result, for_build_requires = cached
+                LOGGER.info('sources unchanged, reuse %s', result)
+                with report.phase('build', config.build_type) as phase:
+                    phase.cached = True
+                await task_env(config, params).existing()
+                exit_code = 0
+                return BuiltTaskConfig(config, for_build_requires, result)
 
-        out_dir = await _make_and_clean_out_dir(env)
-
-        with change_dir(config.root_dir, LOGGER):
-            if config.build_backend is not None:
-                for_build_requires = await _get_requires_for_build(env, config.build_type,
-                                                                   cast(str, config.build_backend_base),
-                                                                   cast(str, config.build_backend_full))
-                await install(env, install_params(f'for build requires',
-                                                  for_build_requires,
-                                                  config))
-            else:
-                for_build_requires = []
-
-            result = await _build(env, out_dir, config.build_type,
-                                  config.build_backend_base, config.build_backend_full)
+        env = task_env(config, params)
+        try:
+            result, for_build_requires = await _build(env, config, keep_backend, report)
             built_package = result
-        for command in config.teardown_commands:
-            LOGGER.info('teardown: %s$ %s', config.root_dir, list_to_cmd(command))
-            result_code = await run(command, logger=LOGGER, shell=True,
-                                    exit_on_fail=True)
-            if result_code:
-                break
+            if key is not None:
+                result = built_package = build_cache.store(config, key, built_package, for_build_requires, LOGGER)
+            for command in config.teardown_commands:
+                LOGGER.info('teardown: %s$ %s', config.root_dir, list_to_cmd(command))
+                with report.phase('command', list_to_cmd(command)) as phase:
+                    result_code = phase.exit_code = await env.run(command, env=dict(os.environ), shell=True,
+                                                                  exit_on_fail=True, cwd=config.root_dir)
+                if result_code:
+                    break
+        finally:
+            await env.teardown()
+        exit_code = 0
         return BuiltTaskConfig(config, for_build_requires, built_package)
     finally:
+        report.done(exit_code)
         LOGGER.info('built %s in %s', result, human_timedelta(datetime.datetime.now() - start))
 
 
-async def _build(env: VEnv,
-                 out_dir: Path,
-                 build_type: str,
-                 build_backend_base: Optional[str],
-                 build_backend_full: Optional[str]) -> Path:
-    if build_backend_full is not None:
-        printer = CmdLineBufferPrinter(limit=1)
-        script = f"""
-import sys
-import {build_backend_base}        
-basename = {build_backend_full}.build_{build_type}(sys.argv[1])
-print(basename)
-"""
-        await run([env.params.executable, '-c', script, out_dir], stdout=printer, logger=LOGGER)
-        result = out_dir / printer.last
+async def _build(env: TaskEnv, config: BuildTaskConfig, keep_backend: bool,
+                 report: TaskReport) -> Tuple[Path, List[str]]:
+    """the build runs with the interpreter of the environment (the ``python_exec`` of the configuration)"""
+    await env.create()
+    await env.install([install_params(f'build requires', config.build_requires, config)])
+
+    out_dir = await _make_and_clean_out_dir(config.envdir)
+
+    if config.build_backend is not None:
+        worker = await _backend_worker(env, config)
+        try:
+            for_build_requires = await worker.get_requires_for_build(config.build_type)
+            await env.install([install_params(f'for build requires', for_build_requires, config)])
+            worker = await _backend_worker(env, config)  # restarted if the environment changed
+            with report.phase('build', config.build_type):
+                result = await worker.build(config.build_type, out_dir)
+        finally:
+            if not keep_backend:
+                await worker.close()
     else:
-        build_cmd = 'sdist' if build_type == 'sdist' else 'bdist_wheel'
-        await run([env.params.executable, 'base.py', build_cmd, '--dist-dir', out_dir, "--formats=zip"],
-                  logger=LOGGER)
-        # noinspection PyTypeChecker
-        result = next(out_dir.iterdir())
-    return result
+        for_build_requires = []
+        with report.phase('build', config.build_type):
+            result = await _build_setup_py(env, config.python_exec, config.root_dir, out_dir, config.build_type)
+    return result, for_build_requires
+
+
+async def _backend_worker(env: TaskEnv, config: BuildTaskConfig) -> pep517.BackendWorker:
+    return await pep517.get_worker(config.python_exec, config.root_dir, cast(str, config.build_backend),
+                                   LOGGER, env.installed_at())
 
 
-async def _get_requires_for_build(env: VEnv,
-                                  build_type: str,
-                                  build_backend_base: str,
-                                  build_backend_full: str) -> List[str]:
-    printer = CmdLineBufferPrinter(limit=1)
-    script = f"""
-import {build_backend_base}        
-import json
-for_build_requires = {build_backend_full}.get_requires_for_build_{build_type}(None)
-print(json.dumps(for_build_requires))
-        """
-    await run([str(env.params.executable), '-c', script], stdout=printer, logger=LOGGER)
-    return cast(List[str], printer.json)
+async def _build_setup_py(env: TaskEnv, python: Path, root_dir: Path, out_dir: Path, build_type: str) -> Path:
+    build_cmd = 'sdist' if build_type == 'sdist' else 'bdist_wheel'
+    # like before task environments, with the environment variables of toxn (not the stripped ones of tasks)
+    await env.run([python, 'base.py', build_cmd, '--dist-dir', out_dir,
+                   "--formats=zip"], env=dict(os.environ), cwd=root_dir)
+    # noinspection PyTypeChecker
+    return next(out_dir.iterdir())
 
 
-async def _make_and_clean_out_dir(env: VEnv) -> Path:
-    out_dir = env.params.root_dir / '.out'
+async def _make_and_clean_out_dir(env_dir: Path) -> Path:
+    out_dir = env_dir / '.out'
     if out_dir.exists():
         if not out_dir.is_dir():
             rm_dir(out_dir, 'package destination is a file', LOGGER)
@@ -0,0 +1,114 @@
+"""content addressed store of built packages, keyed by the inputs of the build"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from toxn.config.models.task.build import BuildTaskConfig
+from toxn.task.interpreters import find_python
+from toxn.util import CmdLineBufferPrinter, Loggers, digest_file, rm_dir, run
+
+KEEP_ENTRIES = 4  # number of most recently used builds kept in the store
+_SKIP_DIRS = {'__pycache__', 'build', 'dist'}
+_DIGESTS: Dict[Path, Tuple[Tuple[int, int], str]] = {}  # a long running process (watch) hashes only changed files
+
+
+def store_dir(config: BuildTaskConfig) -> Path:
+    return config.project_work_dir / '.build_cache'
+
+
+async def build_key(config: BuildTaskConfig, logger: Loggers) -> str:
+    """hash of everything that determines the built package (of the sources only the ones the build watches)"""
+    python = await find_python(config.python, logger)
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([config.build_requires, config.build_backend, config.build_type,
+                              str(python.exe), python.version]).encode('utf-8'))
+    root_dir = config.root_dir
+    for name in sorted(await source_files(root_dir, config.project_work_dir, logger)):
+        path = root_dir / name
+        if config.watches(name) and path.is_file():
+            hasher.update(f'{name}\0{_digest(path)}\0'.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _digest(path: Path) -> str:
+    stat = path.stat()
+    state = stat.st_mtime_ns, stat.st_size
+    known = _DIGESTS.get(path)
+    if known is None or known[0] != state:
+        known = _DIGESTS[path] = state, digest_file(path)
+    return known[1]
+
+
+async def source_files(root_dir: Path, work_dir: Path, logger: Loggers) -> List[str]:
+    """files tracked by git (or not ignored by it), all files under the root when not a git repository"""
+    printer = CmdLineBufferPrinter(limit=None, live_print=False)
+    try:
+        code = await run(['git', '-c', 'core.quotepath=off', 'ls-files', '--cached', '--others', '--exclude-standard'],
+                         logger=logger, stdout=printer, exit_on_fail=False, cwd=root_dir)
+    except OSError:
+        code = -1
+    if code == 0:
+        files = [line.rstrip('\n') for line in printer.elements]
+        try:
+            inner = f'{work_dir.relative_to(root_dir).as_posix()}/'
+        except ValueError:  # work dir outside of the project
+            return files
+        return [f for f in files if not f.startswith(inner)]
+    logger.debug('could not list files via git, hash all files under %s', root_dir)
+    return [path.relative_to(root_dir).as_posix() for path in walk(root_dir, work_dir)]
+
+
+def walk(folder: Path, work_dir: Path) -> Iterator[Path]:
+    """the source files under the folder"""
+    for entry in os.scandir(str(folder)):
+        path = Path(entry.path)
+        if entry.is_dir(follow_symlinks=False):
+            if not skip_dir(path, work_dir):
+                yield from walk(path, work_dir)
+        elif entry.is_file() and not entry.name.endswith(('.pyc', '.pyo')):
+            yield path
+
+
+def skip_dir(path: Path, work_dir: Path) -> bool:
+    """folders not holding sources: hidden ones, caches, build outputs and the work dir"""
+    name = path.name
+    return name.startswith('.') or name in _SKIP_DIRS or name.endswith('.egg-info') or path == work_dir
+
+
+def load(config: BuildTaskConfig, key: str) -> Optional[Tuple[Path, List[str]]]:
+    """the package and for build requirements stored for the key"""
+    entry = store_dir(config) / key
+    meta = entry / 'build.json'
+    if not meta.exists():
+        return None
+    with open(meta, 'rt') as file_handler:
+        content = json.load(file_handler)
+    package = entry / content['package']
+    if not package.exists():
+        return None
+    os.utime(str(entry))  # mark as recently used
+    return package, content['for_build_requires']
+
+
+def store(config: BuildTaskConfig, key: str, package: Path, for_build_requires: List[str], logger: Loggers) -> Path:
+    """move a freshly built package into the store and drop the least recently used entries"""
+    folder = store_dir(config)
+    entry = folder / key
+    temp = folder / f'.{key}.{os.getpid()}'
+    rm_dir(temp, 'stale build store entry', logger)
+    os.makedirs(str(temp))
+    shutil.copy2(str(package), str(temp / package.name))
+    with open(temp / 'build.json', 'wt') as file_handler:
+        json.dump({'package': package.name, 'for_build_requires': for_build_requires}, file_handler)
+    rm_dir(entry, 'replace build store entry', logger)
+    os.replace(str(temp), str(entry))
+    logger.debug('stored %s as %s', package.name, entry)
+
+    entries = sorted((p for p in folder.iterdir() if not p.name.startswith('.')),
+                     key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in entries[KEEP_ENTRIES:]:
+        rm_dir(old, 'least recently used build', logger)
+    return entry / package.name
@@ -0,0 +1,46 @@
+"""task environments, the built in one is venv + pip, others are plugins registered under the ``toxn.task_env``
+entry point group; plugins are only looked up when a task asks for an environment type that is not built in"""
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Dict, Iterable, Type, cast
+
+from toxn.config.models.task.base import TaskConfig
+from .api import EnvCreateParam as EnvCreateParam, TaskEnv as TaskEnv
+
+ENTRY_POINT = 'toxn.task_env'
+BUILTIN: Dict[str, str] = {'venv-pip': 'toxn.task.env.venv_pip.venv_pip:VenvPip'}
+
+
+def task_env(config: TaskConfig, params: EnvCreateParam) -> TaskEnv:
+    """the environment of a task, of the type the task asks for"""
+    return env_type(config.env_type)(config, params)
+
+
+@lru_cache(maxsize=None)
+def env_type(name: str) -> Type[TaskEnv]:
+    if name in BUILTIN:
+        module, attr = BUILTIN[name].split(':')
+        return cast(Type[TaskEnv], getattr(import_module(module), attr))
+    plugins = _entry_points()
+    if name not in plugins:
+        known = sorted(set(BUILTIN) | set(plugins))
+        raise ValueError(f'unknown task environment type {name!r}, known: {", ".join(known)}')
+    result = plugins[name].load()
+    if not (isinstance(result, type) and issubclass(result, TaskEnv)):
+        raise ValueError(f'task environment type {name!r} ({plugins[name]}) is not a {TaskEnv.__name__}')
+    return result
+
+
+def _entry_points() -> Dict[str, Any]:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # pragma: no cover # before Python 3.8
+        from pkg_resources import iter_entry_points  # type: ignore
+        return {e.name: e for e in iter_entry_points(ENTRY_POINT)}
+    found: Any = entry_points()
+    group: Iterable[Any]
+    if hasattr(found, 'select'):  # Python 3.10+
+        group = found.select(group=ENTRY_POINT)
+    else:  # pragma: no cover # a dict of groups before
+        group = found.get(ENTRY_POINT, ())
+    return {e.name: e for e in group}
@@ -1,17 +1,67 @@
-from abc import abstractmethod
-from typing import List
+from abc import ABCMeta, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, MutableMapping, NamedTuple, Optional, Sequence
 
+from toxn.config.models.task.base import TaskConfig
+from toxn.config.models.venv import Install
+from toxn.util import Cmd, Loggers, StreamCallback, print_to_sdterr, print_to_sdtout, run
 
-class TaskEnv:
+if TYPE_CHECKING:
+    from toxn.report import TaskReport  # noqa
+
+
+class EnvCreateParam(NamedTuple):
+    """what any kind of task environment is created with"""
+    recreate: bool
+    dir: Path  # where the environment lives
+    name: str
+    python: str  # the interpreter asked for
+    logger: Loggers
+    report: Optional['TaskReport'] = None  # record the time spent in creating and provisioning the environment
+    installs: Sequence[Install] = ()  # the batches known before creating it, e.g. to restore it from a cache of these
+
+
+class TaskEnv(metaclass=ABCMeta):
+    """the environment a task runs in: created, provisioned with packages, commands run within it, torn down
+
+    implementations are registered under the ``toxn.task_env`` entry point group, and selected per task via its
+    ``env_type`` key; an instance serves a single task, and is constructed with the configuration of the task and
+    the parameters of its environment (where it lives, the interpreter to use, etc.); what the configuration exposes
+    of a created environment (e.g. for the ``envbindir`` substitution) is up to the implementation
+    """
+
+    def __init__(self, config: TaskConfig, params: EnvCreateParam) -> None:
+        self.config: TaskConfig = config
+        self.params: EnvCreateParam = params
 
     @abstractmethod
-    def __init__(self) -> None:
-        """create the environment"""
+    async def create(self) -> None:
+        """create the environment (or reuse it if already created and still valid)"""
+
+    async def existing(self) -> bool:
+        """load the environment if it was already created, False if that would need creating it"""
+        return False
 
     @abstractmethod
-    def add_dependencies(self, deps: List[str]) -> None:
-        """add dependencies"""
+    async def install(self, installs: Sequence[Install]) -> None:
+        """install the batches of packages in order (the environment may be recreated to do so)"""
 
     @abstractmethod
-    def run(self, cmd: List[str]) -> None:
-        """"""
+    def environ(self) -> MutableMapping[str, str]:
+        """the environment variables commands run with (before the task applies its own)"""
+
+    def installed_at(self) -> float:
+        """a timestamp changing whenever packages got installed into the environment (0.0 if not tracked)"""
+        return 0.0
+
+    async def run(self, cmd: Cmd,
+                  stdout: StreamCallback = print_to_sdtout, stderr: StreamCallback = print_to_sdterr,
+                  env: Optional[MutableMapping[str, str]] = None, shell: bool = False, exit_on_fail: bool = True,
+                  cwd: Optional[Path] = None, isolate: bool = False) -> int:
+        """run a command within the environment (isolate: see :func:`toxn.util.run`)"""
+        return await run(cmd, logger=self.params.logger, stdout=stdout, stderr=stderr,
+                         env=self.environ() if env is None else env, shell=shell, exit_on_fail=exit_on_fail,
+                         cwd=cwd, isolate=isolate)
+
+    async def teardown(self) -> None:
+        """release what the environment holds on to once the task finished"""
@@ -0,0 +1,182 @@
+"""environments shared by the tasks that would provision identical ones (see
+:meth:`toxn.config.RunTaskConfig.env_identity`)
+
+a registry within the folder of the shared environments records the tasks using each of them, an environment no task
+uses anymore (e.g. as the dependencies of the tasks changed, or the task no longer shares it) is removed unless a
+process still runs in it; within a run tasks sharing an environment provision it one at a time, and recreate it at
+most once
+
+toxn processes of the same project coordinate via lock files next to the environments: one guarding the registry, one
+per environment held while creating or installing into it, and one per environment each process using it holds
+shared (the environment is only removed by whoever gets it exclusively)
+"""
+import json
+import os
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+from toxn.config import RunTaskConfig, ToxConfig
+from toxn.util import FileLock, KeyedLocks, Loggers, rm_dir
+
+REGISTRY = 'registry.json'
+
+_LOCKS = KeyedLocks()
+_users: Dict[Path, int] = {}  # tasks of this process currently using the environment
+_using: Dict[Path, FileLock] = {}  # the environments this process uses, to their lock shared with other processes
+_recreated: Set[Path] = set()
+
+
+class EnvLock:
+    """held while creating or installing into the environment of a task, by one task of all processes at a time"""
+
+    def __init__(self, config: RunTaskConfig) -> None:
+        self._lock = _LOCKS(config.env_dir)
+        self._file = None if config.env_identity is None else FileLock(_lock_file(config.env_dir, 'lock'))
+
+    async def __aenter__(self) -> 'EnvLock':
+        await self._lock.acquire()
+        try:
+            if self._file is not None:
+                await self._file.__aenter__()
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        try:
+            if self._file is not None:
+                self._file.release()
+        finally:
+            self._lock.release()
+
+
+def lock(config: RunTaskConfig) -> EnvLock:
+    """held while creating or installing into the environment of the task"""
+    return EnvLock(config)
+
+
+async def acquire(config: RunTaskConfig, logger: Loggers) -> bool:
+    """the task starts using its environment, True if it may be recreated (not yet recreated within this run)"""
+    env_dir = config.env_dir
+    _users[env_dir] = _users.get(env_dir, 0) + 1
+    identity = config.env_identity
+    if identity is not None:
+        try:
+            await _use(env_dir, config.name, identity, logger)
+        except BaseException:
+            release(config)
+            raise
+    if env_dir in _recreated:
+        return False
+    _recreated.add(env_dir)
+    return True
+
+
+async def _use(env_dir: Path, task: str, identity: str, logger: Loggers) -> None:
+    waiting: Optional[FileLock] = None
+    async with FileLock(_registry_lock(env_dir.parent)):
+        _register(env_dir.parent, task, identity, logger)
+        if env_dir not in _using:
+            using = _using[env_dir] = FileLock(_lock_file(env_dir, 'use'), shared=True)
+            if not using.try_acquire():  # only where shared locks exclude each other (Windows), wait outside
+                waiting = using
+    if waiting is not None:
+        await waiting.__aenter__()
+
+
+def release(config: RunTaskConfig) -> None:
+    env_dir = config.env_dir
+    _users[env_dir] -= 1
+    if not _users[env_dir]:
+        del _users[env_dir]
+        using = _using.pop(env_dir, None)
+        if using is not None:
+            using.release()
+
+
+async def prune(config: ToxConfig, logger: Loggers) -> None:
+    """unregister the tasks that no longer use the environment they are registered with (as they do not share an
+    environment anymore, or are no longer part of the project), removing the environments no task uses"""
+    folder = config.work_dir / '.envs'
+    if not (folder / REGISTRY).exists():
+        return
+    known = set(config.tasks) | set(config.matrix_tasks)
+
+    def identity(task: str, registered: str) -> Optional[str]:
+        task_config = config.task_of(task) if task in known else None
+        if not isinstance(task_config, RunTaskConfig):
+            return None
+        try:
+            return task_config.env_identity
+        except Exception:  # e.g. a substitution failing, surfaces once the task runs
+            return registered
+
+    async with FileLock(_registry_lock(folder)):
+        identities = {t: identity(t, i) for i, tasks in _load(folder).items() for t in tasks}
+        _prune(folder, identities, logger)
+
+
+def _register(folder: Path, task: str, identity: str, logger: Loggers) -> None:
+    """record the environment the task uses, and remove the ones no task uses anymore"""
+    registry = _load(folder)
+    if task in registry.get(identity, []):
+        return
+    for tasks in registry.values():
+        if task in tasks:
+            tasks.remove(task)
+    registry.setdefault(identity, []).append(task)
+    _remove_unused(folder, registry, f'no task uses anymore (last {task})', logger)
+    _store(folder, registry)
+
+
+def _prune(folder: Path, identities: Mapping[str, Optional[str]], logger: Loggers) -> None:
+    registry = _load(folder)
+    for identity, tasks in registry.items():
+        tasks[:] = [t for t in tasks if identities.get(t) == identity]
+    _remove_unused(folder, registry, 'no task uses anymore', logger)
+    _store(folder, registry)
+
+
+def _remove_unused(folder: Path, registry: Dict[str, List[str]], msg: str, logger: Loggers) -> None:
+    """environments of no task are removed, unless a process uses them (these stay registered for a later run)"""
+    for identity, tasks in list(registry.items()):
+        env_dir = folder / identity
+        if tasks or env_dir in _users:
+            continue
+        using = FileLock(_lock_file(env_dir, 'use'))
+        if using.try_acquire():
+            try:
+                rm_dir(env_dir, msg, logger)
+                del registry[identity]
+                for kind in ('lock', 'use'):
+                    with suppress(OSError):  # Windows does not remove open files
+                        os.remove(str(_lock_file(env_dir, kind)))
+            finally:
+                using.release()
+
+
+def _lock_file(env_dir: Path, kind: str) -> Path:
+    return env_dir.parent / f'.{env_dir.name}.{kind}'
+
+
+def _registry_lock(folder: Path) -> Path:
+    return folder / f'.{REGISTRY}.lock'
+
+
+def _load(folder: Path) -> Dict[str, List[str]]:
+    try:
+        with open(folder / REGISTRY, 'rt') as file_handler:
+            registry: Dict[str, List[str]] = json.load(file_handler)
+            return registry
+    except (OSError, ValueError):
+        return {}
+
+
+def _store(folder: Path, registry: Dict[str, List[str]]) -> None:
+    os.makedirs(str(folder), exist_ok=True)
+    temp = folder / f'.{REGISTRY}.{os.getpid()}'
+    with open(temp, 'wt') as file_handler:
+        json.dump(registry, file_handler, indent=2, sort_keys=True)
+    os.replace(str(temp), str(folder / REGISTRY))
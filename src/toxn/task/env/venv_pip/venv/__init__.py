@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import os
+import pickle
+import re
+import sys
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, MutableMapping, Optional, Sequence, Union
+
+from toxn.config.models.task.base import VEnv
+from toxn.config.models.venv import Install, VEnvCreateParam, VEnvParams
+from toxn.report import TaskReport
+from toxn.task.interpreters import Python, find_python
+from toxn.util import CmdLineBufferPrinter, Loggers, list_to_cmd, print_to_sdtout, rm_dir, run
+from . import archive, template
+
+
+def strip_env_vars(bin_path: Path) -> MutableMapping[str, str]:
+    os_env = os.environ.copy()
+    paths = os_env.get('PATH', '').split(os.pathsep)
+    paths = [str(bin_path)] + paths
+    os_env['PATH'] = os.pathsep.join(paths)
+    if 'PYTHONPATH' in os_env:
+        del os_env['PYTHONPATH']
+    return os_env
+
+
+async def install(venv: VEnv, params: Install) -> None:
+    if params.packages:
+        cmd = list(params.base_cmd)
+        if params.find_links is not None:
+            cmd.extend(['--no-index', '--find-links', str(params.find_links)])
+        if params.use_develop:
+            cmd.append('-e')
+        cmd.extend(params.packages)
+        venv.logger.debug('install %s', list_to_cmd(cmd))
+        await run(cmd, env=strip_env_vars(venv.params.bin_path), shell=True, logger=venv.logger,
+                  exit_on_fail=True,
+                  stdout=partial(print_to_sdtout, level=logging.DEBUG),
+                  stderr=partial(print_to_sdtout, level=logging.ERROR))
+
+
+def plan_installs(installs: Sequence[Install]) -> List[Install]:
+    """merge consecutive batches installed via the same command into a single pip invocation
+
+    develop batches are installed on their own, as the editable flag applies to all packages of an invocation
+    """
+    plan: List[Install] = []
+    for batch in installs:
+        if not batch.packages:
+            continue
+        if plan and not batch.use_develop and not plan[-1].use_develop and plan[-1].base_cmd == batch.base_cmd \
+                and plan[-1].find_links == batch.find_links:
+            last = plan[-1]
+            plan[-1] = last._replace(batch_name=f'{last.batch_name}, {batch.batch_name}',
+                                     packages=last.packages + [p for p in batch.packages if p not in last.packages],
+                                     digest=None)
+        else:
+            plan.append(batch)
+    return plan
+
+
+Fingerprint = Dict[str, Any]
+
+
+async def ensure_installed(venv: VEnv, params: VEnvCreateParam, installs: Sequence[Install]) -> VEnv:
+    """install the batches (or the part of them) not yet present in the environment
+
+    batches are compared against the fingerprint recorded by previous installs: when a batch only grew just the
+    new packages are installed, when it changed in a non extending way the environment is recreated
+    """
+    report = params.report or TaskReport(params.name)
+    fingerprint = _load_fingerprint(params, venv)
+    before = json.dumps(fingerprint, sort_keys=True)
+    missing = _missing_installs(fingerprint, installs)
+    if missing is None:
+        venv = await setup(params._replace(recreate=True))
+        fingerprint = _load_fingerprint(params, venv)  # restored from an archive it already holds those batches
+        missing = _missing_installs(fingerprint, installs)
+        if missing is None:
+            fingerprint = _new_fingerprint(venv)
+            missing = [i for i in installs if i.packages]
+    elif not missing and any(i.packages for i in installs):
+        names = ', '.join(i.batch_name for i in installs if i.packages)
+        venv.logger.info('dependencies up to date (%s)', names)
+        with report.phase('install', names) as phase:
+            phase.cached = True
+    for batch in missing:
+        venv.logger.info('install %s %s', batch.batch_name, list_to_cmd(batch.packages))
+    for merged in plan_installs(missing):
+        with report.phase('install', merged.batch_name):
+            await install(venv, merged)
+    for batch in installs:
+        fingerprint['batches'][batch.batch_name] = {'packages': batch.packages,
+                                                    'cmd': batch.base_cmd,
+                                                    'develop': batch.use_develop,
+                                                    'digest': batch.digest}
+    if json.dumps(fingerprint, sort_keys=True) != before:
+        _store_fingerprint(params, fingerprint)
+    if params.archive is not None:
+        archive_file = params.archive.file(venv.python)
+        if not archive_file.exists():
+            venv.logger.info('export venv %s to %s', params.name, archive_file)
+            with report.phase('archive', params.name):
+                await asyncio.get_event_loop().run_in_executor(None, archive.export, archive_file, params,
+                                                               venv.params, venv.python, fingerprint['batches'])
+    return venv
+
+
+def _missing_installs(fingerprint: Fingerprint, installs: Sequence[Install]) -> Optional[List[Install]]:
+    """the installs still needed, or None if the environment needs to be recreated"""
+    missing: List[Install] = []
+    for batch in installs:
+        old = fingerprint['batches'].get(batch.batch_name)
+        if old is None or not old['packages']:
+            if batch.packages:
+                missing.append(batch)
+        elif old['cmd'] != batch.base_cmd or old['develop'] != batch.use_develop:
+            return None
+        elif batch.digest is not None or old['digest'] is not None:
+            if old['digest'] != batch.digest:
+                missing.append(batch)
+        else:
+            installed = set(old['packages'])
+            if not installed.issubset(batch.packages):
+                return None
+            new = [p for p in batch.packages if p not in installed]
+            if new:
+                missing.append(batch._replace(packages=new))
+    return missing
+
+
+def _new_fingerprint(venv: VEnv) -> Fingerprint:
+    return {'python': {'exe': str(venv.python.exe), 'version': venv.python.version}, 'batches': {}}
+
+
+def _load_fingerprint(params: VEnvCreateParam, venv: VEnv) -> Fingerprint:
+    fingerprint = _new_fingerprint(venv)
+    if params.fingerprint.exists():
+        with open(params.fingerprint, 'rt') as file_handler:
+            stored: Fingerprint = json.load(file_handler)
+        if stored.get('python') == fingerprint['python']:
+            return stored
+        params.logger.debug('interpreter changed since %s, reinstall dependencies', params.fingerprint)
+    return fingerprint
+
+
+def _store_fingerprint(params: VEnvCreateParam, fingerprint: Fingerprint) -> None:
+    params.logger.debug('write dependency fingerprint %s', params.fingerprint)
+    with open(params.fingerprint, 'wt') as file_handler:
+        json.dump(fingerprint, file_handler, indent=2, sort_keys=True)
+
+
+async def setup(params: VEnvCreateParam) -> VEnv:
+    """create a virtual environment"""
+    if params.recreate:
+        rm_dir(params.dir, 'recreate on', params.logger)
+
+    report = params.report or TaskReport(params.name)
+    cache = _load_cache(params)
+    if cache is not None:
+        with report.phase('venv', params.name) as phase:
+            phase.cached = True
+        return cache
+
+    with report.phase('interpreter', params.python):
+        base = await find_python(params.python, params.logger)
+    if params.fingerprint.exists():
+        params.fingerprint.unlink()
+    archive_file = None if params.archive is None else params.archive.file(base)
+    if archive_file is not None and archive_file.exists():
+        params.logger.info('restore venv %s at %r from %s', params.name, params.dir, archive_file)
+        with report.phase('venv', params.name) as phase:
+            venv_core, batches = await asyncio.get_event_loop().run_in_executor(None, archive.restore, archive_file,
+                                                                                params, base)
+            phase.cached = True
+        result = VEnv(base, venv_core, params.logger)
+        _store_fingerprint(params, dict(_new_fingerprint(result), batches=batches))
+    else:
+        with report.phase('venv', params.name):
+            if params.template is not None and base.major_version >= 3:
+                venv_core = await template.clone(base, params, _create_venv)
+            else:
+                venv_core = await _create_venv(base, params)
+        result = VEnv(base, venv_core, params.logger)
+
+    params.logger.debug(f'write virtualenv config {params.cache}')
+    with open(params.cache, mode='wb') as file:
+        result.logger = None  # type: ignore
+        pickle.dump(result, file)
+        result.logger = params.logger
+    return result
+
+
+def _env_deps_changed(params: VEnvCreateParam, venv: VEnv) -> bool:
+    return params.python != venv.python.python_name
+
+
+def _load_cache(venv: VEnvCreateParam) -> Optional[VEnv]:
+    if venv.cache.exists():
+        venv.logger.debug(f'load already existing virtualenv at {venv.cache}')
+        with open(venv.cache, mode='rb') as file:
+            result: VEnv = pickle.load(file)
+            result.logger = venv.logger
+        if not _env_deps_changed(venv, result):
+            return result
+        rm_dir(venv.dir, 'task core dependencies changed', venv.logger)
+    return None
+
+
+async def _create_venv(base_python: Python, venv: VEnvCreateParam) -> VEnvParams:
+    venv.logger.info('create venv %s at %r with %r', venv.name, venv.dir, base_python.version)
+    if base_python.major_version < 3:
+        venv_core = await _create_venv_python_2(base_python, venv.dir, venv.logger)
+    else:
+        venv_core = await _create_venv_python_3(base_python, venv.dir, venv.logger, venv.pip_wheel)
+    return venv_core
+
+
+async def _create_venv_python_3(base_python: Python, venv_dir: Path, logger: Loggers,
+                                pip_wheel: Optional[Path]) -> VEnvParams:
+    printer = CmdLineBufferPrinter(limit=1)
+    script = Path(__file__).parent / '_venv.py'
+    cmd: List[Union[str, Path]] = [base_python.exe, script, venv_dir]
+    if pip_wheel is not None:
+        cmd.extend(['--pip-wheel', pip_wheel])
+    await run(cmd=cmd, stdout=printer, logger=logger)
+    layout = printer.json
+    return VEnvParams(venv_dir, Path(layout['bin_path']), Path(layout['executable']), Path(layout['site_package']))
+
+
+async def _create_venv_python_2(base_python: Python, venv_dir: Path, logger: Loggers) -> VEnvParams:
+    printer = CmdLineBufferPrinter(limit=None)
+    await run([sys.executable, '-m', 'virtualenv', '--no-download', '--python',
+               base_python.exe, venv_dir], stdout=printer, logger=logger)
+    pattern = re.compile(r'New python executable in (.*)')
+    for line in printer.elements:
+        logger.info(line)
+        match = re.match(pattern, line)
+        if match:
+            executable = Path(match.group(1))
+            bin_path = executable.parent
+            break
+    else:
+        raise Exception('could not find executable')
+    return VEnvParams(venv_dir, bin_path, executable, await site_package(executable, logger))
+
+
+async def site_package(executable: Path, logger: Loggers) -> Path:
+    printer = CmdLineBufferPrinter(limit=1)
+
+    await run(cmd=[executable, '-c', 'from distutils.sysconfig import get_python_lib;'
+                                     'print(get_python_lib())'],
+              stdout=printer, logger=logger)
+    return Path(printer.last)
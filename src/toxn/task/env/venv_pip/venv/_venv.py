@@ -0,0 +1,57 @@
+"""create a virtual environment in a single pass, the last line printed is a JSON description of it
+
+runs within the base interpreter, so must work with all Python 3 versions tasks may use
+"""
+import argparse
+import json
+import os
+import subprocess
+import sysconfig
+import venv
+
+MYPY = False
+if MYPY:  # type comments and a guarded import, as this runs on any Python 3 interpreter a task may use
+    from types import SimpleNamespace  # noqa: F401
+    from typing import Any, Optional  # noqa: F401
+
+
+class EnvB(venv.EnvBuilder):
+    executable = None  # type: Optional[str]
+    bin_path = None  # type: Optional[str]
+
+    def __init__(self, pip_wheel, **kwargs):  # type: (Optional[str], Any) -> None
+        self.pip_wheel = pip_wheel
+        super().__init__(with_pip=pip_wheel is None, **kwargs)
+
+    def post_setup(self, context):  # type: (SimpleNamespace) -> None
+        self.bin_path = context.bin_path
+        self.executable = context.env_exe
+        if self.pip_wheel is not None:  # a wheel is a valid sys.path entry, so pip can install itself from it
+            subprocess.check_call([context.env_exe, os.path.join(self.pip_wheel, 'pip'), 'install',
+                                   '--no-index', '--no-cache-dir', '--disable-pip-version-check', '-q',
+                                   self.pip_wheel])
+
+
+def site_package(env_dir):  # type: (str) -> str
+    schemes = sysconfig.get_scheme_names()
+    scheme = 'venv' if 'venv' in schemes else ('nt' if os.name == 'nt' else 'posix_prefix')
+    return sysconfig.get_path('purelib', scheme, vars={'base': env_dir, 'platbase': env_dir})
+
+
+def main():  # type: () -> None
+    parser = argparse.ArgumentParser()
+    parser.add_argument('env_dir')
+    parser.add_argument('--pip-wheel', dest='pip_wheel', default=None,
+                        help='install pip from this wheel instead of via ensurepip')
+    options = parser.parse_args()
+
+    env_dir = os.path.abspath(options.env_dir)
+    env_build = EnvB(options.pip_wheel)
+    env_build.create(env_dir)
+    print(json.dumps({'bin_path': env_build.bin_path,
+                      'executable': env_build.executable,
+                      'site_package': site_package(env_dir)}))
+
+
+if __name__ == '__main__':
+    main()
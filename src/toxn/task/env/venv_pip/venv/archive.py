@@ -0,0 +1,89 @@
+"""export prepared virtual environments to compressed archives, and restore them at another location (or machine)
+
+the archive records where the environment and its base interpreter lived; on restore references to these (the
+shebang lines of scripts, activators, ``pyvenv.cfg``, symbolic links) are rewritten to the new locations
+"""
+import json
+import os
+import tarfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from toxn.config.models.venv import Python, VEnvCreateParam, VEnvParams
+from toxn.util import rm_dir
+from .template import _is_within, _refers_to_location, relocate_file
+
+META = '.toxn.archive.json'
+_COMPRESS_LEVEL = 1  # the environments are large, favour speed over size
+
+
+def export(file: Path, params: VEnvCreateParam, layout: VEnvParams, base: Python, batches: Dict[str, Any]) -> None:
+    """archive the environment (with the batches installed into it), atomically so readers never see partial ones"""
+    meta = {'root': str(params.dir), 'base': str(base.exe),
+            'layout': [str(Path(p).relative_to(params.dir)) for p in layout], 'batches': batches}
+    with open(params.dir / META, 'wt') as file_handler:
+        json.dump(meta, file_handler, indent=2)
+    os.makedirs(str(file.parent), exist_ok=True)
+    temp = file.parent / f'.{file.name}.{os.getpid()}'
+    try:
+        with tarfile.open(str(temp), 'w:gz', compresslevel=_COMPRESS_LEVEL) as archive:
+            for entry in sorted(os.listdir(str(params.dir))):
+                if not _skip(entry, params):
+                    archive.add(str(params.dir / entry), arcname=entry)
+        os.replace(str(temp), str(file))
+    finally:
+        if temp.exists():
+            temp.unlink()
+        (params.dir / META).unlink()
+
+
+def _skip(entry: str, params: VEnvCreateParam) -> bool:
+    # toxn bookkeeping refers to this machine, the log of the task is not part of the environment
+    return entry in (params.cache.name, params.fingerprint.name, 'log')
+
+
+def restore(file: Path, params: VEnvCreateParam, base: Python) -> Tuple[VEnvParams, Dict[str, Any]]:
+    """extract the environment to the location of the params, returns its layout and the batches installed"""
+    rm_dir(params.dir, 'restore archive into', params.logger)
+    temp = params.dir.parent / f'.{params.dir.name}.{os.getpid()}.restore'
+    rm_dir(temp, 'leftover of interrupted restore', params.logger)
+    with tarfile.open(str(file), 'r:gz') as archive:
+        extract: Dict[str, Any] = {'filter': 'tar'} if hasattr(tarfile, 'tar_filter') else {}
+        archive.extractall(str(temp), **extract)
+    meta_file = temp / META
+    with open(meta_file, 'rt') as file_handler:
+        meta = json.load(file_handler)
+    meta_file.unlink()
+    _relocate(temp, Path(meta['root']), params.dir, Path(meta['base']), base.exe)
+    os.replace(str(temp), str(params.dir))
+    return VEnvParams(*(params.dir / p for p in meta['layout'])), meta['batches']
+
+
+def _relocate(root: Path, old: Path, new: Path, old_base: Path, new_base: Path) -> None:
+    """rewrite references to the old location of the environment and its base interpreter"""
+    replace = [(os.fsencode(str(old)), os.fsencode(str(new)))]
+    if old_base.parent != new_base.parent:  # pyvenv.cfg records the folder of the base interpreter
+        replace.append((os.fsencode(str(old_base.parent)), os.fsencode(str(new_base.parent))))
+    for folder, dirs, files in os.walk(str(root)):
+        for name in dirs + files:
+            path = Path(folder) / name
+            if path.is_symlink():
+                link = _new_link(Path(os.readlink(str(path))), old, new, old_base, new_base)
+                if link is not None:
+                    path.unlink()
+                    os.symlink(str(link), str(path))
+            elif path.is_file() and _refers_to_location(path, root):
+                for old_value, new_value in replace:
+                    relocate_file(path, path, old_value, new_value)
+
+
+def _new_link(link: Path, old: Path, new: Path, old_base: Path, new_base: Path) -> Optional[Path]:
+    if not link.is_absolute():
+        return None
+    if _is_within(link, old):
+        return new / link.relative_to(old)
+    if link == old_base:
+        return new_base
+    if _is_within(link, old_base.parent):
+        return new_base.parent / link.relative_to(old_base.parent)
+    return None
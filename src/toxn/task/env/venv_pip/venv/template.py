@@ -0,0 +1,162 @@
+"""create virtual environments by cloning a template environment built once per interpreter
+
+files are shared with the template via copy-on-write clones where the file system supports it, and copied otherwise
+(hard links would let in place writes of one environment, e.g. appending to a ``.pth`` file, change the template and
+all other clones); files referring to the location of the template (scripts, activators, the configuration) are
+copied and rewritten instead; each interpreter and pip wheel has a template of its own, which one process at a time
+builds or clones
+"""
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from toxn.config.models.venv import Python, VEnvCreateParam, VEnvParams
+from toxn.util import FileLock, KeyedLocks, rm_dir
+
+META = '.toxn.template.json'
+_FICLONE = 0x40049409  # ioctl request for a copy-on-write clone of a file (Linux)
+_MAX_RELOCATE = 1 << 20  # larger files (e.g. copied interpreters) are binaries not referring to the location
+_LOCKS = KeyedLocks()
+
+
+Create = Callable[[Python, VEnvCreateParam], Awaitable[VEnvParams]]
+
+
+async def clone(base: Python, params: VEnvCreateParam, create: Create) -> VEnvParams:
+    """a new environment at the location of the params, cloned from the template of its interpreter
+
+    :param create: coroutine function creating a fresh environment (``create(base, params)``), to build the template
+    """
+    assert params.template is not None
+    template = template_dir(params.template, base, params.pip_wheel)
+    async with _LOCKS(str(template)), FileLock(template.parent / f'.{template.name}.lock'):
+        layout = _load_meta(template, base, params.pip_wheel)
+        if layout is None:
+            rm_dir(template, 'outdated template', params.logger)
+            params.logger.info('create venv template for %s at %s', base.python_name, template)
+            layout = await create(base, params._replace(dir=template, name=template.name))
+            _store_meta(template, base, params.pip_wheel, layout)
+        rm_dir(params.dir, 'clone template into', params.logger)
+        params.logger.info('create venv %s at %r cloned from %s', params.name, params.dir, template)
+        mode = await asyncio.get_event_loop().run_in_executor(None, clone_tree, template, params.dir)
+    params.logger.debug('cloned %s via %s', template, mode)
+    return relocate_layout(layout, template, params.dir)
+
+
+def template_dir(folder: Path, base: Python, pip_wheel: Optional[Path]) -> Path:
+    """the template within the folder for the interpreter and pip wheel"""
+    content = json.dumps(_meta_content(base, pip_wheel), sort_keys=True)
+    return folder / hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+def relocate_layout(layout: VEnvParams, src: Path, dest: Path) -> VEnvParams:
+    return VEnvParams(*(dest / Path(p).relative_to(src) for p in layout))
+
+
+def clone_tree(src: Path, dest: Path) -> str:
+    """clone a virtual environment into the destination folder, returns the method used to share files"""
+    linker = _Linker()
+    src_key, dest_key = os.fsencode(str(src)), os.fsencode(str(dest))
+    os.makedirs(str(dest))
+    for source, target in _walk(src, dest, src):
+        if source.is_symlink():
+            link = os.readlink(str(source))
+            if os.path.isabs(link) and _is_within(Path(link), src):
+                link = str(dest / Path(link).relative_to(src))
+            os.symlink(link, str(target))
+        elif source.is_dir():
+            os.makedirs(str(target))
+        elif not (_refers_to_location(source, src) and relocate_file(source, target, src_key, dest_key)):
+            linker(source, target)
+    return linker.mode
+
+
+def relocate_file(source: Path, target: Path, old: bytes, new: bytes) -> bool:
+    """copy a file replacing references to the old location with the new one, False if it has none"""
+    if source.stat().st_size > _MAX_RELOCATE:
+        return False
+    with open(source, 'rb') as file_handler:
+        content = file_handler.read()
+    if old not in content:
+        return False
+    with open(target, 'wb') as file_handler:
+        file_handler.write(content.replace(old, new))
+    shutil.copymode(str(source), str(target))
+    return True
+
+
+def _refers_to_location(source: Path, root: Path) -> bool:
+    # scripts (shebang lines, activators) and the venv configuration contain the absolute path of the environment
+    return source.parent == root or source.parent.parent == root and source.parent.name in ('bin', 'Scripts')
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    try:
+        path.relative_to(root)
+    except ValueError:
+        return False
+    return True
+
+
+def _walk(src: Path, dest: Path, root: Path) -> Iterator[Tuple[Path, Path]]:
+    """pairs of source and target paths, parents before their content"""
+    for entry in os.scandir(str(src)):
+        if src == root and entry.name == META:
+            continue
+        source, target = Path(entry.path), dest / entry.name
+        yield source, target
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk(source, target, root)
+
+
+class _Linker:
+    """share file content with the template, degrading reflink -> copy on the first failure"""
+
+    def __init__(self) -> None:
+        self.mode = 'reflink' if sys.platform.startswith('linux') else 'copy'
+
+    def __call__(self, source: Path, target: Path) -> None:
+        if self.mode == 'reflink':
+            try:
+                _reflink(source, target)
+                return
+            except OSError:
+                if target.exists():
+                    target.unlink()
+                self.mode = 'copy'
+        shutil.copy2(str(source), str(target))
+
+
+def _reflink(source: Path, target: Path) -> None:
+    import fcntl
+    with open(source, 'rb') as src_handler, open(target, 'wb') as dest_handler:
+        fcntl.ioctl(dest_handler.fileno(), _FICLONE, src_handler.fileno())
+    shutil.copystat(str(source), str(target))
+
+
+def _meta_content(base: Python, pip_wheel: Optional[Path]) -> Dict[str, Any]:
+    return {'python': {'exe': str(base.exe), 'version': base.version},
+            'pip_wheel': None if pip_wheel is None else str(pip_wheel)}
+
+
+def _load_meta(template: Path, base: Python, pip_wheel: Optional[Path]) -> Optional[VEnvParams]:
+    meta = template / META
+    if not meta.exists():
+        return None
+    with open(meta, 'rt') as file_handler:
+        content = json.load(file_handler)
+    if {k: content.get(k) for k in ('python', 'pip_wheel')} != _meta_content(base, pip_wheel):
+        return None
+    return VEnvParams(*(Path(p) for p in content['layout']))
+
+
+def _store_meta(template: Path, base: Python, pip_wheel: Optional[Path], layout: VEnvParams) -> None:
+    content = _meta_content(base, pip_wheel)
+    content['layout'] = [str(p) for p in layout]
+    with open(template / META, 'wt') as file_handler:
+        json.dump(content, file_handler, indent=2)
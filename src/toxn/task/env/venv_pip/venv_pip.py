@@ -3,17 +3,40 @@
 -- via venv on Python 3
 -- virtualenv on Python 2
 - and installs dependencies via pip"""
-from typing import List
+from typing import MutableMapping, Sequence, cast
 
-from toxn.task.env.api import TaskEnv
+from toxn.config.models.task.base import TaskConfig
+from toxn.config.models.task.run import RunTaskConfig
+from toxn.config.models.venv import Archive, Install, VEnv, VEnvCreateParam
+from toxn.task.env.api import EnvCreateParam, TaskEnv
+from .venv import ensure_installed, setup, strip_env_vars
 
 
 class VenvPip(TaskEnv):
-    def __init__(self) -> None:
-        super().__init__()
+    """the created virtual environment is exposed as the ``venv`` of the task configuration"""
 
-    def add_dependencies(self, deps: List[str]) -> None:
-        pass
+    def __init__(self, config: TaskConfig, params: EnvCreateParam) -> None:
+        super().__init__(config, params)
+        archive_dir = config.env_archive_dir if isinstance(config, RunTaskConfig) else None
+        self.venv_params = VEnvCreateParam(params.recreate, params.dir, params.name, params.python, params.logger,
+                                           config.pip_wheel, config.venv_template, params.report,
+                                           None if archive_dir is None else Archive.of(archive_dir, params.installs))
 
-    def run(self, cmd: List[str]) -> None:
-        pass
+    async def create(self) -> None:
+        self.config.venv = await setup(self.venv_params)
+
+    async def existing(self) -> bool:
+        if self.venv_params.cache.exists():  # loading an already created environment is cheap
+            await self.create()
+            return True
+        return False
+
+    async def install(self, installs: Sequence[Install]) -> None:
+        self.config.venv = await ensure_installed(cast(VEnv, self.config.venv), self.venv_params, installs)
+
+    def environ(self) -> MutableMapping[str, str]:
+        return strip_env_vars(cast(VEnv, self.config.venv).params.bin_path)
+
+    def installed_at(self) -> float:
+        fingerprint = self.venv_params.fingerprint
+        return fingerprint.stat().st_mtime if fingerprint.exists() else 0.0
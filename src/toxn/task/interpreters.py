@@ -1,24 +1,87 @@
+import json
 import os
 import re
 import sys
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import py  # type: ignore
 
+from toxn.config.models.core import tox_sys_dir
 from toxn.config.models.venv import Python, VersionInfo
-from toxn.util import CmdLineBufferPrinter, Loggers, run
+from toxn.util import CmdLineBufferPrinter, KeyedLocks, Loggers, run
 
 
 class CouldNotFindInterpreter(ValueError):
     pass
 
 
+class InterpreterRegistry:
+    """resolves every interpreter name once per process (concurrent lookups of the same name wait for the first)
+
+    the version information is persisted on disk keyed by the executable, and invalidated when the executables
+    modification time or inode changes; so the interpreter is only queried when it changed
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None) -> None:
+        self._cache_file: Optional[Path] = cache_file
+        self._resolved: Dict[str, Python] = {}
+        self._locks = KeyedLocks()
+        self._known: Optional[Dict[str, Any]] = None
+
+    @property
+    def cache_file(self) -> Path:
+        if self._cache_file is None:
+            self._cache_file = tox_sys_dir() / 'interpreters.json'
+        return self._cache_file
+
+    async def find(self, python: str, logger: Loggers) -> Python:
+        if python not in self._resolved:
+            async with self._locks(python):
+                if python not in self._resolved:
+                    self._resolved[python] = await self._resolve(python, logger)
+        return self._resolved[python]
+
+    async def _resolve(self, python: str, logger: Loggers) -> Python:
+        exe = get_interpreter(python, logger)
+        stat = exe.stat()
+        known = self._load()
+        entry = known.get(str(exe))
+        if entry is not None and entry['mtime'] == stat.st_mtime and entry['inode'] == stat.st_ino:
+            logger.debug('interpreter info for %s from %s', exe, self.cache_file)
+            return Python(python, exe, entry['version'], tuple(entry['version_info']))  # type: ignore
+        version, version_info = await get_python_info(exe, logger)
+        known[str(exe)] = {'mtime': stat.st_mtime, 'inode': stat.st_ino,
+                           'version': version, 'version_info': version_info}
+        self._store(known)
+        return Python(python, exe, version, version_info)
+
+    def _load(self) -> Dict[str, Any]:
+        if self._known is None:
+            self._known = {}
+            if self.cache_file.exists():
+                try:
+                    with open(self.cache_file, 'rt') as file_handler:
+                        self._known = json.load(file_handler)
+                except ValueError:
+                    pass
+        return self._known
+
+    def _store(self, known: Dict[str, Any]) -> None:
+        os.makedirs(str(self.cache_file.parent), exist_ok=True)
+        temp = self.cache_file.with_name(f'{self.cache_file.name}.{os.getpid()}')
+        with open(temp, 'wt') as file_handler:
+            json.dump(known, file_handler, indent=2, sort_keys=True)
+        os.replace(str(temp), str(self.cache_file))
+
+
+REGISTRY = InterpreterRegistry()
+
+
 async def find_python(python: str, logger: Loggers) -> Python:
-    base_python_exe = get_interpreter(python, logger)
-    logger.info('%s resolves as %s', python, base_python_exe)
-    version, version_info = await get_python_info(base_python_exe, logger)
-    return Python(python, base_python_exe, version, version_info)
+    result = await REGISTRY.find(python, logger)
+    logger.info('%s resolves as %s', python, result.exe)
+    return result
 
 
 async def get_python_info(base_python_exe: Path, logger: Loggers) -> Tuple[str, VersionInfo]:
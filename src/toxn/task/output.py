@@ -0,0 +1,55 @@
+"""the output of the commands of a task: all of it goes to the log file of the task, the console gets it according
+to the console mode (live, tail on failure, summary)"""
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from types import TracebackType
+from typing import Deque, Optional, Tuple, Type
+
+from toxn.util import TAIL, Loggers
+
+_BUFFER = 1 << 16
+
+
+class CommandOutput:
+
+    def __init__(self, log_file: Path, console: str, logger: Loggers, tail: int = TAIL) -> None:
+        self.log_file: Path = log_file
+        self.console: str = console
+        self.logger: Loggers = logger
+        self.tail: Deque[Tuple[int, str]] = deque(maxlen=tail)
+        os.makedirs(str(log_file.parent), exist_ok=True)
+        self._file = open(log_file, 'wt', encoding='utf-8', buffering=_BUFFER)
+
+    def __enter__(self) -> 'CommandOutput':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self._file.close()
+
+    def command(self, cmd: str) -> None:
+        self._file.write(f'$ {cmd}\n')
+        self.tail.clear()
+
+    def stdout(self, logger: Loggers, line: str) -> None:
+        self._write(logger, line, logging.INFO)
+
+    def stderr(self, logger: Loggers, line: str) -> None:
+        self._write(logger, line, logging.ERROR)
+
+    def _write(self, logger: Loggers, line: str, level: int) -> None:
+        self._file.write(line if line.endswith('\n') else f'{line}\n')
+        if self.console == 'live':
+            logger.log(level, line.rstrip())
+        else:
+            self.tail.append((level, line.rstrip()))
+
+    def failed(self, exit_code: int) -> None:
+        """show what the failing command printed last (unless it was already shown)"""
+        self._file.flush()
+        if self.console == 'tail':
+            for level, line in self.tail:
+                self.logger.log(level, line)
+        self.logger.error('exit code %s, full output in %s', exit_code, self.log_file)
@@ -0,0 +1,112 @@
+"""talk to the build backend of a project (PEP 517) through a long lived worker process
+
+the backend is imported once per worker, and a worker may be kept alive to serve multiple builds
+"""
+import asyncio
+import json
+import logging
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from toxn.util import Loggers, print_to_sdtout, read_stream
+
+_SCRIPT = Path(__file__).parent / '_backend.py'
+
+
+class BackendWorker:
+
+    def __init__(self, executable: Path, root_dir: Path, backend: str, logger: Loggers, stamp: float) -> None:
+        self.executable: Path = executable
+        self.root_dir: Path = root_dir
+        self.backend: str = backend
+        self.logger: Loggers = logger
+        self.stamp: float = stamp  # identifies the state of the environment the worker runs in
+        self.loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._stderr: Optional['asyncio.Future[None]'] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None and not self.loop.is_closed()
+
+    async def start(self) -> None:
+        self.logger.debug('start build backend %s worker via %s', self.backend, self.executable)
+        self._process = await asyncio.create_subprocess_exec(str(self.executable), str(_SCRIPT), self.backend,
+                                                             stdin=asyncio.subprocess.PIPE,
+                                                             stdout=asyncio.subprocess.PIPE,
+                                                             stderr=asyncio.subprocess.PIPE,
+                                                             cwd=str(self.root_dir))
+        self._stderr = asyncio.ensure_future(read_stream(self._process.stderr, self.logger,
+                                                          partial(print_to_sdtout, level=logging.DEBUG)))
+
+    async def call(self, hook: str, **kwargs: Any) -> Any:
+        async with self._lock:
+            process = cast(asyncio.subprocess.Process, self._process)
+            self.logger.debug('[backend] %s(%s)', hook, ', '.join(f'{k}={v!r}' for k, v in kwargs.items()))
+            stdin = cast(asyncio.StreamWriter, process.stdin)
+            stdin.write(f'{json.dumps({"hook": hook, "kwargs": kwargs})}\n'.encode('utf-8'))
+            await stdin.drain()
+            line = await cast(asyncio.StreamReader, process.stdout).readline()
+        if not line:
+            await self.close()
+            self.logger.error('build backend %s exited while running %s', self.backend, hook)
+            raise SystemExit(-1)
+        response: Dict[str, Any] = json.loads(line.decode('utf-8'))
+        if 'error' in response:
+            self.logger.error('build backend %s failed %s with %s', self.backend, hook, response['error'])
+            raise SystemExit(-1)
+        return response['result']
+
+    async def get_requires_for_build(self, build_type: str) -> List[str]:
+        return cast(List[str], await self.call(f'get_requires_for_build_{build_type}', config_settings=None))
+
+    async def prepare_metadata_for_build_wheel(self, metadata_dir: Path) -> Optional[Path]:
+        """the generated dist-info folder, None if the backend does not support generating it standalone"""
+        result = await self.call('prepare_metadata_for_build_wheel', metadata_directory=str(metadata_dir),
+                                 config_settings=None)
+        return None if result is None else metadata_dir / result
+
+    async def build(self, build_type: str, out_dir: Path) -> Path:
+        return out_dir / cast(str, await self.call(f'build_{build_type}', **{
+            f'{build_type}_directory': str(out_dir), 'config_settings': None}))
+
+    async def close(self) -> None:
+        process, self._process = self._process, None
+        if process is not None:
+            if process.returncode is None:
+                stdin = cast(asyncio.StreamWriter, process.stdin)
+                stdin.write(b'{"hook": "exit"}\n')
+                stdin.close()
+                await process.wait()
+            await cast('asyncio.Future[None]', self._stderr)
+            self.logger.debug('build backend %s worker exited with %s', self.backend, process.returncode)
+        WORKERS.pop(self.key, None)
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return str(self.executable), str(self.root_dir), self.backend
+
+
+WORKERS: Dict[Tuple[str, str, str], BackendWorker] = {}
+
+
+async def get_worker(executable: Path, root_dir: Path, backend: str, logger: Loggers, stamp: float) -> BackendWorker:
+    """a running worker for the backend, reusing one kept alive if its environment did not change since"""
+    key = str(executable), str(root_dir), backend
+    worker = WORKERS.pop(key, None)
+    if worker is not None and worker.loop is asyncio.get_event_loop() and not worker.loop.is_closed():
+        if worker.alive and worker.stamp == stamp:
+            worker.logger = logger
+            WORKERS[key] = worker
+            return worker
+        await worker.close()
+    worker = WORKERS[key] = BackendWorker(executable, root_dir, backend, logger, stamp)
+    await worker.start()
+    return worker
+
+
+async def shutdown() -> None:
+    for worker in list(WORKERS.values()):
+        await worker.close()
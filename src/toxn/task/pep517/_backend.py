@@ -0,0 +1,82 @@
+"""serve PEP 517 hooks of a build backend over a JSON line protocol
+
+started within the build environment (any Python version a build may use), with the project root as working
+directory; every request is a JSON object on one line of stdin, answered by one JSON line on stdout - anything
+else written to stdout (e.g. by the backend or the tools it calls) is redirected to stderr
+"""
+import importlib
+import json
+import os
+import sys
+import traceback
+
+MYPY = False
+if MYPY:  # type comments and a guarded import, as this runs on any interpreter a build may use
+    from typing import IO, Any, Dict, Optional  # noqa: F401
+
+HOOKS = {'get_requires_for_build_wheel', 'get_requires_for_build_sdist', 'prepare_metadata_for_build_wheel',
+         'build_wheel', 'build_sdist'}
+OPTIONAL = {'get_requires_for_build_wheel': [], 'get_requires_for_build_sdist': [],
+            'prepare_metadata_for_build_wheel': None}  # type: Dict[str, Any]
+
+
+def load_backend(spec):  # type: (str) -> Any
+    module_name, _, obj_path = spec.partition(':')
+    backend = importlib.import_module(module_name)
+    for attr in filter(None, obj_path.split('.')):
+        backend = getattr(backend, attr)
+    return backend
+
+
+def forget_created_dirs():  # type: () -> None
+    """distutils remembers the folders it created within the process, and would not create again the ones a previous
+    build removed since (e.g. build/bdist.*)"""
+    for name in ('distutils.dir_util', 'setuptools._distutils.dir_util'):
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        created = getattr(module, '_path_created', None)  # before setuptools 72
+        if created is not None:
+            created.clear()
+        skip_repeat = getattr(module, 'SkipRepeatAbsolutePaths', None)
+        if skip_repeat is not None and hasattr(skip_repeat, 'instance'):
+            skip_repeat.clear()
+
+
+def serve(backend, requests, responses):  # type: (Any, IO[str], IO[str]) -> None
+    for line in iter(requests.readline, ''):
+        request = json.loads(line)
+        hook = request['hook']
+        if hook == 'exit':
+            break
+        try:
+            if hook not in HOOKS:
+                raise ValueError('unknown hook {}'.format(hook))
+            importlib.invalidate_caches()  # requirements may have been installed since the last call
+            forget_created_dirs()
+            func = getattr(backend, hook, None)
+            if func is None:
+                if hook not in OPTIONAL:
+                    raise AttributeError('backend does not implement {}'.format(hook))
+                response = {'result': OPTIONAL[hook]}
+            else:
+                response = {'result': func(**request.get('kwargs', {}))}
+        except (Exception, SystemExit) as exception:  # report (distutils exits on errors), and stay alive
+            traceback.print_exc()
+            response = {'error': '{}: {}'.format(type(exception).__name__, exception)}
+        sys.stdout.flush()
+        sys.stderr.flush()
+        responses.write(json.dumps(response) + '\n')
+        responses.flush()
+
+
+def main():  # type: () -> None
+    sys.path[0] = os.getcwd()  # like python -c, the project root is importable and not this folder
+    responses = os.fdopen(os.dup(1), 'w')
+    sys.stdout.flush()
+    os.dup2(2, 1)
+    serve(load_backend(sys.argv[1]), sys.stdin, responses)
+
+
+if __name__ == '__main__':
+    main()
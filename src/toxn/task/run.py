@@ -1,62 +1,106 @@
+import asyncio
 import datetime
 import logging
 import re
 import sys
-from functools import partial
 from pathlib import Path
-from typing import Iterable, List, MutableMapping, Optional, Pattern, Set
+from typing import Iterable, List, MutableMapping, NamedTuple, Optional, Pattern, Set
 
 from toxn.config import RunTaskConfig
-from toxn.config.models.task.build import BuiltTaskConfig
-from toxn.config.models.venv import VEnvCreateParam
-from toxn.task.env.venv_pip.venv import VEnv, install, setup as setup_venv, strip_env_vars
+from toxn.config.models.task.build import BuildTaskConfig, BuiltTaskConfig
+from toxn.config.models.venv import Install
+from toxn.report import TaskReport
+from toxn.task.env import EnvCreateParam, TaskEnv, shared, task_env
 from toxn.task.interpreters import CouldNotFindInterpreter
-from toxn.task.util import TaskLogging, change_dir, install_params
-from toxn.util import Loggers, human_timedelta, list_to_cmd, print_to_sdtout, run
+from toxn.task.output import CommandOutput
+from toxn.task.util import TaskLogging, install_params
+from toxn.util import Loggers, human_timedelta, list_to_cmd
+
+
+class PendingBuild(NamedTuple):
+    """the build of the project, running while tasks prepare their environment"""
+    build: Optional[BuildTaskConfig]  # the build task, None if the project is not built
+    built: 'asyncio.Future[Optional[BuiltTaskConfig]]'  # the built project (and wheelhouses ready for it)
+    wheels: 'asyncio.Future[None]'  # wheelhouses filled with the packages not needing the build
 
 
 async def run_task(config: RunTaskConfig,
-                   built_config: Optional[BuiltTaskConfig],
-                   skip_missing_interpreter: bool) -> int:
+                   pending: PendingBuild,
+                   skip_missing_interpreter: bool,
+                   report: Optional[TaskReport] = None,
+                   isolate: bool = False) -> int:
+    """run a task, what does not depend on the project build (environment creation, dependency installs) happens
+    while the project builds; isolate runs the commands in process groups of their own, so stopping the task (e.g.
+    fail fast) stops all they started too"""
     start = datetime.datetime.now()
     logger = TaskLogging(logging.getLogger(__name__), {'task': config.name})
-    result = 0
+    report = report or TaskReport(config.name)
+    result: Optional[int] = 0  # None if cancelled
     try:
         logger.info('start task')
-        env = await setup_venv(VEnvCreateParam(config.recreate, config.work_dir, config.name, config.python, logger))
-        config.venv = env
-
-        await env_setup(built_config, config, env)
-
-        env_vars = strip_env_vars(env.params.bin_path)
-        clean_env_vars(env_vars, config, logger)
-
-        with change_dir(config.change_dir, logger):
-            logger.info('task in %s', human_timedelta(datetime.datetime.now() - start))
-            for command in config.commands:
-                logger.info('%s$ %s', config.change_dir, list_to_cmd(command))
-                result = await run(command, logger=logger,
-                                   stdout=partial(print_to_sdtout, level=logging.INFO),
-                                   stderr=partial(print_to_sdtout, level=logging.ERROR),
-                                   env=env_vars, shell=True,
-                                   exit_on_fail=False)
-                if result:
-                    break
-        return result
+        recreate = await shared.acquire(config, logger) and config.recreate
+        try:
+            identity = config.env_identity
+            early = early_batches(pending.build, config)
+            params = EnvCreateParam(recreate, config.env_dir, config.name if identity is None else f'env-{identity}',
+                                    config.python, logger, report, early)
+            env = task_env(config, params)
+            try:
+                async with shared.lock(config):
+                    await env.create()
+                if config.wheelhouse is not None:
+                    await pending.wheels
+                async with shared.lock(config):
+                    await env.install(early)
+                built = await pending.built
+                async with shared.lock(config):
+                    await env.install(install_batches(built, config))
+                code = result = await _run_commands(config, env, logger, report, start, isolate)
+            finally:
+                await env.teardown()
+        finally:
+            shared.release(config)
+        return code
+    except asyncio.CancelledError:
+        logger.warning('cancelled')
+        result = None
+        raise
     except BaseException as e:
         if skip_missing_interpreter and isinstance(e, CouldNotFindInterpreter):
-            result = 0
+            code = 0
         else:
             logger.error('%s %s', type(e).__name__, e)
-            if isinstance(e, SystemExit):
-                result = e.code
-            else:
-                result = 1
-        return result
+            code = e.code if isinstance(e, SystemExit) and isinstance(e.code, int) else 1
+        result = code
+        return code
     finally:
+        report.done(result)
         logger.info('done in %s with %s', human_timedelta(datetime.datetime.now() - start), result)
 
 
+async def _run_commands(config: RunTaskConfig, env: TaskEnv, logger: Loggers, report: TaskReport,
+                        start: datetime.datetime, isolate: bool) -> int:
+    env_vars = env.environ()
+    clean_env_vars(env_vars, config, logger)
+
+    change_dir = config.change_dir
+    logger.info('task in %s', human_timedelta(datetime.datetime.now() - start))
+    result = 0
+    with CommandOutput(config.log_file, config.console, logger) as output:
+        for command in config.commands:
+            cmd = list_to_cmd(command)
+            logger.info('%s$ %s', change_dir, cmd)
+            output.command(cmd)
+            with report.phase('command', cmd) as phase:
+                result = phase.exit_code = await env.run(command, stdout=output.stdout, stderr=output.stderr,
+                                                         env=env_vars, shell=True, exit_on_fail=False,
+                                                         cwd=change_dir, isolate=isolate)
+            if result:
+                output.failed(result)
+                break
+    return result
+
+
 def global_pass_env() -> Set[str]:
     pass_env = {"PATH", "PIP_INDEX_URL", "LANG", "LANGUAGE", "LD_LIBRARY_PATH"}
     if sys.platform == "win32":
@@ -106,30 +150,48 @@ def clean_env_vars(env: MutableMapping[str, str], config: RunTaskConfig, logger:
         env[key] = value
 
 
-async def env_setup(built: Optional[BuiltTaskConfig],
-                    config: RunTaskConfig,
-                    env: VEnv) -> None:
-    if config.install_build_requires and built is not None:
-        await install(env, install_params(f'build requires ({built.build_type})',
-                                          built.build_requires,
-                                          config))
-    if built is not None and (not built.build_wheel or config.install_for_build_requires):
-        await install(env, install_params(f'for build requires ({built.build_type})',
-                                          built.for_build_requires,
-                                          config))
-
-    if config.deps:
-        await install(env, install_params(f'deps',
-                                          config.deps,
-                                          config))
+def early_batches(build: Optional[BuildTaskConfig], config: RunTaskConfig) -> List[Install]:
+    """the first batches of :meth:`install_batches`, the ones not depending on the outcome of the build (the deps only
+    when no requirements reported by the build are installed before them)"""
+    batches = _requires_batches(build, config)
+    return batches[:1] if _install_for_build_requires(build, config) else batches
+
+
+def _requires_batches(build: Optional[BuildTaskConfig], config: RunTaskConfig) -> List[Install]:
+    build_requires: List[str] = []
+    if config.install_build_requires and build is not None:
+        build_requires = build.build_requires
+    wheelhouse = config.wheelhouse
+    return [install_params(f'build requires', build_requires, config)._replace(find_links=wheelhouse),
+            install_params(f'deps', config.deps, config)._replace(find_links=wheelhouse)]
+
+
+def _install_for_build_requires(build: Optional[BuildTaskConfig], config: RunTaskConfig) -> bool:
+    return build is not None and (not build.build_wheel or config.install_for_build_requires)
+
+
+def install_batches(built: Optional[BuiltTaskConfig], config: RunTaskConfig) -> List[Install]:
+    """the packages to install into the environment of a task, in order"""
+    build_requires, deps = _requires_batches(built, config)
+    for_build_requires: List[str] = []
+    if built is not None and _install_for_build_requires(built, config):
+        for_build_requires = built.for_build_requires
+
+    project: List[str] = []
+    digest: Optional[str] = None
     extras = config.extras
     if built is not None and built.skip is False and config.install_build:
         if config.use_develop:
             project_package: Optional[Path] = config.root_dir
         else:
             project_package = built.package
-        package = '{}{}'.format(project_package, '[{}]'.format(','.join(extras)) if extras else '')
-        await install(env, install_params(f'project',
-                                          [package],
-                                          config,
-                                          config.use_develop))
+        project.append('{}{}'.format(project_package, '[{}]'.format(','.join(extras)) if extras else ''))
+        digest = project[0] if config.use_develop else f'{built.package_digest}{project[0]}'
+    wheelhouse = config.wheelhouse
+    return [
+        build_requires,
+        install_params(f'for build requires', for_build_requires, config)._replace(find_links=wheelhouse),
+        deps,
+        install_params(f'project', project, config, config.use_develop)._replace(
+            digest=digest, find_links=None if config.use_develop else wheelhouse),
+    ]
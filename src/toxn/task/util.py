@@ -1,12 +1,8 @@
 import logging
-import os
-from contextlib import contextmanager
-from pathlib import Path
-from typing import Any, Dict, Generator, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 from toxn.config.models.task.base import TaskConfig
 from toxn.config.models.venv import Install
-from toxn.util import Loggers
 
 
 def install_params(batch_name: str, packages: List[str], config: TaskConfig,
@@ -27,17 +23,3 @@ class TaskLogging(logging.LoggerAdapter):
         else:
             task_info = f'[{task}] '
         return f"{task_info}{msg}", kwargs
-
-
-@contextmanager
-def change_dir(to_dir: Path, logger: Loggers) -> Generator[None, None, None]:
-    cwd = Path(os.getcwd())
-    if cwd != to_dir:
-        logger.debug('change cwd to %r', to_dir)
-        os.chdir(str(to_dir))
-    try:
-        yield
-    finally:
-        if cwd != to_dir:
-            logger.debug('change cwd to %r', to_dir)
-            os.chdir(str(cwd))
@@ -0,0 +1,101 @@
+"""wheels of the task dependencies, built once per interpreter and shared by all tasks of the project
+
+a manifest within the wheelhouse records the requirements already provisioned, so later runs only build the new
+ones (and can run fully offline when nothing changed)
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, cast
+
+from toxn.config import RunTaskConfig, ToxConfig
+from toxn.config.models.task.build import BuildTaskConfig, BuiltTaskConfig
+from toxn.config.models.venv import Install
+from toxn.task.interpreters import CouldNotFindInterpreter, find_python
+from toxn.task.run import early_batches, install_batches
+from toxn.task.util import TaskLogging
+from toxn.util import Loggers, list_to_cmd, print_to_sdtout, run
+
+LOGGER = TaskLogging(logging.getLogger(__name__), {'task': 'wheelhouse'})
+MANIFEST = 'manifest.json'
+
+
+class CouldNotBuildWheels(Exception):
+    """pip failed to build the wheels of a wheelhouse"""
+
+
+def requirements(config: ToxConfig, built: Optional[BuiltTaskConfig],
+                 batches: Optional[Callable[[RunTaskConfig], List[Install]]] = None
+                 ) -> Dict[Path, Tuple[str, List[str]]]:
+    """wheelhouse folder to its interpreter and the union of packages the selected tasks install from it"""
+    result: Dict[Path, Tuple[str, List[str]]] = OrderedDict()
+    for name in config.run_tasks:
+        task = cast(RunTaskConfig, config.task_of(name))
+        folder = task.wheelhouse
+        if folder is None:
+            continue
+        packages = result.setdefault(folder, (task.python, []))[1]
+        for batch in install_batches(built, task) if batches is None else batches(task):
+            if batch.find_links is not None:
+                packages.extend(p for p in batch.packages if p not in packages)
+    return result
+
+
+async def prepare(config: ToxConfig, built: Optional[BuiltTaskConfig]) -> None:
+    """build the wheels missing from the wheelhouses used by the selected tasks (in parallel)"""
+    await _fill_all(requirements(config, built))
+
+
+async def prepare_early(config: ToxConfig, build: Optional[BuildTaskConfig]) -> None:
+    """build the wheels not depending on the outcome of the build, so tasks can install these while it runs"""
+    await _fill_all(requirements(config, None, partial(early_batches, build)))
+
+
+async def _fill_all(needed: Dict[Path, Tuple[str, List[str]]]) -> None:
+    await asyncio.gather(*[fill(folder, python, packages, LOGGER)
+                           for folder, (python, packages) in needed.items() if packages])
+
+
+async def fill(folder: Path, python: str, packages: List[str], logger: Loggers) -> bool:
+    """ensure the folder contains wheels for the packages (and their dependencies), False if there is no interpreter
+    to build them (tasks using it report that), raises if building them failed (tasks cannot install without them)"""
+    done = _load_manifest(folder)
+    missing = [p for p in packages if p not in done]
+    if not missing:
+        logger.debug('wheelhouse %s up to date', folder)
+        return True
+    try:
+        base = await find_python(python, logger)
+    except CouldNotFindInterpreter:
+        logger.debug('no interpreter %s to build wheelhouse %s', python, folder)
+        return False
+    os.makedirs(str(folder), exist_ok=True)
+    cmd = [str(base.exe), '-m', 'pip', 'wheel', '--disable-pip-version-check',
+           '--wheel-dir', str(folder), '--find-links', str(folder)] + missing
+    logger.info('build wheels for %s', list_to_cmd(missing))
+    code = await run(cmd, logger=logger, exit_on_fail=False,
+                     stdout=partial(print_to_sdtout, level=logging.DEBUG),
+                     stderr=partial(print_to_sdtout, level=logging.ERROR))
+    if code:
+        raise CouldNotBuildWheels(f'into {folder}')
+    _store_manifest(folder, done | set(missing))
+    return True
+
+
+def _load_manifest(folder: Path) -> Set[str]:
+    manifest = folder / MANIFEST
+    if not manifest.exists():
+        return set()
+    with open(manifest, 'rt') as file_handler:
+        return set(json.load(file_handler))
+
+
+def _store_manifest(folder: Path, packages: Set[str]) -> None:
+    temp = folder / f'.{MANIFEST}.{os.getpid()}'
+    with open(temp, 'wt') as file_handler:
+        json.dump(sorted(packages), file_handler, indent=2)
+    os.replace(str(temp), str(folder / MANIFEST))
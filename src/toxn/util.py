@@ -1,23 +1,32 @@
 import asyncio
+import codecs
+import hashlib
 import json
 import logging
+import os
 import shlex
 import shutil
+import signal
 import subprocess
 import sys
 from collections import deque
 from datetime import datetime, timedelta
 from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Deque, Iterable, List, Mapping, Optional, Union, cast
+from typing import IO, Any, Callable, Deque, Dict, Hashable, Iterable, List, Mapping, Optional, Union, cast
+from weakref import WeakKeyDictionary
 
 Cmd = Iterable[Union[str, Path]]
 Loggers = Union[logging.LoggerAdapter, logging.Logger]
 
 
+TAIL = 1000  # lines of output kept by default
+
+
 class CmdLineBufferPrinter:
+    """collect the last lines of a command output (all of them with no limit)"""
 
-    def __init__(self, limit: Optional[int] = None, live_print: bool = True) -> None:
+    def __init__(self, limit: Optional[int] = TAIL, live_print: bool = True) -> None:
         self.live_print: bool = live_print
         self.elements: Deque[str] = deque(maxlen=limit) if limit is not None else deque()
 
@@ -37,53 +46,194 @@ class CmdLineBufferPrinter:
         return last
 
 
+class KeyedLocks:
+    """an asyncio lock per key (and event loop), e.g. to serialize work on the same resource"""
+
+    def __init__(self) -> None:
+        self._locks: 'WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Lock]]' = \
+            WeakKeyDictionary()
+
+    def __call__(self, key: Hashable) -> asyncio.Lock:
+        locks = self._locks.setdefault(asyncio.get_event_loop(), {})
+        if key not in locks:
+            locks[key] = asyncio.Lock()
+        return locks[key]
+
+
+class FileLock:
+    """a lock shared across processes via a lock file; waiting polls, so it does not block the event loop
+
+    an exclusive lock by default, shared ones (any number of holders) only exclude the exclusive ones"""
+    POLL = 0.05  # seconds between attempts to take the lock
+
+    def __init__(self, path: Path, shared: bool = False) -> None:
+        self.path = path
+        self.shared = shared
+        self._handle: Optional[IO[bytes]] = None
+
+    def try_acquire(self) -> bool:
+        """take the lock if no one else holds it (returns True), without waiting"""
+        os.makedirs(str(self.path.parent), exist_ok=True)
+        handle = open(self.path, 'a+b')
+        if not _try_lock(handle.fileno(), self.shared):
+            handle.close()
+            return False
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        """release the lock, if held"""
+        handle, self._handle = self._handle, None
+        if handle is not None:
+            _unlock(handle.fileno())
+            handle.close()
+
+    async def __aenter__(self) -> 'FileLock':
+        while not self.try_acquire():
+            await asyncio.sleep(self.POLL)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+if sys.platform == 'win32':  # pragma: no cover
+    import msvcrt
+
+    def _try_lock(fd: int, shared: bool) -> bool:  # no shared locks on Windows, these exclude each other too
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(fd: int, shared: bool) -> bool:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
 StreamCallback = Union[Callable[[Loggers, str], Any], CmdLineBufferPrinter]
+GRACE = 5.0  # seconds stopped commands get to clean up (e.g. print their summary) before they are killed
+_RUNNING: Dict['asyncio.subprocess.Process', bool] = {}  # to whether it leads its own process group
+_CHUNK = 1 << 16
 
 
-async def _read_stream(stream: Optional[asyncio.streams.StreamReader],
+async def read_stream(stream: Optional[asyncio.streams.StreamReader],
                        logger: Loggers,
                        callback: StreamCallback) -> None:
-    if stream is not None:
-        while True:
-            line = await stream.readline()
-            if line:
-                callback(logger, line.decode())
-            else:
-                break
+    """pass the stream line by line to the callback, reading (and decoding) it in chunks"""
+    if stream is None:
+        return
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parts: List[str] = []  # of the line not yet terminated
+    while True:
+        chunk = await stream.read(_CHUNK)
+        text = decoder.decode(chunk, final=not chunk)
+        if '\n' in text:
+            first, *lines, last = text.split('\n')
+            parts.append(first)
+            callback(logger, ''.join(parts) + '\n')
+            for line in lines:
+                callback(logger, line + '\n')
+            parts = [last] if last else []
+        elif text:
+            parts.append(text)
+        if not chunk:
+            if parts:
+                callback(logger, ''.join(parts))
+            break
 
 
 async def _stream_subprocess(cmd: List[str], logger: Loggers,
                              stdout_cb: StreamCallback, stderr_cb: StreamCallback,
-                             env: Optional[Mapping[str, str]], shell: bool = False) -> int:
+                             env: Optional[Mapping[str, str]], shell: bool = False,
+                             cwd: Optional[Path] = None, isolate: bool = False) -> int:
     shell_cmd = list_to_cmd(cmd)
     if shell:
         runner = partial(asyncio.create_subprocess_shell, shell_cmd)
     else:
         runner = partial(asyncio.create_subprocess_exec, *cmd)
 
-    logger.debug('[run] %s%s', shell_cmd, ' as shell command' if shell else '')
+    logger.debug('[run] %s%s%s', shell_cmd, ' as shell command' if shell else '', f' in {cwd}' if cwd else '')
     start = datetime.now()
     process = await runner(stdout=asyncio.subprocess.PIPE,
                            stderr=asyncio.subprocess.PIPE,
                            stdin=None,
-                           env=env)
-    handlers = [_read_stream(process.stdout, logger, stdout_cb),
-                _read_stream(process.stderr, logger, stderr_cb)]
-    await asyncio.wait(handlers)
+                           env=env,
+                           cwd=None if cwd is None else str(cwd),
+                           start_new_session=isolate)
+    _RUNNING[process] = isolate
     result_repr: Optional[str] = None
     try:
+        await asyncio.gather(read_stream(process.stdout, logger, stdout_cb),
+                             read_stream(process.stderr, logger, stderr_cb))
         result = await process.wait()
         result_repr = repr(result)
         return result
-    except BaseException as e:
+    except BaseException as e:  # e.g. cancelled, do not leave the command running
         result_repr = repr(e)
+        await stop(process)
         raise
     finally:
+        _RUNNING.pop(process, None)
         end = datetime.now()
         logger.debug('[ran] in %s with %s %s%s', end - start,
                      result_repr, shell_cmd, ' as shell command' if shell else '')
 
 
+async def stop(process: 'asyncio.subprocess.Process') -> None:
+    """interrupt a command (and if isolated all it started), kill what did not stop within the grace period"""
+    isolated = _RUNNING.get(process, False)
+    try:
+        _signal(process, isolated, signal.SIGINT)
+        if process.returncode is None:
+            await asyncio.wait_for(process.wait(), GRACE)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        _signal(process, isolated, signal.SIGKILL)
+
+
+async def kill_running() -> None:
+    """stop all commands still running when interrupted: isolated ones get interrupted (the others got the interrupt
+    of the terminal already), what did not stop within the grace period is killed"""
+    running = list(_RUNNING.items())
+    for process, isolated in running:
+        if isolated:
+            _signal(process, isolated, signal.SIGINT)
+    try:
+        await asyncio.wait_for(asyncio.gather(*(process.wait() for process, _ in running)), GRACE)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for process, isolated in running:
+            _signal(process, isolated, signal.SIGKILL)
+
+
+def _signal(process: 'asyncio.subprocess.Process', isolated: bool, sig: int) -> None:
+    try:
+        if sys.platform == 'win32':
+            if process.returncode is None:
+                process.kill()
+        elif isolated:  # the whole group, what the command started might outlive it
+            os.killpg(process.pid, sig)
+        elif process.returncode is None:
+            process.send_signal(sig)
+    except (ProcessLookupError, PermissionError):
+        pass  # already gone
+
+
 def print_to_sdtout(logger: Loggers, line: str, level: int = logging.DEBUG) -> None:
     logger.log(level, line.rstrip())
 
@@ -94,11 +244,15 @@ def print_to_sdterr(logger: Loggers, line: str, level: int = logging.DEBUG) -> N
 
 async def run(cmd: Cmd, logger: Loggers,
               stdout: StreamCallback = print_to_sdtout, stderr: StreamCallback = print_to_sdterr,
-              env: Optional[Mapping[str, str]] = None, shell: bool = False, exit_on_fail: bool = True) -> int:
+              env: Optional[Mapping[str, str]] = None, shell: bool = False, exit_on_fail: bool = True,
+              cwd: Optional[Path] = None, isolate: bool = False) -> int:
+    """run a command, isolate makes it lead a process group of its own (POSIX) so stopping it stops all it started;
+    not by default, as such commands do not get the interrupt of the terminal (nor control it, e.g. for pdb)"""
     if logger is None:
         logging.getLogger()
     type_safe_cmd: List[str] = [i if isinstance(i, str) else str(i) for i in cmd]
-    result_code = await _stream_subprocess(type_safe_cmd, logger, stdout, stderr, env=env, shell=shell)
+    result_code = await _stream_subprocess(type_safe_cmd, logger, stdout, stderr, env=env, shell=shell, cwd=cwd,
+                                           isolate=isolate and sys.platform != 'win32')
     if exit_on_fail and result_code != 0:
         raise SystemExit(-1)
     return result_code
@@ -110,6 +264,14 @@ def rm_dir(folder: Path, msg: str, logger: Loggers) -> None:
         shutil.rmtree(str(folder))
 
 
+def digest_file(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as file_handler:
+        for chunk in iter(partial(file_handler.read, 1 << 16), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
 def list_to_cmd(args: List[str]) -> str:
     if sys.platform == 'win32':
         converter = subprocess.list2cmdline
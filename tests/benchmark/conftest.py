@@ -0,0 +1,96 @@
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import pytest
+
+
+class Bench:
+    """time a callable a few rounds, recording the results under a name"""
+
+    def __init__(self, results: Dict[str, Dict[str, Any]]) -> None:
+        self.results = results
+
+    def __call__(self, name: str, func: Callable[[], Any], rounds: int = 5) -> Any:
+        timings: List[float] = []
+        result = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        self._record(name, timings)
+        return result
+
+    async def run_async(self, name: str, func: Callable[[], Awaitable[Any]], rounds: int = 5) -> Any:
+        timings: List[float] = []
+        result = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = await func()
+            timings.append(time.perf_counter() - start)
+        self._record(name, timings)
+        return result
+
+    def _record(self, name: str, timings: List[float]) -> None:
+        self.results[name] = {'rounds': len(timings), 'min': min(timings), 'max': max(timings),
+                              'mean': statistics.mean(timings), 'median': statistics.median(timings)}
+
+
+@pytest.fixture(scope='session')
+def bench_results(request):
+    results: Dict[str, Dict[str, Any]] = {}
+    yield results
+    if not results:
+        return
+    option = request.config.getoption
+    report = {'python': sys.version, 'platform': platform.platform(), 'results': results}
+    if option('bench_json'):
+        with open(option('bench_json'), 'wt') as file_handler:
+            json.dump(report, file_handler, indent=2, sort_keys=True)
+    if option('bench_compare'):
+        with open(option('bench_compare'), 'rt') as file_handler:
+            baseline = json.load(file_handler)['results']
+        tolerance = option('bench_tolerance')
+        slower = [f'{name}: {value["median"]:.6f}s vs {baseline[name]["median"]:.6f}s'
+                  for name, value in sorted(results.items())
+                  if name in baseline and value['median'] > baseline[name]['median'] * (1 + tolerance)]
+        if slower:
+            pytest.fail('benchmarks regressed more than {:.0%}:\n{}'.format(tolerance, '\n'.join(slower)))
+
+
+@pytest.fixture()
+def bench(bench_results):
+    return Bench(bench_results)
+
+
+def synthetic_pyproject(count: int) -> str:
+    """a configuration with count tasks, using substitutions, environment variables and base tasks"""
+    lines = ['[build-system]',
+             "requires = ['setuptools >= 38.2.4']",
+             "build-backend = 'setuptools.build_meta'",
+             '[tool.toxn]',
+             'default_tasks = [{}]'.format(', '.join(f"'t{i}'" for i in range(count))),
+             '[tool.toxn.task]',
+             "pass_env = ['CI', 'TRAVIS_*', 'LC_*']",
+             '[tool.toxn.task.base]',
+             "deps = ['pytest >= 3', 'mock']",
+             "set_env = {COVERAGE_FILE = '<project_work_dir>/.coverage.<name>', DEBUG = '<env:DEBUG:0>'}"]
+    for i in range(count):
+        lines.extend([f'[tool.toxn.task.t{i}]',
+                      "base = 'base'",
+                      f"python = 'python3.{i % 4 + 4}'",
+                      f"description = 'task {i} running in <work_dir>'",
+                      "commands = ['python -m pytest <root_dir>/tests --basetemp <work_dir>/tmp <posargs:-q>',"
+                      " 'python -c \"print(1)\"']"])
+    return '\n'.join(lines) + '\n'
+
+
+@pytest.fixture()
+def synthetic(project):
+    def _synthetic(count: int):
+        return project({'pyproject.toml': synthetic_pyproject(count)})
+
+    return _synthetic
@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+
+from toxn.config import Substitute, ToxConfig, load
+from toxn.evaluate.list_tasks import list_tasks
+from toxn.task.run import clean_env_vars
+
+pytestmark = pytest.mark.bench
+
+SIZES = [10, 100, 1000]
+
+
+@pytest.fixture(name='quiet_logger')
+def quiet_logger_fixture():
+    logger = logging.getLogger('bench')
+    logger.disabled = True
+    yield logger
+    logger.disabled = False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('count', SIZES)
+async def test_config_load(synthetic, bench, count):
+    synthetic(count)
+    config: ToxConfig = await bench.run_async(f'config.load[{count}]', lambda: load([]))
+    assert len(config.default_tasks) == count
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('count', SIZES)
+async def test_substitute(synthetic, bench, count):
+    config: ToxConfig = await synthetic(count).conf()
+
+    def resolve_all():
+        Substitute.invalidate()  # measure cold resolution, not the memoized values
+        for name in config.tasks:
+            task = config.task_of(name)
+            task.commands, task.set_env, task.python, task.description  # noqa
+
+    bench(f'substitute[{count}]', resolve_all)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('count', SIZES)
+async def test_list_tasks(synthetic, bench, quiet_logger, count):
+    config: ToxConfig = await synthetic(count).conf('-a', 'list')
+    await bench.run_async(f'list_tasks[{count}]', lambda: list_tasks(config, quiet_logger))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('count', SIZES)
+async def test_clean_env_vars(synthetic, bench, quiet_logger, count):
+    config: ToxConfig = await synthetic(1).conf()
+    env = {f'VAR_{i}': str(i) for i in range(count)}
+    env.update({f'TRAVIS_{i}': str(i) for i in range(count)})
+    task = config.task_of('t0')
+
+    bench(f'clean_env_vars[{count}]', lambda: clean_env_vars(dict(env), task, quiet_logger))
@@ -0,0 +1,34 @@
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+from toxn.config.models.venv import VEnvCreateParam
+from toxn.task.env.venv_pip.venv import setup
+from toxn.util import CmdLineBufferPrinter, run
+
+pytestmark = pytest.mark.bench
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('lines', [1000, 100000])
+async def test_stream_subprocess(bench, lines):
+    cmd = [sys.executable, '-c', f'for _ in range({lines}): print("x" * 80)']
+    logger = logging.getLogger('bench')
+
+    async def stream():
+        printer = CmdLineBufferPrinter(limit=1, live_print=False)
+        await run(cmd, logger=logger, stdout=printer)
+        return printer
+
+    printer = await bench.run_async(f'stream_subprocess[{lines}]', stream, rounds=3)
+    assert printer.last == 'x' * 80
+
+
+@pytest.mark.venv
+@pytest.mark.asyncio
+async def test_venv_setup(bench, tmpdir):
+    params = VEnvCreateParam(True, Path(tmpdir) / 'env', 'env', 'python', logging.getLogger('bench'))
+    await bench.run_async('venv.setup[cold]', lambda: setup(params), rounds=2)
+    await bench.run_async('venv.setup[warm]', lambda: setup(params._replace(recreate=False)))
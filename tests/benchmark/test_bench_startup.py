@@ -0,0 +1,27 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.bench
+
+# seconds of cumulative import time allowed before listing tasks, depends on the machine so can be overridden
+BUDGET = float(os.environ.get('TOXN_IMPORT_BUDGET', '0.3'))
+
+
+@pytest.mark.parametrize('count', [10, 1000])
+def test_startup_list_default_bare(synthetic, bench, count):
+    synthetic(count)
+
+    def import_time():
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'toxn', '-a', 'list-default-bare'],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        # top level imports are not indented, their cumulative time covers all nested imports
+        top = re.findall(r'^import time:\s+\d+ \|\s+(\d+) \| \S', process.stderr, re.MULTILINE)
+        return sum(int(i) for i in top) / 1e6
+
+    bench(f'startup.list-default-bare[{count}]', import_time, rounds=5)
+    total = bench.results[f'startup.list-default-bare[{count}]']['median']
+    assert total < BUDGET, f'importing took {total:.3f}s, more than the budget of {BUDGET:.3f}s'
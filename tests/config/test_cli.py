@@ -66,3 +66,29 @@ async def test_root_no_config_found(conf, monkeypatch):
     with pytest.raises(ValueError) as error:
         await env.conf()
     assert error.value.args[0] == 'could not locate configuration file'
+
+
+@pytest.mark.asyncio
+async def test_parallel_workers(conf, monkeypatch):
+    env = conf('''''')
+    opt = await env.conf()
+    assert opt.run_parallel is False
+    assert opt.parallel_workers == 1
+
+    monkeypatch.setattr('os.cpu_count', lambda: 3)
+    opt = await env.conf('-p')
+    assert opt.run_parallel is True
+    assert opt.parallel_workers == 3
+
+    opt = await env.conf('--parallel', '2')
+    assert opt.parallel_workers == 2
+
+
+def test_help_epilog_version():
+    import toxn
+    from toxn.config.cli import build_parser
+
+    parser = build_parser()
+    assert parser.format_help().rstrip().endswith(f'{toxn.__version__} from {toxn.__file__}')
+    parser.epilog = 'custom'
+    assert parser.format_help().rstrip().endswith('custom')
@@ -63,3 +63,43 @@ deps = "<task.py36.deps>"
     left = py27.deps
     right = py36.deps
     assert left == right
+
+
+@pytest.mark.asyncio
+async def test_tasks_created_on_access(conf):
+    env = conf('''
+[tool.toxn.task.base]
+deps = ["pytest"]
+
+[tool.toxn.task.py36]
+base = "base"
+commands = ["pytest tests"]
+
+[tool.toxn.task.py27]
+base = "py36"
+deps = "<task.py36.deps>"
+''')
+    conf: ToxConfig = await env.conf()
+    assert 'py27' not in vars(conf.task) and 'py36' not in vars(conf.task)
+
+    py27 = conf.task_of('py27')
+    assert 'py36' not in vars(conf.task)
+    assert py27.deps == ['pytest']
+    assert py27.commands == [['pytest', 'tests']]
+    assert conf.task_of('py36') is conf.task.py36
+    with pytest.raises(AttributeError):
+        conf.task_of('missing')
+
+
+@pytest.mark.asyncio
+async def test_base_cycle(conf):
+    env = conf('''
+[tool.toxn.task.a]
+base = "b"
+
+[tool.toxn.task.b]
+base = "a"
+''')
+    conf: ToxConfig = await env.conf()
+    with pytest.raises(ValueError, match='base cycle'):
+        conf.task_of('a')
@@ -4,7 +4,7 @@ from pathlib import Path
 import pytest
 
 from toxn.config import ToxConfig
-from toxn.config.util import substitute
+from toxn.config.util import Substitute, substitute
 
 
 @pytest.mark.asyncio
@@ -43,3 +43,36 @@ async def test_substitute_env_key_default(monkeypatch):
 async def test_substitute_env_key_no_default(monkeypatch):
     monkeypatch.delenv('FOOBAR', raising=False)
     assert substitute(None, '<env:FOOBAR>') == ''
+
+
+def test_substitute_cycle(monkeypatch):
+    monkeypatch.setenv('FOOBAR', '<env:FOOBAR> ')
+    with pytest.raises(ValueError, match='substitution'):
+        substitute(None, '<env:FOOBAR> x')
+
+
+def test_substitute_memo_invalidated():
+    class Conf(Substitute):
+        def __init__(self) -> None:
+            self.name = 'a'
+
+        @property
+        def greeting(self):
+            return 'hello <name>'
+
+    conf = Conf()
+    assert conf.greeting == 'hello a'
+    conf.name = 'b'
+    assert conf.greeting == 'hello b'
+
+
+@pytest.mark.asyncio
+async def test_recreated_invalidates_memo(conf):
+    proj = conf('''
+    [tool.toxn.task.a]
+    ''')
+    config: ToxConfig = await proj.conf('-r')
+    task = config.task.a
+    assert task.recreate is True
+    config.recreated()
+    assert task.recreate is False
@@ -0,0 +1,79 @@
+import pytest
+
+from toxn.config import ToxConfig
+from toxn.config.matrix import Matrix
+
+MATRIX = '''
+[tool.toxn]
+default_tasks = ['lint', 'test']
+
+[tool.toxn.task.lint]
+commands = ['flake8']
+
+[tool.toxn.task.common]
+deps = ['pytest']
+set_env = {A = '1'}
+
+[tool.toxn.matrix.test]
+factors = [['django20', 'django21'], ['py36', 'py37'], ['', 'cov']]
+base = 'common'
+commands = ['pytest']
+
+[tool.toxn.matrix.test.factor.django20]
+deps = ['django >= 2.0, < 2.1']
+
+[tool.toxn.matrix.test.factor.cov]
+deps = ['pytest-cov']
+set_env = {B = '2'}
+commands = ['coverage report']
+'''
+
+
+def test_matrix_expansion():
+    matrix = Matrix('m', {'factors': [['a', 'b'], ['', 'x'], ['1', '2']]})
+    assert len(matrix) == 8
+    assert list(matrix)[:4] == ['a-1', 'a-2', 'a-x-1', 'a-x-2']
+    assert matrix.factors_of('b-x-2') == ('b', 'x', '2')
+    assert matrix.factors_of('b-2') == ('b', '', '2')
+    assert matrix.factors_of('b-x') is None
+    assert matrix.factors_of('c-1') is None
+
+
+def test_matrix_factor_with_separator():
+    with pytest.raises(ValueError, match='contains'):
+        Matrix('m', {'factors': [['a-b']]})
+
+
+@pytest.mark.asyncio
+async def test_matrix_default_tasks(conf):
+    config: ToxConfig = await conf(MATRIX).conf()
+    assert config.default_tasks == ['lint', 'django20-py36', 'django20-py36-cov', 'django20-py37',
+                                    'django20-py37-cov', 'django21-py36', 'django21-py36-cov',
+                                    'django21-py37', 'django21-py37-cov']
+    assert config.run_defined_tasks == []
+
+    task = config.task_of('django20-py37-cov')
+    assert task.python == 'python3.7'
+    assert task.deps == ['pytest', 'django >= 2.0, < 2.1', 'pytest-cov']
+    assert task.set_env == {'A': '1', 'B': '2'}
+    assert task.commands == [['pytest'], ['coverage', 'report']]
+    assert config.task_of('django21-py36').deps == ['pytest']
+
+
+@pytest.mark.asyncio
+async def test_matrix_select_single_task(conf):
+    config: ToxConfig = await conf(MATRIX).conf('-t', 'django21-py36-cov')
+    assert config.run_tasks == ['django21-py36-cov']
+    assert config.run_defined_tasks == []
+    assert config.task_of('django21-py36-cov').deps == ['pytest', 'pytest-cov']
+    assert not any(name.startswith('django') and name != 'django21-py36-cov' for name in vars(config.task))
+    with pytest.raises(AttributeError):
+        config.task_of('django22-py36')
+
+
+@pytest.mark.asyncio
+async def test_matrix_select_by_matrix_name(conf):
+    config: ToxConfig = await conf(MATRIX).conf('-t', 'lint', 'test')
+    assert config.run_tasks[:3] == ['lint', 'django20-py36', 'django20-py36-cov']
+    assert len(config.run_tasks) == 9
+    assert len(config.matrix_tasks) == 8
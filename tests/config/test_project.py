@@ -3,7 +3,8 @@ from pathlib import Path
 
 import pytest
 
-from toxn.config import from_toml
+from toxn.config import from_toml, project as project_module
+from toxn.config.project import cached_from_toml
 
 
 @pytest.mark.asyncio
@@ -40,3 +41,50 @@ build-backend = 'setuptools:build_meta'
     assert build.requires == ['setuptools >= 38.2.4']
     assert project == {'default_tasks': ['py36']}
     assert filename == config_path
+
+
+@pytest.mark.asyncio
+async def test_cached_parse(tmpdir, monkeypatch):
+    filename: Path = Path(tmpdir) / 'pyproject.toml'
+    cache_dir = Path(tmpdir) / 'cache'
+    filename.write_text("""
+[tool.toxn.task.a]
+deps = ['pytest']
+[tool.toxn.task.b]
+base = 'a'
+""")
+    build, project, config_path, chains = await cached_from_toml(filename, cache_dir)
+    assert chains['b'] == {'base': 'a', 'deps': ['pytest']}
+
+    async def no_parse(config_object):
+        raise AssertionError('parsed again')
+
+    monkeypatch.setattr(project_module, 'from_toml', no_parse)
+    assert await cached_from_toml(filename, cache_dir) == (build, project, config_path, chains)
+
+    monkeypatch.undo()
+    filename.write_text(filename.read_text().replace('pytest', 'mock  '))  # same size
+    _, project, _, chains = await cached_from_toml(filename, cache_dir)
+    assert chains['b']['deps'] == ['mock  ']
+
+
+@pytest.mark.asyncio
+async def test_cached_parse_inline_table(tmpdir):
+    filename: Path = Path(tmpdir) / 'pyproject.toml'
+    filename.write_text("[tool.toxn.task.a]\nset_env = {A = '1'}\n")
+    for _ in range(2):
+        _, _, _, chains = await cached_from_toml(filename, Path(tmpdir) / 'cache')
+        assert chains['a'] == {'set_env': {'A': '1'}}
+    assert list((Path(tmpdir) / 'cache').iterdir())
+
+
+@pytest.mark.asyncio
+async def test_cached_parse_bounded(tmpdir, monkeypatch):
+    monkeypatch.setattr(project_module, 'CACHE_ENTRIES', 2)
+    cache_dir = Path(tmpdir) / 'cache'
+    for at in range(4):
+        filename: Path = Path(tmpdir) / str(at) / 'pyproject.toml'
+        filename.parent.mkdir()
+        filename.write_text(f"[tool.toxn.task.a{at}]\n")
+        await cached_from_toml(filename, cache_dir)
+    assert len(list(cache_dir.glob('*.pickle'))) == 2
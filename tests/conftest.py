@@ -9,13 +9,48 @@ from typing import Callable, Dict, Optional, Union
 import pytest
 
 from toxn.config.cli import OS_ENV_VARS
+from toxn.config.models.core import TOXN_HOME
 from toxn.evaluate import ToxConfig, get_event_loop, load_config, execute
 
 
+def pytest_addoption(parser):
+    # named bench to not clash with the pytest-benchmark plugin
+    group = parser.getgroup('bench', 'toxn benchmarks')
+    group.addoption('--bench', action='store_true', default=False, help='run the benchmarks')
+    group.addoption('--bench-json', default=None, metavar='file', help='write the benchmark results to this file')
+    group.addoption('--bench-compare', default=None, metavar='file',
+                    help='fail if a benchmark got slower than in this earlier results file')
+    group.addoption('--bench-tolerance', default=0.25, type=float, metavar='ratio',
+                    help='how much slower (relative) a benchmark may get before failing the comparison')
+
+
 def pytest_configure(config):
     # register an additional marker
     config.addinivalue_line("markers", "network: tests that require network access")
     config.addinivalue_line("markers", "venv: tests that require virtual environment creation")
+    config.addinivalue_line("markers", "bench: measures performance, only runs with --bench")
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption('bench'):
+        skip = pytest.mark.skip(reason='benchmarks run only with --bench')
+        for item in items:
+            if 'bench' in item.keywords:
+                item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True, scope='session')
+def toxn_home(tmp_path_factory):
+    """keep the data toxn stores across projects (work dirs, parsed configs) out of the home of the user"""
+    previous = os.environ.get(TOXN_HOME)
+    os.environ[TOXN_HOME] = str(tmp_path_factory.mktemp('toxn_home'))
+    try:
+        yield Path(os.environ[TOXN_HOME])
+    finally:
+        if previous is None:
+            del os.environ[TOXN_HOME]
+        else:
+            os.environ[TOXN_HOME] = previous
 
 
 @pytest.yield_fixture()
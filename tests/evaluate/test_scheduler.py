@@ -0,0 +1,76 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from toxn.evaluate.scheduler import Scheduler
+
+
+def test_order_respects_dependencies():
+    scheduler = Scheduler(['codecov', 'test', 'lint'], {'codecov': ['test']}, {})
+    assert scheduler.order == ['test', 'codecov', 'lint']
+
+
+def test_order_ignores_not_selected_dependencies():
+    scheduler = Scheduler(['codecov', 'lint'], {'codecov': ['test']}, {})
+    assert scheduler.order == ['codecov', 'lint']
+
+
+def test_order_slowest_first():
+    scheduler = Scheduler(['a', 'b', 'c'], {}, {'b': 10.0, 'c': 20.0})
+    assert scheduler.order == ['c', 'b', 'a']
+
+
+def test_cycle():
+    with pytest.raises(ValueError) as error:
+        Scheduler(['a', 'b'], {'a': ['b'], 'b': ['a']}, {})
+    assert error.value.args[0] == 'dependency cycle between tasks a, b'
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_workers():
+    running: List[str] = []
+    max_running = 0
+
+    async def runner(name: str) -> int:
+        nonlocal max_running
+        running.append(name)
+        max_running = max(max_running, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(name)
+        return 1 if name == 'b' else 0
+
+    scheduler = Scheduler(['a', 'b', 'c', 'd'], {'d': ['a']}, {})
+    results = await scheduler.run(runner, 2)
+    assert results == {'a': 0, 'b': 1, 'c': 0, 'd': 0}
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_run_dependency_finishes_first():
+    finished: List[str] = []
+
+    async def runner(name: str) -> int:
+        await asyncio.sleep(0.02 if name == 'test' else 0)
+        finished.append(name)
+        return 0
+
+    await Scheduler(['codecov', 'test'], {'codecov': ['test']}, {}).run(runner, 4)
+    assert finished == ['test', 'codecov']
+
+
+@pytest.mark.asyncio
+async def test_run_fail_fast():
+    cancelled: List[str] = []
+
+    async def runner(name: str) -> int:
+        try:
+            await asyncio.sleep(0 if name == 'a' else 10)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        return 1
+
+    results = await Scheduler(['a', 'b', 'c'], {}, {}).run(runner, 2, fail_fast=True)
+    assert results == {'a': 1}
+    assert cancelled == ['b']
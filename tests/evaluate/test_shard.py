@@ -0,0 +1,63 @@
+import argparse
+import json
+
+import pytest
+
+from toxn.config import ToxConfig
+from toxn.config.cli import Shard, shard
+from toxn.evaluate.history import store_durations
+from toxn.evaluate.shard import assign, shards_of
+
+
+def test_assign_balances_longest_first():
+    durations = {'a': 10.0, 'b': 7.0, 'c': 5.0, 'd': 4.0, 'e': 2.0}
+    result = assign(['a', 'b', 'c', 'd', 'e'], {}, durations, 2)
+    assert [r.tasks for r in result] == [['a', 'd'], ['b', 'c', 'e']]
+    assert [r.duration for r in result] == [14.0, 14.0]
+
+
+def test_assign_without_history_spreads_evenly():
+    result = assign(['a', 'b', 'c', 'd', 'e'], {}, {}, 2)
+    assert [r.tasks for r in result] == [['a', 'c', 'e'], ['b', 'd']]
+
+
+def test_assign_unknown_at_average():
+    result = assign(['a', 'b', 'new'], {}, {'a': 4.0, 'b': 2.0}, 2)
+    assert [r.tasks for r in result] == [['a'], ['b', 'new']]
+    assert [r.duration for r in result] == [4.0, 5.0]
+
+
+def test_assign_keeps_dependencies_together():
+    result = assign(['codecov', 'test', 'lint', 'docs'], {'codecov': ['test']},
+                    {'codecov': 1.0, 'test': 3.0, 'lint': 2.0, 'docs': 2.0}, 3)
+    assert [r.tasks for r in result] == [['codecov', 'test'], ['docs'], ['lint']]
+
+
+def test_assign_more_shards_than_tasks():
+    result = assign(['a'], {}, {}, 3)
+    assert [r.tasks for r in result] == [['a'], [], []]
+
+
+@pytest.mark.parametrize('value, expected', [('2/3', Shard(2, 3)), ('3', Shard(None, 3))])
+def test_shard_parse(value, expected):
+    assert shard(value) == expected
+
+
+@pytest.mark.parametrize('value', ['0/2', '3/2', '1/0', 'a/b', ''])
+def test_shard_parse_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        shard(value)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('durations_file, expected', [(None, [['a', 'c'], ['b']]),
+                                                      ('durations.json', [['a'], ['b', 'c']])])
+async def test_shards_balance_only_by_shared_durations(conf, durations_file, expected):
+    proj = conf(f'''
+    [tool.toxn]
+    default_tasks = ['a', 'b', 'c']
+    {'' if durations_file is None else f'durations_file = {json.dumps(durations_file)}'}
+    ''')
+    config: ToxConfig = await proj.conf()
+    store_durations(config.durations_file, {'a': 10.0, 'b': 1.0, 'c': 1.0})  # local history, if not configured
+    assert [s.tasks for s in shards_of(config, 2)] == expected
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+from toxn.evaluate import watch
+from toxn.evaluate.watch import InotifyWatcher, PollingWatcher, affected
+
+
+def test_affected_by_watched_files_and_dependents():
+    patterns = {'docs': ['docs/*'], 'lint': None, 'test': ['src/*', 'tests/*'], 'codecov': []}
+
+    def watches(task, name):
+        return patterns[task] is None or any(name.startswith(p[:-1]) for p in patterns[task])
+
+    tasks = ['codecov', 'test', 'lint', 'docs']
+    depends_on = {'codecov': ['test']}
+    assert affected(tasks, depends_on, watches, ['docs/index.rst']) == ['lint', 'docs']
+    assert affected(tasks, depends_on, watches, ['src/a.py']) == ['codecov', 'test', 'lint']
+    assert affected(['codecov', 'docs'], depends_on, watches, ['src/a.py']) == []
+
+
+@pytest.mark.parametrize('kind', ['polling', 'inotify'])
+@pytest.mark.asyncio
+async def test_watcher_reports_changes(kind, tmpdir, monkeypatch):
+    if kind == 'inotify':
+        if not sys.platform.startswith('linux') or watch._libc() is None:
+            pytest.skip('inotify needs Linux')
+        make = lambda root, work: InotifyWatcher(root, work, watch._libc())  # noqa: E731
+    else:
+        monkeypatch.setattr(watch, 'POLL_INTERVAL', 0.05)
+        make = PollingWatcher
+    root = Path(tmpdir)
+    (root / 'src').mkdir()
+    (root / 'src' / 'a.py').write_text('a')
+    (root / '.work').mkdir()
+    watcher = make(root, root / '.work')
+    try:
+        (root / 'src' / 'a.py').write_text('b')
+        (root / '.work' / 'log').write_text('not a source')
+        assert await asyncio.wait_for(watcher.changes(), 5) == {root / 'src' / 'a.py'}
+
+        (root / 'src' / 'pkg').mkdir()
+        (root / 'src' / 'pkg' / 'b.py').write_text('b')
+        assert root / 'src' / 'pkg' / 'b.py' in await asyncio.wait_for(watcher.changes(), 5)
+        (root / 'src' / 'pkg' / 'b.py').write_text('c')  # the new folder is watched too
+        assert root / 'src' / 'pkg' / 'b.py' in await asyncio.wait_for(watcher.changes(), 5)
+    finally:
+        watcher.close()
+
+
+@pytest.mark.asyncio
+async def test_watch_reruns_affected_reloads_config(project, monkeypatch):
+    proj = project({'pyproject.toml': '''
+    [tool.toxn]
+    default_tasks = ['a', 'b']
+    [tool.toxn.task.a]
+    watch = ['src/*']
+    [tool.toxn.task.b]
+    watch = ['tests/*']
+    ''', 'src/a.py': '', 'tests/test_a.py': ''})
+    config = await proj.conf('-r')
+    root = Path(proj.root_dir)
+    monkeypatch.setattr(watch, 'POLL_INTERVAL', 0.05)
+    monkeypatch.setattr(watch, 'file_watcher', PollingWatcher)
+    runs = []
+    changes = [lambda: (root / 'src' / 'a.py').write_text('a = 1\n'),  # only the task watching it
+               lambda: (root / 'docs.rst').write_text('no task watches it\n'),
+               lambda: (root / 'pyproject.toml').write_text('''
+[tool.toxn]
+default_tasks = ['a', 'b', 'c']
+''')]
+
+    class Stop(BaseException):  # a failing run does not end watching
+        pass
+
+    async def run_tasks(conf, logger, keep_backend):
+        assert keep_backend is True
+        runs.append((list(conf.run_tasks), [conf.task_of(t).recreate for t in conf.run_tasks]))
+        if not changes:
+            raise Stop
+        changes.pop(0)()
+        if len(changes) == 1:  # the change affected no task, no run follows it: change the configuration too
+            await asyncio.sleep(4 * watch.POLL_INTERVAL)
+            changes.pop(0)()
+        return 0
+
+    monkeypatch.setattr(watch, 'run_tasks', run_tasks)
+    with pytest.raises(Stop):
+        await asyncio.wait_for(watch.watch(config, ['-r'], logging.getLogger()), 10)
+    assert runs == [(['a', 'b'], [True, True]), (['a'], [False]), (['a', 'b', 'c'], [False, False, False])]
+
+
+@pytest.mark.asyncio
+async def test_watch_survives_failing_run(project, monkeypatch):
+    proj = project({'pyproject.toml': '''
+    [tool.toxn]
+    default_tasks = ['a']
+    ''', 'src/a.py': ''})
+    config = await proj.conf()
+    root = Path(proj.root_dir)
+    monkeypatch.setattr(watch, 'POLL_INTERVAL', 0.05)
+    monkeypatch.setattr(watch, 'file_watcher', PollingWatcher)
+    runs = []
+
+    class Stop(BaseException):
+        pass
+
+    async def run_tasks(conf, logger, keep_backend):
+        runs.append(list(conf.run_tasks))
+        if len(runs) == 2:
+            raise Stop
+        (root / 'src' / 'a.py').write_text('a = 1\n')
+        raise SystemExit(-1)  # e.g. the build backend failed
+
+    monkeypatch.setattr(watch, 'run_tasks', run_tasks)
+    with pytest.raises(Stop):
+        await asyncio.wait_for(watch.watch(config, [], logging.getLogger()), 10)
+    assert runs == [['a'], ['a']]
@@ -0,0 +1,99 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from toxn.config import ToxConfig
+from toxn.task import build_cache
+from toxn.task.interpreters import find_python
+
+
+@pytest.mark.asyncio
+async def test_build_key_tracks_sources(project):
+    proj = project({'pyproject.toml': '''
+[build-system]
+requires = ['setuptools >= 38.2.4']
+build-backend = 'setuptools.build_meta'
+''', 'setup.py': 'from setuptools import setup\nsetup()\n'})
+    conf: ToxConfig = await proj.conf()
+    logger = logging.getLogger()
+    key = await build_cache.build_key(conf.build, logger)
+    assert await build_cache.build_key(conf.build, logger) == key
+
+    root_dir = Path(proj.root_dir)
+    (root_dir / '__pycache__').mkdir()
+    (root_dir / '__pycache__' / 'setup.cpython-36.pyc').write_bytes(b'')
+    assert await build_cache.build_key(conf.build, logger) == key
+
+    (root_dir / 'setup.py').write_text('from setuptools import setup\nsetup(name="a")\n')
+    assert await build_cache.build_key(conf.build, logger) != key
+
+    conf = await proj.conf()
+    conf.build._config_dict['build_wheel'] = False
+    assert await build_cache.build_key(conf.build, logger) != key
+
+
+@pytest.mark.asyncio
+async def test_store_and_load(conf, tmpdir):
+    proj = conf('')
+    config: ToxConfig = await proj.conf()
+    logger = logging.getLogger()
+    package = Path(tmpdir) / 'pkg-1.0-py3-none-any.whl'
+    package.write_bytes(b'wheel')
+
+    assert build_cache.load(config.build, 'a') is None
+    stored = build_cache.store(config.build, 'a', package, ['wheel'], logger)
+    assert stored.read_bytes() == b'wheel'
+    assert build_cache.load(config.build, 'a') == (stored, ['wheel'])
+
+    for key in 'bcdef':
+        build_cache.store(config.build, key, package, [], logger)
+    assert build_cache.load(config.build, 'a') is None
+    assert len(list(build_cache.store_dir(config.build).iterdir())) == build_cache.KEEP_ENTRIES
+
+
+@pytest.mark.asyncio
+async def test_build_key_only_watched_sources(project):
+    proj = project({'pyproject.toml': '''
+[tool.toxn.task.build]
+watch = ['setup.py', 'src/*']
+''', 'setup.py': 'from setuptools import setup\nsetup()\n', 'tests/test_a.py': ''})
+    conf: ToxConfig = await proj.conf()
+    logger = logging.getLogger()
+    key = await build_cache.build_key(conf.build, logger)
+
+    (Path(proj.root_dir) / 'tests' / 'test_a.py').write_text('assert True\n')
+    assert await build_cache.build_key(conf.build, logger) == key
+
+    (Path(proj.root_dir) / 'setup.py').write_text('from setuptools import setup\nsetup(name="a")\n')
+    assert await build_cache.build_key(conf.build, logger) != key
+
+
+@pytest.mark.asyncio
+async def test_build_key_sdist_tracks_all_sources(project):
+    proj = project({'pyproject.toml': '''
+[tool.toxn.task.build]
+build_wheel = false
+watch = ['setup.py', 'src/*']
+''', 'setup.py': 'from setuptools import setup\nsetup()\n', 'tests/test_a.py': ''})
+    conf: ToxConfig = await proj.conf()
+    logger = logging.getLogger()
+    key = await build_cache.build_key(conf.build, logger)
+
+    (Path(proj.root_dir) / 'tests' / 'test_a.py').write_text('assert True\n')  # the sdist ships it
+    assert await build_cache.build_key(conf.build, logger) != key
+
+
+@pytest.mark.asyncio
+async def test_build_key_tracks_interpreter(conf, monkeypatch):
+    proj = conf('')
+    config: ToxConfig = await proj.conf()
+    logger = logging.getLogger()
+    key = await build_cache.build_key(config.build, logger)
+    python = await find_python(config.build.python, logger)
+
+    async def other_python(name, log):
+        return python._replace(version='2.7.18')
+
+    monkeypatch.setattr(build_cache, 'find_python', other_python)
+    assert await build_cache.build_key(config.build, logger) != key
@@ -0,0 +1,28 @@
+import logging
+from pathlib import Path
+
+from toxn.task.output import CommandOutput
+
+
+def test_tail_shown_on_failure(tmpdir, caplog):
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger('task')
+    log_file = Path(tmpdir) / 'log' / 'commands.log'
+    with CommandOutput(log_file, 'tail', logger, tail=2) as output:
+        output.command('pytest')
+        for line in ['1\n', '2\n', '3']:
+            output.stdout(logger, line)
+        assert not caplog.records
+        output.failed(1)
+    assert [r.getMessage() for r in caplog.records] == ['2', '3', f'exit code 1, full output in {log_file}']
+    assert log_file.read_text(encoding='utf-8') == '$ pytest\n1\n2\n3\n'
+
+
+def test_live(tmpdir, caplog):
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger('task')
+    with CommandOutput(Path(tmpdir) / 'commands.log', 'live', logger) as output:
+        output.stderr(logger, 'oops\n')
+        output.failed(2)
+    assert [(r.levelno, r.getMessage()) for r in caplog.records][0] == (logging.ERROR, 'oops')
+    assert len(caplog.records) == 2
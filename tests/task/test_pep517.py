@@ -0,0 +1,61 @@
+import logging
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from toxn.task import pep517
+
+
+@pytest.fixture(name='backend_root')
+def backend_root_fixture(tmpdir):
+    root = Path(tmpdir)
+    (root / 'demo_backend.py').write_text(textwrap.dedent('''
+        import os
+        imported = []
+
+        def build_wheel(wheel_directory, config_settings=None, metadata_directory=None):
+            imported.append(1)
+            print('noise on stdout')
+            os.system('echo noise from a child process')
+            name = 'demo-{}-py3-none-any.whl'.format(len(imported))
+            open(os.path.join(wheel_directory, name), 'wb').close()
+            return name
+
+        def build_sdist(sdist_directory, config_settings=None):
+            raise RuntimeError('no sdist')
+        '''))
+    return root
+
+
+@pytest.mark.asyncio
+async def test_worker_serves_hooks(backend_root):
+    worker = await pep517.get_worker(Path(sys.executable), backend_root, 'demo_backend', logging.getLogger(), 0)
+    try:
+        assert await worker.get_requires_for_build('wheel') == []
+        assert await worker.prepare_metadata_for_build_wheel(backend_root) is None
+        assert await worker.build('wheel', backend_root) == backend_root / 'demo-1-py3-none-any.whl'
+        # the backend stays imported between calls
+        assert await worker.build('wheel', backend_root) == backend_root / 'demo-2-py3-none-any.whl'
+        with pytest.raises(SystemExit):
+            await worker.build('sdist', backend_root)
+        assert worker.alive
+        same = await pep517.get_worker(Path(sys.executable), backend_root, 'demo_backend', logging.getLogger(), 0)
+        assert same is worker
+    finally:
+        await pep517.shutdown()
+    assert not worker.alive
+    assert pep517.WORKERS == {}
+
+
+@pytest.mark.asyncio
+async def test_worker_restarted_on_environment_change(backend_root):
+    worker = await pep517.get_worker(Path(sys.executable), backend_root, 'demo_backend', logging.getLogger(), 0)
+    try:
+        other = await pep517.get_worker(Path(sys.executable), backend_root, 'demo_backend', logging.getLogger(), 1)
+        assert other is not worker
+        assert not worker.alive
+        assert await other.build('wheel', backend_root) == backend_root / 'demo-1-py3-none-any.whl'
+    finally:
+        await pep517.shutdown()
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from toxn.config import ToxConfig
+from toxn.config.models.task.build import BuiltTaskConfig
+from toxn.task.run import early_batches, install_batches
+
+
+@pytest.mark.asyncio
+async def test_early_batches_need_no_build(conf, tmpdir):
+    proj = conf('''
+    [build-system]
+    requires = ['setuptools >= 38.2.4']
+    build-backend = 'setuptools.build_meta'
+    [tool.toxn.task.a]
+    deps = ['pytest']
+    install_build_requires = true
+    ''')
+    config: ToxConfig = await proj.conf()
+    task = config.task.a
+    early = early_batches(config.build, task)
+    assert [(b.batch_name, b.packages) for b in early] == [('build requires', ['setuptools >= 38.2.4']),
+                                                          ('deps', ['pytest'])]
+
+    package = Path(tmpdir) / 'pkg-1.0-py3-none-any.whl'
+    package.write_bytes(b'wheel')
+    built = BuiltTaskConfig(config.build, ['wheel'], package)
+    batches = install_batches(built, task)
+    assert [b for b in batches if b.batch_name in ('build requires', 'deps')] == early
+    assert [b.batch_name for b in batches] == ['build requires', 'for build requires', 'deps', 'project']
+
+
+@pytest.mark.asyncio
+async def test_early_batches_keep_deps_after_for_build_requires(conf):
+    proj = conf('''
+    [build-system]
+    requires = ['setuptools >= 38.2.4']
+    build-backend = 'setuptools.build_meta'
+    [tool.toxn.task.a]
+    deps = ['pytest']
+    install_build_requires = true
+    install_for_build_requires = true
+    ''')
+    config: ToxConfig = await proj.conf()
+    early = early_batches(config.build, config.task.a)
+    assert [b.batch_name for b in early] == ['build requires']
@@ -0,0 +1,83 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from toxn.config import ToxConfig
+from toxn.task.env import shared
+from toxn.util import FileLock
+
+
+@pytest.mark.asyncio
+async def test_identity(conf):
+    proj = conf('''
+    [tool.toxn.task]
+    deps = ['flake8', 'mypy']
+    [tool.toxn.task.lint]
+    commands = ['flake8']
+    [tool.toxn.task.typecheck]
+    deps = ['mypy', 'flake8']
+    commands = ['mypy']
+    [tool.toxn.task.test]
+    deps = ['pytest']
+    [tool.toxn.task.alone]
+    share_env = false
+    ''')
+    config: ToxConfig = await proj.conf()
+    lint, typecheck, test, alone = (config.task_of(n) for n in ('lint', 'typecheck', 'test', 'alone'))
+    assert lint.env_identity == typecheck.env_identity != test.env_identity
+    assert lint.env_dir == typecheck.env_dir == config.work_dir / '.envs' / lint.env_identity
+    assert alone.env_identity is None
+    assert alone.env_dir == alone.work_dir
+
+
+def test_unused_environment_removed(tmpdir):
+    folder = Path(tmpdir)
+    logger = logging.getLogger()
+    for identity in ('one', 'two'):
+        (folder / identity).mkdir()
+    shared._register(folder, 'a', 'one', logger)
+    shared._register(folder, 'b', 'one', logger)
+    shared._register(folder, 'a', 'two', logger)
+    assert (folder / 'one').exists()
+    shared._register(folder, 'b', 'two', logger)
+    assert not (folder / 'one').exists()
+    assert shared._load(folder) == {'two': ['a', 'b']}
+
+
+def test_environment_used_by_other_process_kept(tmpdir):
+    folder = Path(tmpdir)
+    logger = logging.getLogger()
+    (folder / 'one').mkdir()
+    shared._register(folder, 'a', 'one', logger)
+    using = FileLock(shared._lock_file(folder / 'one', 'use'), shared=True)  # opened again, like another process
+    assert using.try_acquire()
+    try:
+        shared._register(folder, 'a', 'two', logger)
+    finally:
+        using.release()
+    assert (folder / 'one').exists()
+    assert shared._load(folder) == {'one': [], 'two': ['a']}
+    shared._register(folder, 'b', 'two', logger)
+    assert not (folder / 'one').exists()
+    assert shared._load(folder) == {'two': ['a', 'b']}
+
+
+@pytest.mark.asyncio
+async def test_prune_tasks_no_longer_sharing(conf):
+    proj = conf('''
+    [tool.toxn.task.lint]
+    deps = ['flake8']
+    [tool.toxn.task.alone]
+    share_env = false
+    ''')
+    config: ToxConfig = await proj.conf()
+    folder = config.work_dir / '.envs'
+    logger = logging.getLogger()
+    lint = config.task.lint.env_identity
+    for task, identity in (('lint', lint), ('alone', 'old'), ('removed', 'gone')):
+        (folder / identity).mkdir(parents=True, exist_ok=True)
+        shared._register(folder, task, identity, logger)
+    await shared.prune(config, logger)
+    assert shared._load(folder) == {lint: ['lint']}
+    assert sorted(p.name for p in folder.iterdir() if not p.name.startswith('.')) == sorted([lint, shared.REGISTRY])
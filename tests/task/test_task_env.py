@@ -0,0 +1,70 @@
+from typing import MutableMapping, Sequence
+
+import pytest
+
+from toxn.config.models.venv import Install
+from toxn.task import env as env_module
+from toxn.task.env import TaskEnv, env_type
+from toxn.task.env.venv_pip.venv_pip import VenvPip
+
+
+class _EntryPoint:
+    def __init__(self, value):
+        self.value = value
+
+    def load(self):
+        return self.value
+
+
+class Image(TaskEnv):
+    async def create(self) -> None:
+        raise NotImplementedError
+
+    async def install(self, installs: Sequence[Install]) -> None:
+        raise NotImplementedError
+
+    def environ(self) -> MutableMapping[str, str]:
+        return {}
+
+
+@pytest.fixture()
+def plugins(monkeypatch):
+    found = {}
+    monkeypatch.setattr(env_module, '_entry_points', lambda: found)
+    env_type.cache_clear()
+    yield found
+    env_type.cache_clear()
+
+
+def test_builtin_without_plugin_lookup(plugins):
+    plugins['venv-pip'] = None  # would fail if looked up
+    assert env_type('venv-pip') is VenvPip
+
+
+def test_plugin(plugins):
+    plugins['image'] = _EntryPoint(Image)
+    assert env_type('image') is Image
+
+
+def test_plugin_not_task_env(plugins):
+    plugins['bad'] = _EntryPoint(object)
+    with pytest.raises(ValueError, match='is not a TaskEnv'):
+        env_type('bad')
+
+
+def test_unknown(plugins):
+    with pytest.raises(ValueError) as error:
+        env_type('docker')
+    assert error.value.args[0] == "unknown task environment type 'docker', known: venv-pip"
+
+
+@pytest.mark.asyncio
+async def test_env_type_of_task(conf):
+    proj = conf('''
+    [tool.toxn.task.a]
+    env_type = 'image'
+    [tool.toxn.task.b]
+    ''')
+    config = await proj.conf()
+    assert config.task.a.env_type == 'image'
+    assert config.task.b.env_type == 'venv-pip'
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from toxn.config import ToxConfig
+from toxn.task import wheelhouse
+
+
+@pytest.mark.asyncio
+async def test_requirements_union_per_interpreter(conf):
+    proj = conf('''
+    [tool.toxn]
+    default_tasks = ['py36', 'a', 'b']
+    [tool.toxn.task]
+    wheelhouse = true
+    python = 'python3.6'
+    [tool.toxn.task.py36]
+    deps = ['pytest', 'six']
+    [tool.toxn.task.a]
+    deps = ['six', 'mock']
+    [tool.toxn.task.b]
+    python = 'python3.7'
+    wheelhouse = false
+    deps = ['flake8']
+    ''')
+    config: ToxConfig = await proj.conf()
+    folder = config.work_dir / '.wheelhouse' / 'python3.6'
+    assert config.task.a.wheelhouse == folder
+    assert config.task.b.wheelhouse is None
+    assert wheelhouse.requirements(config, None) == {folder: ('python3.6', ['pytest', 'six', 'mock'])}
+
+
+@pytest.mark.asyncio
+async def test_fill_skips_provisioned(tmpdir):
+    folder = Path(tmpdir)
+    with open(folder / wheelhouse.MANIFEST, 'wt') as file_handler:
+        json.dump(['six'], file_handler)
+    assert await wheelhouse.fill(folder, 'python-does-not-exist', ['six'], logging.getLogger())
+    assert not await wheelhouse.fill(folder, 'python-does-not-exist', ['six', 'mock'], logging.getLogger())
+
+
+@pytest.mark.asyncio
+async def test_fill_fails(tmpdir):
+    folder = Path(tmpdir) / 'wheelhouse'
+    with pytest.raises(wheelhouse.CouldNotBuildWheels):
+        await wheelhouse.fill(folder, 'python', [str(Path(tmpdir) / 'not-a-project')], logging.getLogger())
+    assert not (folder / wheelhouse.MANIFEST).exists()
+
+
+@pytest.mark.venv
+@pytest.mark.asyncio
+async def test_failing_wheelhouse_fails_parallel_run(conf):
+    proj = conf('''
+    [tool.toxn]
+    default_tasks = ['a', 'b']
+    [tool.toxn.build]
+    skip = true
+    [tool.toxn.task]
+    wheelhouse = true
+    deps = ['/nonexistent/pkg']
+    commands = [['python', '-c', 'print(1)']]
+    ''')
+    with pytest.raises(SystemExit):
+        await proj.run('-p', '2')
+    config = proj.conf_obj
+    assert config.report_json.exists()
+    assert config.durations_file.exists()
+    assert asyncio.all_tasks() == {asyncio.current_task()}  # the tasks got cancelled, not left pending
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from toxn.task import interpreters
+from toxn.task.interpreters import InterpreterRegistry
+
+
+@pytest.fixture(name='queries')
+def queries_fixture(tmpdir, monkeypatch):
+    exe = Path(tmpdir) / 'python'
+    exe.write_text('')
+    calls = []
+
+    async def get_python_info(base_python_exe, logger):
+        calls.append(base_python_exe)
+        await asyncio.sleep(0.01)
+        return '3.6.4', (3, 6, 4, 'final')
+
+    monkeypatch.setattr(interpreters, 'get_interpreter', lambda name, logger: exe)
+    monkeypatch.setattr(interpreters, 'get_python_info', get_python_info)
+    return exe, calls
+
+
+@pytest.mark.asyncio
+async def test_registry_resolves_once(tmpdir, queries):
+    exe, calls = queries
+    registry = InterpreterRegistry(Path(tmpdir) / 'cache.json')
+    results = await asyncio.gather(*[registry.find('python3.6', logging.getLogger()) for _ in range(3)])
+    assert calls == [exe]
+    assert {r.exe for r in results} == {exe}
+    assert results[0].version_info == (3, 6, 4, 'final')
+
+
+@pytest.mark.asyncio
+async def test_registry_persisted(tmpdir, queries):
+    exe, calls = queries
+    cache = Path(tmpdir) / 'cache.json'
+    await InterpreterRegistry(cache).find('python3.6', logging.getLogger())
+    python = await InterpreterRegistry(cache).find('python3.6', logging.getLogger())
+    assert calls == [exe]
+    assert python.version_info == (3, 6, 4, 'final')
+
+    stat = exe.stat()
+    os.utime(str(exe), (stat.st_atime, stat.st_mtime + 1))
+    await InterpreterRegistry(cache).find('python3.6', logging.getLogger())
+    assert calls == [exe, exe]
+
+
+@pytest.mark.asyncio
+async def test_registry_real_interpreter(tmpdir):
+    python = await InterpreterRegistry(Path(tmpdir) / 'cache.json').find(sys.executable, logging.getLogger())
+    assert python.version_info[:2] == tuple(sys.version_info[:2])
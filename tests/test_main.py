@@ -10,3 +10,21 @@ def test_help():
     help_message_io = StringIO()
     build_parser().print_help(help_message_io)
     assert output == help_message_io.getvalue()
+
+
+def imported_modules(*args: str):
+    """names of modules imported by running toxn with the arguments (via the import time log of the interpreter)"""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'toxn'] + list(args),
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return {line.split('|')[-1].strip() for line in process.stderr.splitlines() if line.startswith('import time:')}
+
+
+def test_list_bare_imports_light(conf):
+    conf('''
+    [tool.toxn]
+    default_tasks = ['py36']
+    ''')
+    modules = imported_modules('-a', 'list-default-bare')
+    assert 'toxn.evaluate.list_tasks' in modules
+    heavy = {m for m in modules if m.startswith('toxn.task') or m in ('pkg_resources', 'importlib.metadata')}
+    assert not heavy
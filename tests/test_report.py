@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pytest
+
+from toxn.report import RunReport
+
+
+def test_phases_timed_on_failure():
+    report = RunReport()
+    task = report.task('py')
+    with pytest.raises(ValueError):
+        with task.phase('command', 'pytest') as phase:
+            phase.exit_code = 1
+            raise ValueError
+    task.done(1)
+    assert report.task('py') is task
+    assert [(p.kind, p.name, p.exit_code) for p in task.phases] == [('command', 'pytest', 1)]
+    assert task.phases[0].duration >= 0
+
+
+def test_write_json_and_junit(tmpdir):
+    report = RunReport()
+    with report.task('build').phase('build', 'wheel') as phase:
+        phase.cached = True
+    report.task('build').done(0)
+    report.task('py').done(2)
+    report.done(2)
+
+    json_file, junit_file = Path(tmpdir) / 'report.json', Path(tmpdir) / 'out' / 'report.xml'
+    report.write(json_file, junit_file)
+
+    with open(json_file) as file_handler:
+        content = json.load(file_handler)
+    assert content['exit_code'] == 2
+    assert [t['name'] for t in content['tasks']] == ['build', 'py']
+    assert content['tasks'][0]['phases'][0]['cached'] is True
+
+    suite = ElementTree.parse(str(junit_file)).getroot()
+    assert suite.get('tests') == '2' and suite.get('failures') == '1'
+    cases = {case.get('name'): case for case in suite.iter('testcase')}
+    assert cases['build'].find('failure') is None
+    assert cases['py'].find('failure').get('message') == 'exit code 2'
+    assert 'build wheel in' in cases['build'].find('system-out').text
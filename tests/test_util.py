@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from toxn import util
+from toxn.util import TAIL, CmdLineBufferPrinter, FileLock, read_stream, run
+
+
+@pytest.mark.asyncio
+async def test_run_in_cwd(tmpdir):
+    printer = CmdLineBufferPrinter(limit=1)
+    cwd = os.getcwd()
+    await run([sys.executable, '-c', 'import os; print(os.getcwd())'], logger=logging.getLogger(),
+              stdout=printer, cwd=Path(tmpdir))
+    assert Path(printer.last) == Path(tmpdir)
+    assert os.getcwd() == cwd
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='looks at processes via /proc')
+@pytest.mark.asyncio
+async def test_run_cancel_kills_tree(tmpdir, monkeypatch):
+    pid_file = Path(tmpdir) / 'pid'
+    child = f'import subprocess, sys; p = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]); ' \
+            f'open({str(pid_file)!r}, "w").write(str(p.pid)); p.wait()'
+    monkeypatch.setattr(util, 'GRACE', 0.1)
+    cmd = [sys.executable, '-c', f'import signal; signal.signal(signal.SIGINT, signal.SIG_IGN); {child}']
+    # the command and what it started ignore the interrupt, so get killed
+    task = asyncio.ensure_future(run(cmd, logger=logging.getLogger(), isolate=True))
+    while not pid_file.exists() or not pid_file.read_text():
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    grandchild = int(pid_file.read_text())
+    for _ in range(500):
+        if not _running(grandchild):
+            break
+        await asyncio.sleep(0.01)
+    else:
+        pytest.fail('process started by the command still running')
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='interrupts are POSIX signals')
+@pytest.mark.asyncio
+async def test_run_cancel_interrupts_first(tmpdir):
+    started, cleaned = Path(tmpdir) / 'started', Path(tmpdir) / 'cleaned'
+    code = f'import time; open({str(started)!r}, "w").close()\n' \
+           f'try:\n    time.sleep(60)\nexcept KeyboardInterrupt:\n    open({str(cleaned)!r}, "w").close()'
+    task = asyncio.ensure_future(run([sys.executable, '-c', code], logger=logging.getLogger()))
+    while not started.exists():
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cleaned.exists()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='interrupts are POSIX signals')
+@pytest.mark.asyncio
+async def test_kill_running_interrupts_isolated(tmpdir):
+    started, cleaned = Path(tmpdir) / 'started', Path(tmpdir) / 'cleaned'
+    code = f'import time; open({str(started)!r}, "w").close()\n' \
+           f'try:\n    time.sleep(60)\nexcept KeyboardInterrupt:\n    open({str(cleaned)!r}, "w").close()'
+    task = asyncio.ensure_future(run([sys.executable, '-c', code], logger=logging.getLogger(), exit_on_fail=False,
+                                     isolate=True))
+    while not started.exists():
+        await asyncio.sleep(0.01)
+    await util.kill_running()
+    await task
+    assert cleaned.exists()
+
+
+def _running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    stat = Path(f'/proc/{pid}/stat')
+    try:  # killed but not yet reaped by its new parent
+        return stat.read_text().rsplit(')', 1)[1].split()[0] != 'Z'
+    except (OSError, IndexError):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_read_stream_chunks():
+    stream = asyncio.StreamReader()
+    stream.feed_data('a\nbé'.encode('utf-8')[:-1])  # split within a multi byte character
+    stream.feed_data('é'.encode('utf-8')[1:] + b'\n' + b'x' * 200000 + b'\nend')
+    stream.feed_eof()
+    printer = CmdLineBufferPrinter(limit=None, live_print=False)
+    await read_stream(stream, logging.getLogger(), printer)
+    assert list(printer.elements) == ['a', 'bé', 'x' * 200000, 'end']
+
+
+def test_printer_keeps_tail():
+    printer = CmdLineBufferPrinter(live_print=False)
+    for i in range(TAIL + 10):
+        printer(logging.getLogger(), f'{i}\n')
+    assert len(printer.elements) == TAIL
+    assert printer.last == str(TAIL + 9)
+
+
+@pytest.mark.asyncio
+async def test_file_lock_exclusive(tmpdir):
+    path = Path(tmpdir) / 'sub' / '.lock'
+    order = []
+
+    async def take(name):
+        async with FileLock(path):  # a lock file opened again conflicts like one of another process
+            order.append(name)
+            await asyncio.sleep(0.1)
+        order.append(f'{name} done')
+
+    await asyncio.gather(take('a'), take('b'))
+    assert order in (['a', 'a done', 'b', 'b done'], ['b', 'b done', 'a', 'a done'])
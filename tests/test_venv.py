@@ -0,0 +1,127 @@
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+from toxn.config.models.venv import Install, Python, VEnv, VEnvCreateParam, VEnvParams
+from toxn.task.env.venv_pip import venv as venv_module
+from toxn.task.env.venv_pip.venv import ensure_installed, plan_installs, setup
+
+
+@pytest.fixture(name='fake_env')
+def fake_env_fixture(tmpdir, monkeypatch):
+    root = Path(tmpdir)
+    logger = logging.getLogger()
+    python = Python('python', Path('/usr/bin/python'), '3.6.4', (3, 6, 4, 'final'))
+    params = VEnvCreateParam(False, root, 'py', 'python', logger)
+    env = VEnv(python, VEnvParams(root, root / 'bin', root / 'bin' / 'python', root / 'lib'), logger)
+    installed = []
+    recreated = []
+
+    async def install(venv, batch):
+        installed.append(batch.packages)
+
+    async def setup(create_params):
+        recreated.append(create_params.recreate)
+        if create_params.recreate and params.fingerprint.exists():
+            params.fingerprint.unlink()
+        return env
+
+    monkeypatch.setattr(venv_module, 'install', install)
+    monkeypatch.setattr(venv_module, 'setup', setup)
+    return env, params, installed, recreated
+
+
+def _deps(*packages):
+    return Install('deps', list(packages), ['pip', 'install', '-U'], False)
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_match_skips_install(fake_env):
+    env, params, installed, recreated = fake_env
+    await ensure_installed(env, params, [_deps('a', 'b')])
+    await ensure_installed(env, params, [_deps('a', 'b')])
+    assert installed == [['a', 'b']]
+    assert recreated == []
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_extended_installs_new(fake_env):
+    env, params, installed, recreated = fake_env
+    await ensure_installed(env, params, [_deps('a')])
+    await ensure_installed(env, params, [_deps('a', 'b')])
+    assert installed == [['a'], ['b']]
+    assert recreated == []
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_removed_recreates(fake_env):
+    env, params, installed, recreated = fake_env
+    await ensure_installed(env, params, [_deps('a', 'b')])
+    await ensure_installed(env, params, [_deps('b')])
+    assert installed == [['a', 'b'], ['b']]
+    assert recreated == [True]
+
+
+@pytest.mark.asyncio
+async def test_recreate_keeps_batches_restored_from_archive(fake_env, monkeypatch):
+    env, params, installed, recreated = fake_env
+    project = Install('project', ['.'], ['pip', 'install', '-U'], False)
+    await ensure_installed(env, params, [_deps('a', 'b'), project])
+    restored = json.loads(params.fingerprint.read_text())
+    del restored['batches']['project']
+
+    async def restore(create_params):
+        recreated.append(create_params.recreate)
+        params.fingerprint.write_text(json.dumps(restored))  # as restoring the archive of the deps does
+        return env
+
+    monkeypatch.setattr(venv_module, 'setup', restore)
+    await ensure_installed(env, params, [_deps('a', 'b'), project._replace(use_develop=True)])
+    assert installed == [['a', 'b', '.'], ['.']]
+    assert recreated == [True]
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_digest_change_reinstalls(fake_env):
+    env, params, installed, recreated = fake_env
+    project = Install('project', ['pkg.whl'], ['pip', 'install', '-U'], False)
+    await ensure_installed(env, params, [project._replace(digest='1')])
+    await ensure_installed(env, params, [project._replace(digest='1')])
+    await ensure_installed(env, params, [project._replace(digest='2')])
+    assert installed == [['pkg.whl'], ['pkg.whl']]
+    assert recreated == []
+
+
+@pytest.mark.venv
+@pytest.mark.asyncio
+async def test_setup_reports_layout(tmpdir):
+    root = Path(tmpdir) / 'env'
+    env = await setup(VEnvCreateParam(False, root, 'env', sys.executable, logging.getLogger()))
+    assert env.params.executable.exists()
+    assert env.params.bin_path == env.params.executable.parent
+    assert env.params.site_package.exists()
+    assert list(env.params.site_package.glob('pip*'))
+
+
+def test_plan_installs_merges_batches():
+    cmd = ['pip', 'install', '-U']
+    plan = plan_installs([Install('build requires', ['setuptools'], cmd, False),
+                          Install('for build requires', [], cmd, False),
+                          Install('deps', ['pytest', 'setuptools'], cmd, False),
+                          Install('project', ['.'], cmd, True),
+                          Install('extra', ['tox'], ['pip', 'install'], False)])
+    assert [(i.batch_name, i.packages, i.use_develop) for i in plan] == [
+        ('build requires, deps', ['setuptools', 'pytest'], False),
+        ('project', ['.'], True),
+        ('extra', ['tox'], False)]
+
+
+@pytest.mark.asyncio
+async def test_ensure_installed_single_invocation(fake_env):
+    env, params, installed, recreated = fake_env
+    project = Install('project', ['pkg.whl'], ['pip', 'install', '-U'], False, digest='1')
+    await ensure_installed(env, params, [_deps('a', 'b'), project])
+    assert installed == [['a', 'b', 'pkg.whl']]
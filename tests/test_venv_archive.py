@@ -0,0 +1,50 @@
+import logging
+import os
+from pathlib import Path
+
+from toxn.config.models.venv import Archive, Install, Python, VEnvCreateParam, VEnvParams
+from toxn.task.env.venv_pip.venv.archive import export, restore
+
+
+def _python(exe: Path) -> Python:
+    return Python('python', exe, '3.6.4', (3, 6, 4, 'final'))
+
+
+def test_export_restore_relocates(tmpdir):
+    root = Path(tmpdir)
+    src, dest = root / 'ci' / 'env', root / 'local' / 'env'
+    old_base, new_base = root / 'old' / 'bin' / 'python3', root / 'new' / 'bin' / 'python3'
+    (src / 'bin').mkdir(parents=True)
+    (src / 'lib').mkdir()
+    (src / 'pyvenv.cfg').write_text(f'home = {old_base.parent}\n')
+    script = src / 'bin' / 'pip'
+    script.write_text(f'#!{src}/bin/python\n')
+    os.chmod(str(script), 0o755)
+    os.symlink(str(old_base), str(src / 'bin' / 'python'))
+    os.symlink('lib', str(src / 'lib64'))
+    (src / 'log').mkdir()  # not part of the environment
+    logger = logging.getLogger()
+    params = VEnvCreateParam(False, src, 'env', 'python', logger)
+    params.fingerprint.write_text('{}')
+    layout = VEnvParams(src, src / 'bin', src / 'bin' / 'python', src / 'lib')
+    file = root / 'archives' / 'env.tar.gz'
+
+    export(file, params, layout, _python(old_base), {'deps': {'packages': ['six']}})
+    new_layout, batches = restore(file, params._replace(dir=dest), _python(new_base))
+
+    assert new_layout == VEnvParams(dest, dest / 'bin', dest / 'bin' / 'python', dest / 'lib')
+    assert batches == {'deps': {'packages': ['six']}}
+    assert (dest / 'bin' / 'pip').read_text() == f'#!{dest}/bin/python\n'
+    assert os.access(str(dest / 'bin' / 'pip'), os.X_OK)
+    assert (dest / 'pyvenv.cfg').read_text() == f'home = {new_base.parent}\n'
+    assert os.readlink(str(dest / 'bin' / 'python')) == str(new_base)
+    assert os.readlink(str(dest / 'lib64')) == 'lib'
+    assert sorted(os.listdir(str(dest))) == ['bin', 'lib', 'lib64', 'pyvenv.cfg']
+    assert sorted(os.listdir(str(dest.parent))) == ['env']
+
+
+def test_archive_key_ignores_project():
+    deps = Install('deps', ['six'], ['pip', 'install'], False)
+    project = Install('project', ['/tmp/pkg.whl'], ['pip', 'install'], False, digest='abc')
+    assert Archive.of(Path('a'), [deps]) == Archive.of(Path('a'), [deps, project])
+    assert Archive.of(Path('a'), [deps]) != Archive.of(Path('a'), [deps._replace(packages=['mock'])])
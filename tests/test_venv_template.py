@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+from toxn.config.models.venv import Python, VEnvParams
+from toxn.task.env.venv_pip.venv.template import META, clone_tree, relocate_layout, template_dir
+
+
+def test_clone_tree_relocates(tmpdir):
+    src, dest = Path(tmpdir) / 'template', Path(tmpdir) / 'task'
+    (src / 'bin').mkdir(parents=True)
+    (src / 'lib' / 'site-packages').mkdir(parents=True)
+    script = src / 'bin' / 'pip'
+    script.write_text(f'#!{src}/bin/python\nimport pip\n')
+    os.chmod(str(script), 0o755)
+    (src / 'pyvenv.cfg').write_text('home = /usr/bin\n')
+    (src / 'lib' / 'site-packages' / 'mod.py').write_text(f'# {src}\n')
+    os.symlink('lib', str(src / 'lib64'))
+    os.symlink(str(src / 'bin' / 'pip'), str(src / 'bin' / 'pip3'))
+    (src / META).write_text('{}')
+
+    mode = clone_tree(src, dest)
+
+    assert mode in ('reflink', 'copy')
+    assert (dest / 'bin' / 'pip').read_text() == f'#!{dest}/bin/python\nimport pip\n'
+    assert os.access(str(dest / 'bin' / 'pip'), os.X_OK)
+    assert (dest / 'pyvenv.cfg').read_text() == 'home = /usr/bin\n'
+    assert (dest / 'lib' / 'site-packages' / 'mod.py').read_text() == f'# {src}\n'  # only scripts are rewritten
+    assert os.readlink(str(dest / 'lib64')) == 'lib'
+    assert os.readlink(str(dest / 'bin' / 'pip3')) == str(dest / 'bin' / 'pip')
+    assert not (dest / META).exists()
+
+    with open(dest / 'lib' / 'site-packages' / 'mod.py', 'at') as file_handler:  # e.g. appending to a .pth file
+        file_handler.write('# task\n')
+    assert (src / 'lib' / 'site-packages' / 'mod.py').read_text() == f'# {src}\n'
+
+
+def test_relocate_layout():
+    layout = VEnvParams(Path('/a'), Path('/a/bin'), Path('/a/bin/python'), Path('/a/lib/site'))
+    assert relocate_layout(layout, Path('/a'), Path('/b')) == VEnvParams(Path('/b'), Path('/b/bin'),
+                                                                        Path('/b/bin/python'), Path('/b/lib/site'))
+
+
+def test_template_dir_per_interpreter_and_pip_wheel():
+    base = Python('python3.6', Path('/usr/bin/python3.6'), '3.6.5', (3, 6, 5, 'final'))
+    other = base._replace(exe=Path('/opt/bin/python3.6'))
+    folder = Path('/work/.templates/python3.6')
+    assert template_dir(folder, base, None) == template_dir(folder, base, None)
+    assert template_dir(folder, base, None).parent == folder
+    dirs = {template_dir(folder, base, None), template_dir(folder, base, Path('/pip.whl')),
+            template_dir(folder, other, None)}
+    assert len(dirs) == 3